@@ -0,0 +1,6 @@
+"""性能基准测试脚本。
+
+在工具根目录下以模块方式运行，例如::
+
+    python -m benchmarks.bench_middleware
+"""
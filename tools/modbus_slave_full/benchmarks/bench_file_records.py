@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""读文件记录 (FC20) 批量处理基准测试。
+
+比较一次 FC03 读取与包含多个子请求的 FC20 请求的处理耗时。
+"""
+
+import argparse
+import asyncio
+import struct
+import time
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler
+
+
+async def measure(handler: ModbusHandler, function_code: int, data: bytes, iterations: int):
+    """测量单个请求的平均处理耗时（微秒）。"""
+    handle = handler.handle_request
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await handle(1, function_code, data, "bench")
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations: int, sub_requests: int, record_length: int) -> None:
+    """运行基准测试。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1, holding_registers=10000 * (sub_requests + 1))
+    handler = ModbusHandler(datastore)
+
+    fc03 = struct.pack(">HH", 0, min(sub_requests * record_length, 125))
+    body = b"".join(
+        struct.pack(">BHHH", 0x06, file_number, 0, record_length)
+        for file_number in range(1, sub_requests + 1)
+    )
+    fc20 = bytes([len(body)]) + body
+    response = await handler.handle_request(1, 0x14, fc20, "bench")
+    if response[0] & 0x80:
+        raise SystemExit(f"FC20 请求无效（异常码 {response[1]}），请减小子请求数或记录长度")
+
+    await measure(handler, 0x03, fc03, 1000)
+    fc03_us = await measure(handler, 0x03, fc03, iterations)
+    fc20_us = await measure(handler, 0x14, fc20, iterations)
+    print(f"FC03 读取 {struct.unpack('>HH', fc03)[1]} 个寄存器: {fc03_us:8.2f} µs/请求")
+    print(
+        f"FC20 {sub_requests} 个子请求 × {record_length} 个寄存器: "
+        f"{fc20_us:8.2f} µs/请求 ({fc20_us / fc03_us:.2f}x FC03)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="读文件记录批量处理基准测试")
+    parser.add_argument("--iterations", "-n", type=int, default=50000, help="请求数")
+    parser.add_argument("--sub-requests", "-s", type=int, default=10, help="子请求数")
+    parser.add_argument("--record-length", "-l", type=int, default=4, help="每个子请求的寄存器数")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.sub_requests, args.record_length))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""中间件分发开销基准测试。
+
+比较以下场景下 FC03 请求的处理速率：
+
+- 直接调用功能码处理器（基线）
+- `handle_request`，未注册中间件
+- `handle_request`，注册一个透传中间件
+- 注册后再移除中间件（应回到无中间件的速度）
+"""
+
+import argparse
+import asyncio
+import time
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler
+
+REQUEST = b"\x00\x00\x00\x0A"
+
+
+async def passthrough(slave_id, function_code, data, source, call_next):
+    """透传中间件。"""
+    return await call_next(slave_id, function_code, data, source)
+
+
+async def run_direct(handler: ModbusHandler, iterations: int) -> float:
+    """直接调用功能码处理器。"""
+    fn = handler._handle_read_holding_registers
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn(1, REQUEST, "bench")
+    return time.perf_counter() - start
+
+
+async def run_handle_request(handler: ModbusHandler, iterations: int) -> float:
+    """通过 handle_request 分发。"""
+    handle = handler.handle_request
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await handle(1, 0x03, REQUEST, "bench")
+    return time.perf_counter() - start
+
+
+def report(name: str, iterations: int, elapsed: float, baseline: float) -> None:
+    """打印一行结果。"""
+    print(
+        f"{name:<32} {iterations / elapsed:>12,.0f} 请求/秒 "
+        f"{elapsed / iterations * 1e6:>8.2f} µs/请求 {elapsed / baseline:>6.2f}x"
+    )
+
+
+async def main(iterations: int, rounds: int) -> None:
+    """运行基准测试。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    handler = ModbusHandler(datastore)
+
+    # 预热
+    await run_handle_request(handler, 1000)
+
+    results = {}
+    for _ in range(rounds):
+        for name, setup, runner in (
+            ("直接调用处理器", None, run_direct),
+            ("handle_request 无中间件", None, run_handle_request),
+            ("handle_request 1 个中间件", "add", run_handle_request),
+            ("handle_request 移除中间件后", "remove", run_handle_request),
+        ):
+            if setup == "add":
+                handler.add_middleware(passthrough)
+            elif setup == "remove":
+                handler.remove_middleware(passthrough)
+            elapsed = await runner(handler, iterations)
+            results[name] = min(results.get(name, elapsed), elapsed)
+
+    baseline = results["handle_request 无中间件"]
+    print(f"迭代次数: {iterations}，取 {rounds} 轮最优值")
+    for name, elapsed in results.items():
+        report(name, iterations, elapsed, baseline)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="中间件分发开销基准测试")
+    parser.add_argument("--iterations", "-n", type=int, default=100000, help="每轮请求数")
+    parser.add_argument("--rounds", "-r", type=int, default=3, help="轮数")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.rounds))
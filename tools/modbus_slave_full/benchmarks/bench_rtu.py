@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Modbus RTU 基准测试。
+
+使用伪终端测试环境（`modbus_slave_full.testing.RTUHarness`），服务器和主站运行在
+同一个事件循环中。主站按波特率模拟线路传输时间，按功能码测量每秒事务数和延迟；
+`理论上限` 为请求、响应的线路时间加 T3.5 静默所允许的最大事务速率，
+`max` 行不模拟线路时间，反映服务器处理能力（包括主站本身的开销）。
+
+线路时间由 `asyncio.sleep` 模拟，每次等待可能多出约 1 ms（事件循环按毫秒计时），
+高波特率下测得的速率因此低于理论上限。
+"""
+
+import argparse
+import asyncio
+import time
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler
+from modbus_slave_full.protocol.rtu import character_time, frame_gap
+from modbus_slave_full.testing import RTUHarness
+from modbus_slave_full.utils import LatencyHistogram
+
+BAUDRATES = (9600, 19200, 38400, 115200)
+
+# 功能码 -> (说明, 请求 PDU)
+REQUESTS = {
+    0x01: ("读 16 个线圈", b"\x01\x00\x00\x00\x10"),
+    0x02: ("读 16 个离散输入", b"\x02\x00\x00\x00\x10"),
+    0x03: ("读 10 个保持寄存器", b"\x03\x00\x00\x00\x0A"),
+    0x04: ("读 10 个输入寄存器", b"\x04\x00\x00\x00\x0A"),
+    0x05: ("写单个线圈", b"\x05\x00\x01\xFF\x00"),
+    0x06: ("写单个寄存器", b"\x06\x00\x01\x12\x34"),
+    0x0F: ("写 16 个线圈", b"\x0F\x00\x00\x00\x10\x02\xAA\x55"),
+    0x10: ("写 10 个寄存器", b"\x10\x00\x00\x00\x0A\x14" + bytes(20)),
+    0x17: ("读写 10 个寄存器", b"\x17\x00\x00\x00\x0A\x00\x10\x00\x0A\x14" + bytes(20)),
+}
+
+
+async def run(harness: RTUHarness, pdu: bytes, requests: int):
+    """顺序发送请求，返回 (每秒事务数, 延迟直方图, 响应长度)。"""
+    master = harness.master
+    response = await master.execute(1, pdu)
+    histogram = LatencyHistogram()
+    start = time.perf_counter()
+    for _ in range(requests):
+        begin = time.perf_counter_ns()
+        await master.execute(1, pdu)
+        histogram.record((time.perf_counter_ns() - begin) // 1000)
+    return requests / (time.perf_counter() - start), histogram, len(response)
+
+
+async def main(args) -> None:
+    """运行基准测试。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    handler = ModbusHandler(datastore)
+    codes = [int(code, 0) for code in args.function_codes] if args.function_codes else REQUESTS
+    print(
+        f"{'FC':>4} {'说明':<12} {'波特率':>8} {'事务/秒':>9} {'理论上限':>9} "
+        f"{'p50 (us)':>10} {'p99 (us)':>10}"
+    )
+    for baudrate in (0,) + BAUDRATES:
+        async with RTUHarness(
+            handler, baudrate=baudrate or 115200, shape=bool(baudrate)
+        ) as harness:
+            if not baudrate:
+                # 不模拟线路时间时也不保留帧间静默
+                harness.master.t35 = 1e-6
+            for code in codes:
+                name, pdu = REQUESTS[code]
+                count = args.requests if baudrate else args.requests * 10
+                tps, histogram, response_size = await run(harness, pdu, count)
+                limit = "-"
+                if baudrate:
+                    # 请求和响应帧各多出单元ID和 CRC 共 3 个字节
+                    wire = (len(pdu) + response_size + 6) * character_time(baudrate)
+                    limit = f"{1 / (wire + frame_gap(baudrate)):,.0f}"
+                print(
+                    f"{code:>#4x} {name:<12} {baudrate or 'max':>8} {tps:>9,.0f} {limit:>9} "
+                    f"{histogram.percentile(50):>10} {histogram.percentile(99):>10}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modbus RTU 基准测试（伪终端）")
+    parser.add_argument("--requests", "-n", type=int, default=100, help="每种配置的请求数")
+    parser.add_argument("--function-codes", "-f", nargs="*", help="只测试指定功能码，如 0x03")
+    asyncio.run(main(parser.parse_args()))
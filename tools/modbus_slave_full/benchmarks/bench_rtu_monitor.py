@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""RTU 总线监听基准测试。
+
+伪终端主端以最快速度写入背靠背的 FC03 请求/响应流（没有帧间隔），从端运行监听
+模式的 `ModbusRTUServer`，测量每秒切分、配对和记录的帧数。`线路上限` 为 115200
+8N1 连续满载时每秒最多出现的帧数，处理速率高于它即可跟上满速总线。
+
+配置：只配对、写抓包文件、再加一个模拟 WebSocket 客户端的订阅者（解析字段并
+序列化为 JSON）。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler, ModbusRTUServer
+from modbus_slave_full.protocol.monitor import SUBSCRIBER_QUEUE_SIZE, BusMonitor, drain_events
+from modbus_slave_full.protocol.rtu import character_time
+from modbus_slave_full.protocol.utils import add_crc16
+
+BAUDRATE = 115200
+REQUEST = add_crc16(b"\x01\x03\x00\x00\x00\x0A")
+RESPONSE = add_crc16(b"\x01\x03\x14" + bytes(20))
+# 每次写入伪终端的字节数（模拟串口驱动按块交付）
+CHUNK_SIZE = 64
+
+
+async def feed(fd: int, data: bytes) -> None:
+    """按块写入伪终端主端，缓冲区满时让出事件循环。"""
+    offset = 0
+    while offset < len(data):
+        try:
+            offset += os.write(fd, data[offset : offset + CHUNK_SIZE])
+        except BlockingIOError:
+            await asyncio.sleep(0)
+            continue
+        await asyncio.sleep(0)
+
+
+async def consume(queue: asyncio.Queue) -> None:
+    """模拟 WebSocket 客户端：批量取出事件并序列化。"""
+    while True:
+        frames = [await queue.get()]
+        frames.extend(drain_events(queue, 255))
+        json.dumps({"type": "bus_frames", "frames": frames})
+
+
+async def run(transactions: int, capture: bool, subscribe: bool):
+    """运行一种配置，返回 (每秒帧数, 监听统计, 丢弃字节数)。"""
+    master, slave = os.openpty()
+    os.set_blocking(master, False)
+    with tempfile.TemporaryDirectory() as tmp:
+        monitor = BusMonitor(
+            capture_file=os.path.join(tmp, "bus.cap") if capture else "", baudrate=BAUDRATE
+        )
+        queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        consumer = None
+        if subscribe:
+            monitor.subscribe(queue)
+            consumer = asyncio.create_task(consume(queue))
+        handler = ModbusHandler(ModbusDataStore())
+        # 伪终端不支持校验位，使用 8N1
+        server = ModbusRTUServer(handler, os.ttyname(slave), baudrate=BAUDRATE, monitor=monitor)
+        task = asyncio.create_task(server.start())
+        while not server.running:
+            await asyncio.sleep(0.005)
+
+        frames = transactions * 2
+        start = time.perf_counter()
+        writer = asyncio.create_task(feed(master, (REQUEST + RESPONSE) * transactions))
+        while monitor.frames < frames:
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        await writer
+
+        await server.stop()
+        for pending in (task, consumer):
+            if pending is not None:
+                pending.cancel()
+    os.close(master)
+    os.close(slave)
+    return frames / elapsed, monitor.get_stats(), server.discarded_bytes
+
+
+async def main(args) -> None:
+    """运行基准测试。"""
+    char_time = character_time(BAUDRATE)
+    line_limit = 2 / ((len(REQUEST) + len(RESPONSE)) * char_time)
+    print(f"{'配置':<16} {'帧/秒':>9} {'线路上限':>9} {'配对':>7} {'丢弃字节':>8} {'丢弃事件':>8}")
+    configs = (("只配对", False, False), ("抓包文件", True, False), ("抓包 + 订阅", True, True))
+    for name, capture, subscribe in configs:
+        rate, stats, discarded = await run(args.transactions, capture, subscribe)
+        print(
+            f"{name:<16} {rate:>9,.0f} {line_limit:>9,.0f} {stats['responses']:>7} "
+            f"{discarded:>8} {stats['dropped_events']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RTU 总线监听基准测试（伪终端）")
+    parser.add_argument("--transactions", "-n", type=int, default=5000, help="请求/响应对数")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Modbus ASCII / RTU 串口基准测试。
+
+服务器运行在独立子进程中，通过伪终端（pty）与主站通信。伪终端不受波特率限制，
+主站按波特率模拟线路传输时间：请求和响应的每个字符占用一个字符时间，
+RTU 帧之间保留 T3.5 静默。测试常用波特率下的请求速率和延迟，
+`max` 行为不模拟线路时间时的处理速率。
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import select
+import time
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusASCIIServer, ModbusHandler, ModbusRTUServer
+from modbus_slave_full.protocol.rtu import character_time, frame_gap
+from modbus_slave_full.protocol.utils import add_crc16, encode_ascii_frame
+from modbus_slave_full.utils import LatencyHistogram
+
+# 读取 10 个保持寄存器
+PDU = b"\x03\x00\x00\x00\x0A"
+BAUDRATES = (9600, 19200, 38400, 115200)
+
+
+def serve(mode: str, device: str, stop_event) -> None:
+    """子进程：在伪终端从端运行服务器直到收到停止信号。"""
+
+    async def run() -> None:
+        datastore = ModbusDataStore()
+        datastore.initialize_slave(1)
+        handler = ModbusHandler(datastore)
+        server_class = ModbusASCIIServer if mode == "ascii" else ModbusRTUServer
+        # 伪终端不支持校验位，使用 8N1；线路时间由主站模拟
+        server = server_class(handler, device, baudrate=115200, bytesize=8, parity="N")
+        task = asyncio.create_task(server.start())
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, stop_event.wait)
+        await server.stop()
+        task.cancel()
+
+    asyncio.run(run())
+
+
+def wait_until(deadline: float) -> None:
+    """忙等到指定时间（asyncio/select 的毫秒级定时精度不足以模拟字符时间）。"""
+    while time.perf_counter() < deadline:
+        pass
+
+
+def read_response(fd: int, mode: str) -> bytes:
+    """读取一个完整响应。"""
+    data = b""
+    while True:
+        select.select([fd], [], [], 1.0)
+        data += os.read(fd, 1024)
+        if mode == "ascii":
+            if data.endswith(b"\r\n"):
+                return data
+        elif len(data) >= 3 and len(data) >= data[2] + 5:
+            return data
+
+
+def run_mode(fd: int, mode: str, baudrate: int, requests: int) -> LatencyHistogram:
+    """按指定波特率模拟线路时间，顺序发送请求，返回延迟直方图（微秒）。"""
+    request = encode_ascii_frame(b"\x01" + PDU) if mode == "ascii" else add_crc16(b"\x01" + PDU)
+    char = character_time(baudrate) if baudrate else 0.0
+    gap = frame_gap(baudrate) if baudrate and mode == "rtu" else 0.0
+    histogram = LatencyHistogram()
+    for _ in range(requests):
+        start = time.perf_counter()
+        os.write(fd, request)
+        response = read_response(fd, mode)
+        # 请求和响应的线路传输时间
+        wait_until(start + (len(request) + len(response)) * char)
+        histogram.record(int((time.perf_counter() - start) * 1e6))
+        # 帧间静默
+        wait_until(time.perf_counter() + gap)
+    return histogram
+
+
+def main(args) -> None:
+    """运行基准测试。"""
+    print(f"{'模式':>6} {'波特率':>8} {'请求/秒':>10} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for mode in ("rtu", "ascii"):
+        master, slave = os.openpty()
+        stop_event = multiprocessing.Event()
+        process = multiprocessing.Process(
+            target=serve, args=(mode, os.ttyname(slave), stop_event)
+        )
+        process.start()
+        try:
+            time.sleep(0.5)
+            for baudrate in (0,) + BAUDRATES:
+                run_mode(master, mode, baudrate, 10)
+                start = time.perf_counter()
+                histogram = run_mode(master, mode, baudrate, args.requests)
+                rate = args.requests / (time.perf_counter() - start)
+                label = baudrate or "max"
+                print(
+                    f"{mode:>6} {label:>8} {rate:>10,.0f} "
+                    f"{histogram.percentile(50):>10} {histogram.percentile(99):>10}"
+                )
+        finally:
+            stop_event.set()
+            process.join(timeout=10)
+            os.close(master)
+            os.close(slave)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modbus ASCII / RTU 串口基准测试")
+    parser.add_argument("--requests", "-n", type=int, default=500, help="每种配置的请求数")
+    main(parser.parse_args())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""TCP 连接处理后端基准测试。
+
+服务器运行在独立子进程中，客户端同时打开大量连接（默认 1000 条），
+每条连接顺序发送请求，比较 streams 和 protocol 两种后端的吞吐量、
+延迟分位数和服务器进程的 CPU 时间。
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import struct
+import time
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler, ModbusTCPServer
+from modbus_slave_full.utils import LatencyHistogram
+
+PDU = b"\x03\x00\x00\x00\x0A"
+
+
+def serve(backend: str, port_queue, stop_event) -> None:
+    """子进程：运行服务器直到收到停止信号，并回报 CPU 时间。"""
+
+    async def run() -> None:
+        datastore = ModbusDataStore()
+        datastore.initialize_slave(1)
+        server = ModbusTCPServer(ModbusHandler(datastore), "127.0.0.1", 0, backend=backend)
+        await server.listen()
+        port_queue.put(server.server.sockets[0].getsockname()[1])
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, stop_event.wait)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        port_queue.put(usage.ru_utime + usage.ru_stime)
+        await server.stop()
+        # 等待服务器端连接处理完成
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+
+async def run_connection(port: int, requests: int, histogram: LatencyHistogram) -> None:
+    """在一条连接上顺序发送请求并记录延迟。"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for transaction_id in range(requests):
+        start = time.perf_counter_ns()
+        writer.write(struct.pack(">HHHB", transaction_id, 0, len(PDU) + 1, 1) + PDU)
+        header = await reader.readexactly(7)
+        await reader.readexactly(struct.unpack_from(">H", header, 4)[0] - 1)
+        histogram.record((time.perf_counter_ns() - start) // 1000)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_clients(port: int, connections: int, requests: int):
+    """同时运行所有连接，返回 (事务/秒, 延迟直方图)。"""
+    histogram = LatencyHistogram()
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(run_connection(port, requests, histogram) for _ in range(connections))
+    )
+    elapsed = time.perf_counter() - start
+    return connections * requests / elapsed, histogram
+
+
+def bench(backend: str, connections: int, requests: int):
+    """对一个后端运行基准测试。"""
+    port_queue = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    process = multiprocessing.Process(target=serve, args=(backend, port_queue, stop_event))
+    process.start()
+    try:
+        port = port_queue.get(timeout=10)
+        tps, histogram = asyncio.run(run_clients(port, connections, requests))
+        stop_event.set()
+        cpu = port_queue.get(timeout=10)
+    finally:
+        stop_event.set()
+        process.join(timeout=10)
+    return tps, histogram, cpu
+
+
+def main(connections: int, requests: int) -> None:
+    """运行基准测试。"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = connections * 2 + 64
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+    print(f"{connections} 个并发连接，每连接 {requests} 个顺序请求")
+    print(
+        f"{'后端':>10} {'事务/秒':>10} {'p50 (us)':>10} {'p99 (us)':>10} "
+        f"{'服务器 CPU (s)':>16} {'CPU us/事务':>12}"
+    )
+    for backend in ("streams", "protocol"):
+        tps, histogram, cpu = bench(backend, connections, requests)
+        per_request = cpu * 1e6 / (connections * requests)
+        print(
+            f"{backend:>10} {tps:>10,.0f} {histogram.percentile(50):>10} "
+            f"{histogram.percentile(99):>10} {cpu:>16.2f} {per_request:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TCP 连接处理后端基准测试")
+    parser.add_argument("--connections", "-c", type=int, default=1000, help="并发连接数")
+    parser.add_argument("--requests", "-n", type=int, default=50, help="每连接请求数")
+    args = parser.parse_args()
+    main(args.connections, args.requests)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""单连接流水线吞吐量基准测试。
+
+客户端在一条 TCP 连接上保持 N 个未完成的请求（流水线深度），
+比较顺序模式和流水线模式下的吞吐量。服务器端通过延迟注入中间件
+模拟每个请求的处理耗时（例如访问慢速后端）。
+"""
+
+import argparse
+import asyncio
+import struct
+import time
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import LatencyInjectionMiddleware, ModbusHandler, ModbusTCPServer
+
+PDU = b"\x03\x00\x00\x00\x0A"
+
+
+async def run_client(port: int, depth: int, requests: int) -> float:
+    """以指定流水线深度发送请求，返回每秒事务数。"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    outstanding = asyncio.Semaphore(depth)
+    done = asyncio.Event()
+    received = 0
+
+    async def receive() -> None:
+        nonlocal received
+        while received < requests:
+            header = await reader.readexactly(7)
+            length = struct.unpack_from(">H", header, 4)[0]
+            await reader.readexactly(length - 1)
+            received += 1
+            outstanding.release()
+        done.set()
+
+    receiver = asyncio.create_task(receive())
+    start = time.perf_counter()
+    for transaction_id in range(requests):
+        await outstanding.acquire()
+        writer.write(
+            struct.pack(">HHHB", transaction_id & 0xFFFF, 0, len(PDU) + 1, 1) + PDU
+        )
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    receiver.cancel()
+    writer.close()
+    await writer.wait_closed()
+    return requests / elapsed
+
+
+async def main(requests: int, delay: float, depths) -> None:
+    """运行基准测试。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    handler = ModbusHandler(datastore)
+    if delay > 0:
+        handler.add_middleware(LatencyInjectionMiddleware(delay))
+
+    print(f"每请求处理延迟: {delay * 1000:.1f} ms，每轮 {requests} 个请求")
+    print(f"{'深度':>6} {'顺序模式 (事务/秒)':>20} {'流水线模式 (事务/秒)':>22}")
+    for depth in depths:
+        results = []
+        for pipelined in (False, True):
+            server = ModbusTCPServer(
+                handler, "127.0.0.1", 0, pipelined=pipelined, max_in_flight=max(depths)
+            )
+            await server.listen()
+            port = server.server.sockets[0].getsockname()[1]
+            results.append(await run_client(port, depth, requests))
+            await server.stop()
+            # 等待服务器端连接处理完成
+            await asyncio.sleep(0.05)
+        print(f"{depth:>6} {results[0]:>20,.0f} {results[1]:>22,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="单连接流水线吞吐量基准测试")
+    parser.add_argument("--requests", "-n", type=int, default=2000, help="每轮请求数")
+    parser.add_argument("--delay", "-d", type=float, default=0.001, help="每请求处理延迟（秒）")
+    parser.add_argument(
+        "--depths", type=str, default="1,2,4,8,16,32", help="流水线深度列表（逗号分隔）"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.delay, [int(d) for d in args.depths.split(",")]))
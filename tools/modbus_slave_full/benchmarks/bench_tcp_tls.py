@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Modbus/TCP Security (TLS) 基准测试。
+
+服务器运行在独立子进程中，同时监听明文 TCP 和 TLS 端口，比较：
+
+- 建立连接的开销：每次新建连接并完成一个请求，分别测试明文 TCP、
+  TLS 完整握手和使用会话票据恢复的 TLS 握手
+- 稳态吞吐量：若干长连接各自顺序发送请求
+
+默认使用测试证书（tests/data/tls），可通过参数指定其它证书。
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import ssl
+import struct
+import time
+from pathlib import Path
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler, ModbusTCPServer
+from modbus_slave_full.protocol.tls import create_server_ssl_context
+from modbus_slave_full.utils import LatencyHistogram
+
+PDU = b"\x03\x00\x00\x00\x0A"
+REQUEST = struct.pack(">HHHB", 1, 0, len(PDU) + 1, 1) + PDU
+CERTS = Path(__file__).resolve().parent.parent / "tests" / "data" / "tls"
+
+
+def serve(certfile: str, keyfile: str, port_queue, stop_event) -> None:
+    """子进程：运行明文和 TLS 服务器直到收到停止信号。"""
+
+    async def run() -> None:
+        datastore = ModbusDataStore()
+        datastore.initialize_slave(1)
+        handler = ModbusHandler(datastore)
+        plain = ModbusTCPServer(handler, "127.0.0.1", 0, backend="protocol")
+        secure = ModbusTCPServer(
+            handler,
+            "127.0.0.1",
+            0,
+            backend="protocol",
+            ssl_context=create_server_ssl_context(certfile, keyfile),
+        )
+        await plain.listen()
+        await secure.listen()
+        port_queue.put(
+            (plain.server.sockets[0].getsockname()[1], secure.server.sockets[0].getsockname()[1])
+        )
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, stop_event.wait)
+        port_queue.put(secure.get_stats()["tls"])
+        await plain.stop()
+        await secure.stop()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+
+def server_cpu(pid: int) -> float:
+    """读取子进程已使用的 CPU 时间（秒）。"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def transact(sock) -> None:
+    """在连接上完成一个请求。"""
+    sock.sendall(REQUEST)
+    received = b""
+    while len(received) < 7 or len(received) < 6 + struct.unpack_from(">H", received, 4)[0]:
+        chunk = sock.recv(512)
+        if not chunk:
+            raise ConnectionError("服务器关闭了连接")
+        received += chunk
+
+
+def connect_loop(port: int, count: int, context=None, resume: bool = False) -> LatencyHistogram:
+    """顺序新建 count 个连接，每个连接完成一个请求后关闭，返回耗时直方图。"""
+    histogram = LatencyHistogram()
+    session = None
+    for _ in range(count):
+        start = time.perf_counter_ns()
+        with socket.create_connection(("127.0.0.1", port)) as raw:
+            raw.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if context is None:
+                transact(raw)
+            else:
+                with context.wrap_socket(
+                    raw, server_hostname="localhost", session=session if resume else None
+                ) as sock:
+                    transact(sock)
+                    if resume:
+                        session = sock.session
+        histogram.record((time.perf_counter_ns() - start) // 1000)
+    return histogram
+
+
+async def steady_state(port: int, connections: int, requests: int, context=None) -> float:
+    """长连接顺序请求，返回每秒事务数。"""
+
+    async def run_connection() -> None:
+        reader, writer = await asyncio.open_connection(
+            "127.0.0.1", port, ssl=context, server_hostname="localhost" if context else None
+        )
+        for _ in range(requests):
+            writer.write(REQUEST)
+            header = await reader.readexactly(7)
+            await reader.readexactly(struct.unpack_from(">H", header, 4)[0] - 1)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_connection() for _ in range(connections)))
+    return connections * requests / (time.perf_counter() - start)
+
+
+def main(args) -> None:
+    """运行基准测试。"""
+    port_queue = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    process = multiprocessing.Process(
+        target=serve, args=(args.certfile, args.keyfile, port_queue, stop_event)
+    )
+    process.start()
+    client = ssl.create_default_context(cafile=args.ca_file)
+    if args.tls12:
+        client.maximum_version = ssl.TLSVersion.TLSv1_2
+    try:
+        plain_port, tls_port = port_queue.get(timeout=10)
+
+        print(f"建立连接开销（{args.handshakes} 个顺序连接，每连接 1 个请求）")
+        print(f"{'模式':>12} {'p50 (us)':>10} {'p99 (us)':>10} {'服务器 CPU us/连接':>20}")
+        for name, port, context, resume in (
+            ("tcp", plain_port, None, False),
+            ("tls-full", tls_port, client, False),
+            ("tls-resumed", tls_port, client, True),
+        ):
+            cpu_before = server_cpu(process.pid)
+            histogram = connect_loop(port, args.handshakes, context, resume)
+            cpu = (server_cpu(process.pid) - cpu_before) * 1e6 / args.handshakes
+            print(
+                f"{name:>12} {histogram.percentile(50):>10} "
+                f"{histogram.percentile(99):>10} {cpu:>20.0f}"
+            )
+
+        print()
+        print(f"稳态吞吐量（{args.connections} 个长连接，每连接 {args.requests} 个顺序请求）")
+        print(f"{'模式':>12} {'事务/秒':>10} {'服务器 CPU us/事务':>20}")
+        total = args.connections * args.requests
+        for name, port, context in (("tcp", plain_port, None), ("tls", tls_port, client)):
+            cpu_before = server_cpu(process.pid)
+            tps = asyncio.run(steady_state(port, args.connections, args.requests, context))
+            cpu = (server_cpu(process.pid) - cpu_before) * 1e6 / total
+            print(f"{name:>12} {tps:>10,.0f} {cpu:>20.1f}")
+
+        stop_event.set()
+        tls_stats = port_queue.get(timeout=10)
+        print()
+        print(
+            f"服务器 TLS 握手 {tls_stats['handshakes']} 次，"
+            f"其中会话恢复 {tls_stats['resumed']} 次"
+        )
+    finally:
+        stop_event.set()
+        process.join(timeout=10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modbus/TCP Security (TLS) 基准测试")
+    parser.add_argument("--certfile", default=str(CERTS / "server.pem"), help="服务器证书")
+    parser.add_argument("--keyfile", default=str(CERTS / "server.key"), help="服务器私钥")
+    parser.add_argument("--ca-file", default=str(CERTS / "ca.pem"), help="客户端信任的 CA 证书")
+    parser.add_argument("--tls12", action="store_true", help="客户端限制为 TLS 1.2")
+    parser.add_argument("--handshakes", type=int, default=500, help="建立连接测试的连接数")
+    parser.add_argument("--connections", "-c", type=int, default=100, help="稳态测试的连接数")
+    parser.add_argument("--requests", "-n", type=int, default=200, help="稳态测试每连接请求数")
+    main(parser.parse_args())
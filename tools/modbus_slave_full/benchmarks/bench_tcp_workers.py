@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""多进程工作模式吞吐量基准测试。
+
+按不同工作进程数启动 `WorkerPool`，用多个客户端进程（每个进程若干连接）
+顺序发送 FC03 请求，统计总吞吐量。吞吐量随工作进程数的扩展受限于 CPU 核数，
+客户端进程也会占用 CPU，建议在核数充足的机器上运行。
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import struct
+import time
+
+from modbus_slave_full.config import Config, SlaveConfig
+from modbus_slave_full.shared_datastore import SharedDataStore
+from modbus_slave_full.workers import WorkerPool, slave_layout
+
+PDU = b"\x03\x00\x00\x00\x0A"
+
+
+def client_process(port: int, connections: int, duration: float, results) -> None:
+    """客户端进程：在指定时间内尽可能多地发送请求。"""
+
+    async def connection() -> int:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        count = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            writer.write(struct.pack(">HHHB", count & 0xFFFF, 0, len(PDU) + 1, 1) + PDU)
+            header = await reader.readexactly(7)
+            await reader.readexactly(struct.unpack_from(">H", header, 4)[0] - 1)
+            count += 1
+        writer.close()
+        return count
+
+    async def run() -> int:
+        return sum(await asyncio.gather(*(connection() for _ in range(connections))))
+
+    results.put(asyncio.run(run()))
+
+
+async def wait_ready(port: int, timeout: float = 30.0) -> None:
+    """等待工作进程开始监听。"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError("工作进程未能启动")
+
+
+async def bench(workers: int, clients: int, connections: int, duration: float) -> float:
+    """运行一轮基准测试，返回每秒事务数。"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    config = Config(slaves=[SlaveConfig(id=1, name="bench")])
+    config.server.tcp.host = "127.0.0.1"
+    config.server.tcp.port = port
+    config.server.tcp.workers = workers
+    config.logging.level = "WARNING"
+    config.plugins.entry_points = False
+
+    datastore = SharedDataStore(slave_layout(config))
+    pool = WorkerPool(config, datastore)
+    task = asyncio.create_task(pool.start())
+    try:
+        await wait_ready(port)
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        processes = [
+            context.Process(target=client_process, args=(port, connections, duration, results))
+            for _ in range(clients)
+        ]
+        for process in processes:
+            process.start()
+        total = 0
+        for _ in processes:
+            total += await asyncio.get_running_loop().run_in_executor(None, results.get)
+        for process in processes:
+            process.join()
+        return total / duration
+    finally:
+        await pool.stop()
+        task.cancel()
+        datastore.close()
+
+
+def main(worker_counts, clients: int, connections: int, duration: float) -> None:
+    """运行基准测试。"""
+    print(f"CPU 核数: {os.cpu_count()}，客户端进程 {clients} 个 × {connections} 连接")
+    print(f"{'工作进程':>8} {'事务/秒':>12} {'相对单进程':>10}")
+    baseline = None
+    for workers in worker_counts:
+        tps = asyncio.run(bench(workers, clients, connections, duration))
+        baseline = baseline or tps
+        print(f"{workers:>8} {tps:>12,.0f} {tps / baseline:>10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="多进程工作模式吞吐量基准测试")
+    parser.add_argument("--workers", type=str, default="1,2,4", help="工作进程数列表（逗号分隔）")
+    parser.add_argument("--clients", type=int, default=2, help="客户端进程数")
+    parser.add_argument("--connections", "-c", type=int, default=16, help="每个客户端进程的连接数")
+    parser.add_argument("--duration", "-d", type=float, default=3.0, help="每轮持续时间（秒）")
+    args = parser.parse_args()
+    main(
+        [int(w) for w in args.workers.split(",")],
+        args.clients,
+        args.connections,
+        args.duration,
+    )
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Modbus UDP 与 TCP 请求速率对比基准测试。
+
+服务器运行在独立子进程中，同时监听 TCP 和 UDP。若干客户端各自顺序发送 FC03 请求
+（每个客户端同时只有一个请求未完成），比较两种传输的吞吐量、延迟分位数和
+服务器进程的 CPU 时间。TCP 客户端每个使用一条长连接；`--reconnect` 时每个请求
+新建一条 TCP 连接，模拟链路不稳定时频繁重连的主站。
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import struct
+import time
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler, ModbusTCPServer, ModbusUDPServer
+from modbus_slave_full.utils import LatencyHistogram
+
+PDU = b"\x03\x00\x00\x00\x0A"
+# UDP 请求超时（秒），超时视为丢包并重发
+UDP_TIMEOUT = 1.0
+
+
+def serve(port_queue, stop_event) -> None:
+    """子进程：运行 TCP 和 UDP 服务器直到收到停止信号。"""
+
+    async def run() -> None:
+        datastore = ModbusDataStore()
+        datastore.initialize_slave(1)
+        handler = ModbusHandler(datastore)
+        tcp = ModbusTCPServer(handler, "127.0.0.1", 0, backend="protocol")
+        udp = ModbusUDPServer(handler, "127.0.0.1", 0)
+        await tcp.listen()
+        await udp.listen()
+        port_queue.put((tcp.server.sockets[0].getsockname()[1], udp.address[1]))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, stop_event.wait)
+        await tcp.stop()
+        await udp.stop()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+
+def server_cpu(pid: int) -> float:
+    """读取子进程已使用的 CPU 时间（秒）。"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class UDPClient(asyncio.DatagramProtocol):
+    """UDP 客户端：一次只有一个请求未完成。"""
+
+    def __init__(self):
+        self.waiter = None
+
+    def datagram_received(self, data, addr):
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(data)
+
+
+async def run_udp(port: int, requests: int, histogram: LatencyHistogram) -> int:
+    """在一个 UDP 端点上顺序发送请求，返回丢包（超时重发）次数。"""
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(
+        UDPClient, remote_addr=("127.0.0.1", port)
+    )
+    lost = 0
+    try:
+        for transaction_id in range(requests):
+            request = struct.pack(">HHHB", transaction_id, 0, len(PDU) + 1, 1) + PDU
+            start = time.perf_counter_ns()
+            while True:
+                client.waiter = loop.create_future()
+                transport.sendto(request)
+                try:
+                    await asyncio.wait_for(client.waiter, UDP_TIMEOUT)
+                    break
+                except asyncio.TimeoutError:
+                    lost += 1
+            histogram.record((time.perf_counter_ns() - start) // 1000)
+    finally:
+        transport.close()
+    return lost
+
+
+async def tcp_transaction(reader, writer, transaction_id: int) -> None:
+    """在 TCP 连接上完成一个请求。"""
+    writer.write(struct.pack(">HHHB", transaction_id, 0, len(PDU) + 1, 1) + PDU)
+    header = await reader.readexactly(7)
+    await reader.readexactly(struct.unpack_from(">H", header, 4)[0] - 1)
+
+
+async def run_tcp(port: int, requests: int, histogram: LatencyHistogram, reconnect: bool) -> int:
+    """在 TCP 连接上顺序发送请求。"""
+    reader = writer = None
+    try:
+        for transaction_id in range(requests):
+            start = time.perf_counter_ns()
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await tcp_transaction(reader, writer, transaction_id)
+            if reconnect:
+                writer.close()
+                await writer.wait_closed()
+                writer = None
+            histogram.record((time.perf_counter_ns() - start) // 1000)
+    finally:
+        if writer is not None:
+            writer.close()
+    return 0
+
+
+async def run_clients(transport: str, port: int, clients: int, requests: int):
+    """同时运行所有客户端，返回 (事务/秒, 延迟直方图, 丢包数)。"""
+    histogram = LatencyHistogram()
+    start = time.perf_counter()
+    if transport == "udp":
+        runs = (run_udp(port, requests, histogram) for _ in range(clients))
+    else:
+        reconnect = transport == "tcp-reconnect"
+        runs = (run_tcp(port, requests, histogram, reconnect) for _ in range(clients))
+    lost = sum(await asyncio.gather(*runs))
+    elapsed = time.perf_counter() - start
+    return clients * requests / elapsed, histogram, lost
+
+
+def main(clients: int, requests: int, reconnect: bool) -> None:
+    """运行基准测试。"""
+    port_queue = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    process = multiprocessing.Process(target=serve, args=(port_queue, stop_event))
+    process.start()
+    transports = ["tcp", "udp"] + (["tcp-reconnect"] if reconnect else [])
+    try:
+        tcp_port, udp_port = port_queue.get(timeout=10)
+        print(f"{clients} 个客户端，每客户端 {requests} 个顺序请求")
+        print(
+            f"{'传输':>14} {'事务/秒':>10} {'p50 (us)':>10} {'p99 (us)':>10} "
+            f"{'CPU us/事务':>12} {'丢包':>6}"
+        )
+        for transport in transports:
+            port = udp_port if transport == "udp" else tcp_port
+            cpu_before = server_cpu(process.pid)
+            tps, histogram, lost = asyncio.run(run_clients(transport, port, clients, requests))
+            cpu = server_cpu(process.pid) - cpu_before
+            per_request = cpu * 1e6 / (clients * requests)
+            print(
+                f"{transport:>14} {tps:>10,.0f} {histogram.percentile(50):>10} "
+                f"{histogram.percentile(99):>10} {per_request:>12.1f} {lost:>6}"
+            )
+    finally:
+        stop_event.set()
+        process.join(timeout=10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modbus UDP 与 TCP 请求速率对比基准测试")
+    parser.add_argument("--clients", "-c", type=int, default=100, help="并发客户端数")
+    parser.add_argument("--requests", "-n", type=int, default=200, help="每客户端请求数")
+    parser.add_argument(
+        "--reconnect", action="store_true", help="同时测试每个请求新建 TCP 连接的情况"
+    )
+    args = parser.parse_args()
+    main(args.clients, args.requests, args.reconnect)
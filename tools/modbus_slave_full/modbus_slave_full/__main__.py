@@ -12,9 +12,19 @@ from pathlib import Path
 
 from .config import Config
 from .datastore import ModbusDataStore
-from .protocol import ModbusHandler, ModbusRTUServer, ModbusTCPServer
+from .protocol import ModbusUDPServer
+from .shared_datastore import SharedDataStore
 from .utils import setup_logging
+from .utils.event_loop import LOOP_BACKENDS, event_loop_info, install_event_loop_policy
 from .web import ModbusWebServer
+from .workers import (
+    WorkerPool,
+    create_gateway,
+    create_handler,
+    create_rtu_servers,
+    create_tcp_servers,
+    slave_layout,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +41,11 @@ class ModbusServerApp:
         self.config = config
         self.datastore = None
         self.handler = None
-        self.tcp_server = None
-        self.rtu_server = None
+        self.tcp_servers = []
+        self.worker_pool = None
+        self.udp_server = None
+        self.rtu_servers = []
+        self.gateway = None
         self.web_server = None
         self.tasks = []
         self.running = False
@@ -43,54 +56,98 @@ class ModbusServerApp:
 
         # 初始化数据存储
         data_file = Path(self.config.data.data_file) if self.config.data.data_file else None
-        self.datastore = ModbusDataStore(
-            data_file=data_file, history_max_size=self.config.data.history_max_size
-        )
-
-        # 初始化从站
-        for slave in self.config.slaves:
-            self.datastore.initialize_slave(
-                slave.id,
-                slave.coils,
-                slave.discrete_inputs,
-                slave.holding_registers,
-                slave.input_registers,
+        tcp_config = self.config.server.tcp
+        use_workers = tcp_config.enabled and tcp_config.workers > 1
+        if use_workers:
+            # 多进程模式：寄存器映像放在共享内存中，由所有工作进程共享
+            self.datastore = SharedDataStore(
+                slave_layout(self.config),
+                data_file=data_file,
+                history_max_size=self.config.data.history_max_size,
             )
+        else:
+            self.datastore = ModbusDataStore(
+                data_file=data_file, history_max_size=self.config.data.history_max_size
+            )
+
+            # 初始化从站
+            for slave in self.config.slaves:
+                self.datastore.initialize_slave(
+                    slave.id,
+                    slave.coils,
+                    slave.discrete_inputs,
+                    slave.holding_registers,
+                    slave.input_registers,
+                )
 
         # 加载数据文件
         await self.datastore.load_from_file()
 
         # 初始化处理器
-        self.handler = ModbusHandler(self.datastore)
+        self.handler = create_handler(self.config, self.datastore)
+
+        # 启动 TCP 到 RTU 网关（转发的单元ID不访问本地数据存储）
+        gateway_config = self.config.server.gateway
+        if gateway_config.enabled and use_workers:
+            logger.warning("网关不支持多进程模式 (server.tcp.workers > 1)，已忽略")
+        elif gateway_config.enabled:
+            # 下游串口打开失败时转发的单元ID返回异常码 0x0A
+            self.gateway = create_gateway(self.handler, gateway_config)
+            try:
+                await self.gateway.open(
+                    gateway_config.port,
+                    baudrate=gateway_config.baudrate,
+                    bytesize=gateway_config.bytesize,
+                    parity=gateway_config.parity,
+                    stopbits=gateway_config.stopbits,
+                    timeout=gateway_config.timeout,
+                    t35=gateway_config.t35,
+                )
+            except (ImportError, OSError) as e:
+                logger.warning(f"网关下游串口打开失败: {e}")
 
         # 启动 TCP 服务器
-        if self.config.server.tcp.enabled:
-            self.tcp_server = ModbusTCPServer(
-                self.handler, self.config.server.tcp.host, self.config.server.tcp.port
+        if use_workers:
+            self.worker_pool = WorkerPool(self.config, self.datastore, local_handler=self.handler)
+            task = asyncio.create_task(self.worker_pool.start())
+            self.tasks.append(task)
+        else:
+            # 主监听和附加监听共享同一个处理器和数据存储
+            self.tcp_servers = create_tcp_servers(self.handler, tcp_config)
+            for server in self.tcp_servers:
+                self.tasks.append(asyncio.create_task(server.start()))
+
+        # 启动 UDP 服务器
+        udp_config = self.config.server.udp
+        if udp_config.enabled:
+            self.udp_server = ModbusUDPServer(
+                self.handler,
+                udp_config.host,
+                udp_config.port,
+                framing=udp_config.framing,
+                batch_size=udp_config.batch_size,
+                max_queue=udp_config.max_queue,
             )
-            task = asyncio.create_task(self.tcp_server.start())
+            task = asyncio.create_task(self.udp_server.start())
             self.tasks.append(task)
 
-        # 启动 RTU 服务器
-        if self.config.server.rtu.enabled:
-            try:
-                self.rtu_server = ModbusRTUServer(
-                    self.handler,
-                    self.config.server.rtu.port,
-                    self.config.server.rtu.baudrate,
-                    self.config.server.rtu.bytesize,
-                    self.config.server.rtu.parity,
-                    self.config.server.rtu.stopbits,
-                    self.config.server.rtu.timeout,
-                )
-                task = asyncio.create_task(self.rtu_server.start())
-                self.tasks.append(task)
-            except ImportError as e:
-                logger.warning(f"RTU 服务器启动失败: {e}")
+        # 启动 RTU 服务器（每个串口一个，共享同一个处理器和数据存储）
+        try:
+            self.rtu_servers = create_rtu_servers(self.handler, self.config.server.rtu)
+        except ImportError as e:
+            logger.warning(f"RTU 服务器启动失败: {e}")
+        for server in self.rtu_servers:
+            self.tasks.append(asyncio.create_task(server.start()))
 
         # 启动 Web 服务器
         if self.config.web.enabled:
-            self.web_server = ModbusWebServer(self.datastore, self.handler, self.config.web)
+            # 多进程模式下统计信息由工作进程池合并
+            stats_source = self.worker_pool or self.handler
+            self.web_server = ModbusWebServer(self.datastore, stats_source, self.config.web)
+            for server in self.rtu_servers:
+                # 监听模式的串口通过 /ws/monitor 推送总线上的帧
+                if getattr(server, "monitor", None) is not None:
+                    self.web_server.add_monitor(server.monitor)
             task = asyncio.create_task(self.web_server.start())
             self.tasks.append(task)
 
@@ -99,7 +156,8 @@ class ModbusServerApp:
             task = asyncio.create_task(self._auto_save_loop())
             self.tasks.append(task)
 
-        logger.info("Modbus 服务器启动完成")
+        loop_info = event_loop_info()
+        logger.info(f"Modbus 服务器启动完成 (事件循环: {loop_info['class']})")
 
         # 等待任务
         try:
@@ -120,16 +178,24 @@ class ModbusServerApp:
             task.cancel()
 
         # 停止服务器
-        if self.tcp_server:
-            await self.tcp_server.stop()
-        if self.rtu_server:
-            await self.rtu_server.stop()
+        for server in self.tcp_servers:
+            await server.stop()
+        if self.worker_pool:
+            await self.worker_pool.stop()
+        if self.udp_server:
+            await self.udp_server.stop()
+        for server in self.rtu_servers:
+            await server.stop()
+        if self.gateway:
+            await self.gateway.stop()
         if self.web_server:
             await self.web_server.stop()
 
         # 保存数据
         if self.datastore:
             await self.datastore.save_to_file()
+            if isinstance(self.datastore, SharedDataStore):
+                self.datastore.close()
 
         logger.info("服务器已关闭")
 
@@ -148,6 +214,12 @@ def parse_args():
     parser.add_argument(
         "--config", "-c", type=str, default="config.yaml", help="配置文件路径 (默认: config.yaml)"
     )
+    parser.add_argument(
+        "--loop",
+        choices=LOOP_BACKENDS,
+        default=None,
+        help="事件循环后端 (默认使用配置文件中的 server.event_loop)",
+    )
     parser.add_argument("--version", "-v", action="store_true", help="显示版本信息")
     return parser.parse_args()
 
@@ -191,27 +263,45 @@ def main():
         backup_count=config.logging.backup_count,
     )
 
-    # 创建应用
+    # 选择事件循环
+    if args.loop:
+        config.server.event_loop = args.loop
+    backend = install_event_loop_policy(config.server.event_loop)
+    logger.info(f"事件循环后端: {backend}")
+
+    # 运行应用
     app = ModbusServerApp(config)
+    try:
+        asyncio.run(run_app(app))
+    except KeyboardInterrupt:
+        logger.info("用户中断")
+
 
-    # 设置信号处理
-    loop = asyncio.get_event_loop()
+async def run_app(app: ModbusServerApp) -> None:
+    """在当前事件循环中运行应用，收到停止信号时关闭。
+
+    Args:
+        app: 服务器应用
+    """
+    loop = asyncio.get_running_loop()
+    main_task = asyncio.current_task()
 
     def signal_handler():
         logger.info("收到停止信号")
-        asyncio.create_task(app.stop())
+        # 取消主任务，由 finally 中的 stop() 完成关闭
+        main_task.cancel()
 
     for sig in (signal.SIGTERM, signal.SIGINT):
-        loop.add_signal_handler(sig, signal_handler)
+        try:
+            loop.add_signal_handler(sig, signal_handler)
+        except NotImplementedError:
+            # Windows 事件循环不支持信号处理器
+            pass
 
-    # 运行应用
     try:
-        loop.run_until_complete(app.start())
-    except KeyboardInterrupt:
-        logger.info("用户中断")
+        await app.start()
     finally:
-        loop.run_until_complete(app.stop())
-        loop.close()
+        await app.stop()
 
 
 if __name__ == "__main__":
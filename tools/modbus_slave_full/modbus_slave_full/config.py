@@ -4,13 +4,46 @@
 """
 
 import logging
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 import yaml
 
 
+@dataclass
+class TLSConfig:
+    """Modbus/TCP Security (TLS) 配置。"""
+
+    enabled: bool = False
+    certfile: str = ""
+    keyfile: str = ""
+    ca_file: str = ""
+    require_client_cert: bool = False
+    session_tickets: int = 2
+    # 角色到允许写入的从站ID列表（"*" 表示全部）的映射，为空时不按角色限制
+    write_roles: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class TCPListenerConfig:
+    """附加 TCP 监听配置（一台虚拟设备或一组设备）。
+
+    其余参数（后端、帧格式、连接限制、TLS 等）继承 `TCPConfig`。
+    """
+
+    port: int = 502
+    host: str = ""
+    name: str = ""
+    framing: str = ""
+    # 所有单元ID映射到的从站ID
+    slave: Optional[int] = None
+    # 按原单元ID访问的从站集合
+    slaves: List[int] = field(default_factory=list)
+    # 单元ID 到从站ID 的映射
+    unit_map: Dict[int, int] = field(default_factory=dict)
+
+
 @dataclass
 class TCPConfig:
     """TCP 服务器配置。"""
@@ -18,6 +51,63 @@ class TCPConfig:
     enabled: bool = True
     host: str = "0.0.0.0"
     port: int = 5020
+    pipelined: bool = False
+    max_in_flight: int = 16
+    backend: str = "streams"
+    framing: str = "mbap"
+    workers: int = 1
+    # 连接准入控制（0 表示不限制/不启用）
+    max_connections: int = 1024
+    max_connections_per_ip: int = 0
+    accept_rate: float = 0.0
+    accept_burst: int = 0
+    idle_timeout: float = 300.0
+    read_timeout: float = 10.0
+    write_buffer_high: int = 65536
+    write_buffer_low: int = 16384
+    tls: TLSConfig = field(default_factory=TLSConfig)
+    listeners: List[TCPListenerConfig] = field(default_factory=list)
+
+
+@dataclass
+class UDPConfig:
+    """UDP 服务器配置。"""
+
+    enabled: bool = False
+    host: str = "0.0.0.0"
+    port: int = 5020
+    framing: str = "mbap"
+    batch_size: int = 64
+    max_queue: int = 1024
+
+
+@dataclass
+class RTUPortConfig:
+    """附加 RTU 串口配置（一条 RS-485 总线）。
+
+    串口参数和时序为 None 时继承 `RTUConfig`。
+    """
+
+    port: str = "/dev/ttyUSB1"
+    name: str = ""
+    mode: Optional[str] = None
+    baudrate: Optional[int] = None
+    bytesize: Optional[int] = None
+    parity: Optional[str] = None
+    stopbits: Optional[int] = None
+    t15: Optional[float] = None
+    t35: Optional[float] = None
+    turnaround_delay: Optional[float] = None
+    # 监听模式：只接收不发送，记录总线上的所有帧（不继承主串口）
+    monitor: bool = False
+    # 监听模式的抓包文件路径，为空时不写文件
+    capture_file: str = ""
+    # 所有单元ID映射到的从站ID
+    slave: Optional[int] = None
+    # 按原单元ID访问的从站集合
+    slaves: List[int] = field(default_factory=list)
+    # 单元ID 到从站ID 的映射
+    unit_map: Dict[int, int] = field(default_factory=dict)
 
 
 @dataclass
@@ -26,11 +116,50 @@ class RTUConfig:
 
     enabled: bool = True
     port: str = "/dev/ttyUSB0"
+    # 串口协议: rtu / ascii
+    mode: str = "rtu"
     baudrate: int = 9600
     bytesize: int = 8
     parity: str = "N"
     stopbits: int = 1
     timeout: float = 1.0
+    # 帧内最大字符间隔 T1.5 和帧间静默 T3.5（秒），0 表示按波特率计算
+    t15: float = 0.0
+    t35: float = 0.0
+    # 收到请求到发送响应的最小间隔（秒）
+    turnaround_delay: float = 0.0
+    # 监听模式：只接收不发送，记录总线上的所有帧
+    monitor: bool = False
+    # 监听模式的抓包文件路径，为空时不写文件
+    capture_file: str = ""
+    ports: List[RTUPortConfig] = field(default_factory=list)
+
+
+@dataclass
+class GatewayConfig:
+    """TCP 到 RTU 网关配置：指定单元ID的请求转发到下游 RTU 总线。"""
+
+    enabled: bool = False
+    port: str = "/dev/ttyUSB1"
+    baudrate: int = 9600
+    bytesize: int = 8
+    parity: str = "N"
+    stopbits: int = 1
+    # 帧间静默 T3.5（秒），0 表示按波特率计算
+    t35: float = 0.0
+    # 按原单元ID转发的单元ID列表
+    units: List[int] = field(default_factory=list)
+    # 单元ID 到下游从站地址的映射
+    unit_map: Dict[int, int] = field(default_factory=dict)
+    # 下游从站响应超时（秒）
+    timeout: float = 0.5
+    # 请求总超时（排队 + 总线事务，秒）
+    request_timeout: float = 2.0
+    # 从站超时后暂停访问的时间（秒），连续超时时加倍，最长 max_backoff
+    backoff: float = 1.0
+    max_backoff: float = 30.0
+    # 每个客户端最多排队的请求数
+    queue_size: int = 32
 
 
 @dataclass
@@ -38,7 +167,37 @@ class ServerConfig:
     """服务器配置。"""
 
     tcp: TCPConfig = field(default_factory=TCPConfig)
+    udp: UDPConfig = field(default_factory=UDPConfig)
     rtu: RTUConfig = field(default_factory=RTUConfig)
+    gateway: GatewayConfig = field(default_factory=GatewayConfig)
+    event_loop: str = "auto"
+
+
+@dataclass
+class DeviceIdentificationConfig:
+    """设备标识配置 (FC43/14 读设备标识)。"""
+
+    vendor_name: str = "clint"
+    product_code: str = "modbus-slave-full"
+    revision: str = "1.0.0"
+    vendor_url: str = ""
+    product_name: str = "Modbus Slave Full"
+    model_name: str = ""
+    user_application_name: str = ""
+    extended: Dict[int, str] = field(default_factory=dict)
+
+    def to_objects(self) -> Dict[int, str]:
+        """转换为对象ID 到对象值的映射（省略空的常规对象）。"""
+        objects = {0x00: self.vendor_name, 0x01: self.product_code, 0x02: self.revision}
+        regular = {
+            0x03: self.vendor_url,
+            0x04: self.product_name,
+            0x05: self.model_name,
+            0x06: self.user_application_name,
+        }
+        objects.update({object_id: value for object_id, value in regular.items() if value})
+        objects.update(self.extended)
+        return objects
 
 
 @dataclass
@@ -51,6 +210,9 @@ class SlaveConfig:
     discrete_inputs: int = 100
     holding_registers: int = 100
     input_registers: int = 100
+    identification: DeviceIdentificationConfig = field(
+        default_factory=DeviceIdentificationConfig
+    )
 
 
 @dataclass
@@ -93,6 +255,14 @@ class LoggingConfig:
     backup_count: int = 5
 
 
+@dataclass
+class PluginConfig:
+    """功能码插件配置。"""
+
+    entry_points: bool = True
+    modules: List[str] = field(default_factory=list)
+
+
 @dataclass
 class Config:
     """完整配置。"""
@@ -102,6 +272,7 @@ class Config:
     web: WebConfig = field(default_factory=WebConfig)
     data: DataConfig = field(default_factory=DataConfig)
     logging: LoggingConfig = field(default_factory=LoggingConfig)
+    plugins: PluginConfig = field(default_factory=PluginConfig)
 
     @classmethod
     def from_yaml(cls, path: Path) -> "Config":
@@ -128,15 +299,31 @@ class Config:
 
         # 解析服务器配置
         server_data = data.get("server", {})
-        tcp_config = TCPConfig(**server_data.get("tcp", {}))
-        rtu_config = RTUConfig(**server_data.get("rtu", {}))
-        server_config = ServerConfig(tcp=tcp_config, rtu=rtu_config)
+        tcp_data = dict(server_data.get("tcp", {}))
+        tcp_config = TCPConfig(
+            **{k: v for k, v in tcp_data.items() if k not in ("tls", "listeners")}
+        )
+        tcp_config.tls = TLSConfig(**tcp_data.get("tls", {}))
+        tcp_config.listeners = [
+            TCPListenerConfig(**listener) for listener in tcp_data.get("listeners", [])
+        ]
+        udp_config = UDPConfig(**server_data.get("udp", {}))
+        rtu_data = dict(server_data.get("rtu", {}))
+        rtu_config = RTUConfig(**{k: v for k, v in rtu_data.items() if k != "ports"})
+        rtu_config.ports = [RTUPortConfig(**port) for port in rtu_data.get("ports", [])]
+        server_config = ServerConfig(
+            tcp=tcp_config,
+            udp=udp_config,
+            rtu=rtu_config,
+            gateway=GatewayConfig(**server_data.get("gateway", {})),
+            event_loop=server_data.get("event_loop", "auto"),
+        )
 
         # 解析从站配置
         slaves_data = data.get("slaves", [])
         if not slaves_data:
             slaves_data = [{"id": 1, "name": "主设备"}]
-        slaves = [SlaveConfig(**slave) for slave in slaves_data]
+        slaves = [cls._parse_slave(slave) for slave in slaves_data]
 
         # 解析 Web 配置
         web_data = data.get("web", {})
@@ -151,14 +338,30 @@ class Config:
         # 解析日志配置
         logging_config = LoggingConfig(**data.get("logging", {}))
 
+        # 解析插件配置
+        plugin_config = PluginConfig(**data.get("plugins", {}))
+
         return cls(
             server=server_config,
             slaves=slaves,
             web=web_config,
             data=data_config,
             logging=logging_config,
+            plugins=plugin_config,
         )
 
+    @staticmethod
+    def _parse_slave(slave_data: Dict) -> SlaveConfig:
+        """解析单个从站配置。"""
+        slave_data = dict(slave_data)
+        ident_data = dict(slave_data.pop("identification", None) or {})
+        extended = {
+            int(object_id, 0) if isinstance(object_id, str) else int(object_id): str(value)
+            for object_id, value in (ident_data.pop("extended", None) or {}).items()
+        }
+        identification = DeviceIdentificationConfig(**ident_data, extended=extended)
+        return SlaveConfig(**slave_data, identification=identification)
+
     @classmethod
     def get_default(cls) -> "Config":
         """获取默认配置。
@@ -182,16 +385,67 @@ class Config:
                     "enabled": self.server.tcp.enabled,
                     "host": self.server.tcp.host,
                     "port": self.server.tcp.port,
+                    "pipelined": self.server.tcp.pipelined,
+                    "max_in_flight": self.server.tcp.max_in_flight,
+                    "backend": self.server.tcp.backend,
+                    "framing": self.server.tcp.framing,
+                    "workers": self.server.tcp.workers,
+                    "max_connections": self.server.tcp.max_connections,
+                    "max_connections_per_ip": self.server.tcp.max_connections_per_ip,
+                    "accept_rate": self.server.tcp.accept_rate,
+                    "accept_burst": self.server.tcp.accept_burst,
+                    "idle_timeout": self.server.tcp.idle_timeout,
+                    "read_timeout": self.server.tcp.read_timeout,
+                    "write_buffer_high": self.server.tcp.write_buffer_high,
+                    "write_buffer_low": self.server.tcp.write_buffer_low,
+                    "tls": {
+                        "enabled": self.server.tcp.tls.enabled,
+                        "certfile": self.server.tcp.tls.certfile,
+                        "keyfile": self.server.tcp.tls.keyfile,
+                        "ca_file": self.server.tcp.tls.ca_file,
+                        "require_client_cert": self.server.tcp.tls.require_client_cert,
+                        "session_tickets": self.server.tcp.tls.session_tickets,
+                        "write_roles": dict(self.server.tcp.tls.write_roles),
+                    },
+                    "listeners": [
+                        {
+                            "port": listener.port,
+                            "host": listener.host,
+                            "name": listener.name,
+                            "framing": listener.framing,
+                            "slave": listener.slave,
+                            "slaves": list(listener.slaves),
+                            "unit_map": dict(listener.unit_map),
+                        }
+                        for listener in self.server.tcp.listeners
+                    ],
+                },
+                "udp": {
+                    "enabled": self.server.udp.enabled,
+                    "host": self.server.udp.host,
+                    "port": self.server.udp.port,
+                    "framing": self.server.udp.framing,
+                    "batch_size": self.server.udp.batch_size,
+                    "max_queue": self.server.udp.max_queue,
                 },
                 "rtu": {
                     "enabled": self.server.rtu.enabled,
                     "port": self.server.rtu.port,
+                    "mode": self.server.rtu.mode,
                     "baudrate": self.server.rtu.baudrate,
                     "bytesize": self.server.rtu.bytesize,
                     "parity": self.server.rtu.parity,
                     "stopbits": self.server.rtu.stopbits,
                     "timeout": self.server.rtu.timeout,
+                    "t15": self.server.rtu.t15,
+                    "t35": self.server.rtu.t35,
+                    "turnaround_delay": self.server.rtu.turnaround_delay,
+                    "monitor": self.server.rtu.monitor,
+                    "capture_file": self.server.rtu.capture_file,
+                    "ports": [asdict(port) for port in self.server.rtu.ports],
                 },
+                "gateway": asdict(self.server.gateway),
+                "event_loop": self.server.event_loop,
             },
             "slaves": [
                 {
@@ -201,6 +455,16 @@ class Config:
                     "discrete_inputs": slave.discrete_inputs,
                     "holding_registers": slave.holding_registers,
                     "input_registers": slave.input_registers,
+                    "identification": {
+                        "vendor_name": slave.identification.vendor_name,
+                        "product_code": slave.identification.product_code,
+                        "revision": slave.identification.revision,
+                        "vendor_url": slave.identification.vendor_url,
+                        "product_name": slave.identification.product_name,
+                        "model_name": slave.identification.model_name,
+                        "user_application_name": slave.identification.user_application_name,
+                        "extended": dict(slave.identification.extended),
+                    },
                 }
                 for slave in self.slaves
             ],
@@ -227,6 +491,10 @@ class Config:
                 "max_size": self.logging.max_size,
                 "backup_count": self.logging.backup_count,
             },
+            "plugins": {
+                "entry_points": self.plugins.entry_points,
+                "modules": list(self.plugins.modules),
+            },
         }
 
         with open(path, "w", encoding="utf-8") as f:
@@ -10,7 +10,7 @@ import logging
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -338,6 +338,67 @@ class ModbusDataStore:
             self._modified = True
             return True
 
+    async def read_holding_register_blocks(
+        self, slave_id: int, blocks: Sequence[Tuple[int, int]]
+    ) -> Optional[List[List[int]]]:
+        """在一次加锁内批量读取多个保持寄存器区块。
+
+        Args:
+            slave_id: 从站ID
+            blocks: (起始地址, 数量) 列表
+
+        Returns:
+            每个区块的寄存器列表；任一区块越界时返回 None
+        """
+        async with self._lock:
+            slave = self.slaves.get(slave_id)
+            if not slave:
+                return None
+            registers = slave.holding_registers
+            size = len(registers)
+            for address, count in blocks:
+                if address + count > size:
+                    return None
+            return [registers[address : address + count] for address, count in blocks]
+
+    async def write_holding_register_blocks(
+        self,
+        slave_id: int,
+        blocks: Sequence[Tuple[int, Sequence[int]]],
+        source: str = "unknown",
+    ) -> bool:
+        """在一次加锁内批量写入多个保持寄存器区块。
+
+        先校验全部区块再写入，任一区块越界时不做任何修改。
+
+        Args:
+            slave_id: 从站ID
+            blocks: (起始地址, 值列表) 列表
+            source: 来源
+
+        Returns:
+            是否成功
+        """
+        async with self._lock:
+            slave = self.slaves.get(slave_id)
+            if not slave:
+                return False
+            registers = slave.holding_registers
+            size = len(registers)
+            for address, values in blocks:
+                if address + len(values) > size:
+                    return False
+            for address, values in blocks:
+                for i, value in enumerate(values):
+                    old_value = registers[address + i]
+                    registers[address + i] = value & 0xFFFF
+                    self._add_history(
+                        slave_id, "holding_registers", address + i, old_value, value & 0xFFFF,
+                        source,
+                    )
+            self._modified = True
+            return True
+
     def _add_history(
         self, slave_id: int, data_type: str, address: int, old_value: any, new_value: any, source: str
     ) -> None:
@@ -383,26 +444,29 @@ class ModbusDataStore:
         if not self.data_file or not self._modified:
             return
 
+        # 锁内只取快照，序列化和写文件在锁外进行，不阻塞其它读写
         async with self._lock:
             data = {
                 "slaves": {
                     slave_id: {
-                        "coils": block.coils,
-                        "discrete_inputs": block.discrete_inputs,
-                        "holding_registers": block.holding_registers,
-                        "input_registers": block.input_registers,
+                        "coils": block.coils[:],
+                        "discrete_inputs": block.discrete_inputs[:],
+                        "holding_registers": block.holding_registers[:],
+                        "input_registers": block.input_registers[:],
                     }
                     for slave_id, block in self.slaves.items()
                 }
             }
+            # 写文件期间的修改重新设置标志，由下一次保存写入
+            self._modified = False
 
-            try:
-                with open(self.data_file, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2)
-                self._modified = False
-                logger.info(f"数据已保存到 {self.data_file}")
-            except Exception as e:
-                logger.error(f"保存数据失败: {e}")
+        try:
+            with open(self.data_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            logger.info(f"数据已保存到 {self.data_file}")
+        except Exception as e:
+            self._modified = True
+            logger.error(f"保存数据失败: {e}")
 
     async def load_from_file(self) -> None:
         """从文件加载数据。"""
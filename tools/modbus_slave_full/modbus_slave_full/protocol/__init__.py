@@ -1,14 +1,28 @@
 """协议包初始化文件。"""
 
+from .ascii import ModbusASCIIServer
 from .handlers import ModbusHandler
+from .middleware import (
+    AuditMiddleware,
+    LatencyInjectionMiddleware,
+    RoleAccessMiddleware,
+    UnitAccessMiddleware,
+)
 from .rtu import ModbusRTUServer
 from .tcp import ModbusTCPServer
+from .udp import ModbusUDPServer
 from .utils import calculate_crc16, verify_crc16
 
 __all__ = [
     "ModbusHandler",
     "ModbusTCPServer",
+    "ModbusUDPServer",
     "ModbusRTUServer",
+    "ModbusASCIIServer",
+    "AuditMiddleware",
+    "LatencyInjectionMiddleware",
+    "RoleAccessMiddleware",
+    "UnitAccessMiddleware",
     "calculate_crc16",
     "verify_crc16",
 ]
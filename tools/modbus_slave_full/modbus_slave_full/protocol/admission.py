@@ -0,0 +1,248 @@
+"""TCP 连接准入控制。
+
+限制全局和单个来源 IP 的并发连接数，按令牌桶限制新连接接受速率，
+并统计连接数、拒绝次数、超时和写缓冲背压事件。
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 拒绝原因
+REJECT_MAX_CONNECTIONS = "max_connections"
+REJECT_MAX_PER_IP = "max_connections_per_ip"
+REJECT_ACCEPT_RATE = "accept_rate"
+
+# 超时类型
+TIMEOUT_IDLE = "idle"
+TIMEOUT_READ = "read"
+
+
+@dataclass
+class ConnectionLimits:
+    """连接限制参数，0 表示不限制/不启用。"""
+
+    max_connections: int = 1024
+    max_connections_per_ip: int = 0
+    accept_rate: float = 0.0
+    accept_burst: int = 0
+    idle_timeout: float = 300.0
+    read_timeout: float = 10.0
+    write_buffer_high: int = 65536
+    write_buffer_low: int = 16384
+
+
+class TokenBucket:
+    """令牌桶。"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        """初始化令牌桶。
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发数量）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def consume(self, now: Optional[float] = None) -> bool:
+        """尝试取出一个令牌。
+
+        Args:
+            now: 当前时间（`time.monotonic()`），默认自动获取
+
+        Returns:
+            是否取到令牌
+        """
+        if now is None:
+            now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class ConnectionLimiter:
+    """连接准入控制器。"""
+
+    def __init__(self, limits: Optional[ConnectionLimits] = None):
+        """初始化准入控制器。
+
+        Args:
+            limits: 连接限制参数，默认使用 `ConnectionLimits()`
+        """
+        self.limits = limits or ConnectionLimits()
+        rate = self.limits.accept_rate
+        self.bucket = (
+            TokenBucket(rate, max(1, self.limits.accept_burst or int(rate))) if rate > 0 else None
+        )
+        self.active = 0
+        self.peak = 0
+        self.per_ip: Dict[str, int] = {}
+        self.accepted = 0
+        self.closed = 0
+        self.rejected: Dict[str, int] = {
+            REJECT_MAX_CONNECTIONS: 0,
+            REJECT_MAX_PER_IP: 0,
+            REJECT_ACCEPT_RATE: 0,
+        }
+        self.idle_timeouts = 0
+        self.read_timeouts = 0
+        self.write_pauses = 0
+
+    def admit(self, ip: str) -> Optional[str]:
+        """判断是否接受来自指定 IP 的新连接，接受时计入活动连接。
+
+        Args:
+            ip: 来源 IP
+
+        Returns:
+            拒绝原因；接受时返回 None
+        """
+        limits = self.limits
+        if limits.max_connections and self.active >= limits.max_connections:
+            reason = REJECT_MAX_CONNECTIONS
+        elif limits.max_connections_per_ip and (
+            self.per_ip.get(ip, 0) >= limits.max_connections_per_ip
+        ):
+            reason = REJECT_MAX_PER_IP
+        elif self.bucket is not None and not self.bucket.consume():
+            reason = REJECT_ACCEPT_RATE
+        else:
+            self.active += 1
+            if self.active > self.peak:
+                self.peak = self.active
+            self.per_ip[ip] = self.per_ip.get(ip, 0) + 1
+            self.accepted += 1
+            return None
+        self.rejected[reason] += 1
+        return reason
+
+    def release(self, ip: str) -> None:
+        """连接关闭，释放计数。
+
+        Args:
+            ip: 来源 IP
+        """
+        self.active -= 1
+        self.closed += 1
+        count = self.per_ip.get(ip, 0) - 1
+        if count > 0:
+            self.per_ip[ip] = count
+        else:
+            self.per_ip.pop(ip, None)
+
+    def stats(self) -> Dict:
+        """导出连接统计。"""
+        return {
+            "active": self.active,
+            "peak": self.peak,
+            "accepted": self.accepted,
+            "closed": self.closed,
+            "rejected": dict(self.rejected),
+            "idle_timeouts": self.idle_timeouts,
+            "read_timeouts": self.read_timeouts,
+            "write_pauses": self.write_pauses,
+            "source_ips": len(self.per_ip),
+        }
+
+
+class ConnectionWatchdog:
+    """连接超时看门狗。
+
+    调用方在连接状态变化时设置截止时间（空闲等待请求 / 等待帧的剩余部分），
+    定时器只在截止时间到达时触发检查，不必为每个请求重新创建定时器。
+    超时后中止连接并计入准入控制器的统计。
+    """
+
+    __slots__ = ("loop", "transport", "limiter", "peer", "kind", "deadline", "handle")
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        transport: asyncio.BaseTransport,
+        limiter: ConnectionLimiter,
+        peer=None,
+    ):
+        """初始化看门狗。
+
+        Args:
+            loop: 事件循环
+            transport: 连接的传输对象
+            limiter: 准入控制器
+            peer: 对端地址（用于日志）
+        """
+        self.loop = loop
+        self.transport = transport
+        self.limiter = limiter
+        self.peer = peer
+        self.kind: Optional[str] = None
+        self.deadline: Optional[float] = None
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+    def idle(self) -> None:
+        """开始等待下一个请求（空闲超时）。"""
+        self._arm(TIMEOUT_IDLE, self.limiter.limits.idle_timeout)
+
+    def reading(self) -> None:
+        """已收到部分帧，开始等待剩余部分（读超时）。已在等待时不延长截止时间。"""
+        if self.kind != TIMEOUT_READ:
+            self._arm(TIMEOUT_READ, self.limiter.limits.read_timeout)
+
+    def clear(self) -> None:
+        """取消超时（例如请求处理中）。"""
+        self.kind = None
+        self.deadline = None
+
+    def cancel(self) -> None:
+        """连接关闭时取消定时器。"""
+        self.clear()
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def _arm(self, kind: str, timeout: float) -> None:
+        if timeout <= 0:
+            self.clear()
+            return
+        self.kind = kind
+        self.deadline = self.loop.time() + timeout
+        if self.handle is not None:
+            if self.handle.when() <= self.deadline:
+                return
+            # 新的截止时间更早（例如从空闲切换到读超时），重新调度
+            self.handle.cancel()
+        self.handle = self.loop.call_at(self.deadline, self._check)
+
+    def _check(self) -> None:
+        self.handle = None
+        if self.deadline is None:
+            return
+        if self.loop.time() < self.deadline:
+            self.handle = self.loop.call_at(self.deadline, self._check)
+            return
+        if self.kind == TIMEOUT_IDLE:
+            self.limiter.idle_timeouts += 1
+            logger.info(f"连接空闲超时，关闭: {self.peer}")
+        else:
+            self.limiter.read_timeouts += 1
+            logger.info(f"等待请求帧超时，关闭: {self.peer}")
+        self.clear()
+        self.transport.abort()
+
+
+def peer_ip(peername) -> str:
+    """从 peername 中提取 IP 地址。"""
+    if isinstance(peername, tuple) and peername:
+        return str(peername[0])
+    return ""
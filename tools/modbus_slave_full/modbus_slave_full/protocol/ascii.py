@@ -0,0 +1,188 @@
+"""Modbus ASCII 服务器。
+
+实现 Modbus ASCII 协议服务器，通过串口通信。帧以 ':' 开始、CRLF 结束，
+地址 + PDU + LRC 按十六进制字符传输。帧边界由分隔符确定，不依赖字符间隔；
+收到 ':' 时丢弃之前未完成的帧。
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+try:
+    import serial_asyncio
+except ImportError:
+    serial_asyncio = None
+
+from .handlers import ModbusHandler
+from .routing import MultidropFilter, UnitRouter
+from .utils import decode_ascii_frame, encode_ascii_frame
+
+logger = logging.getLogger(__name__)
+
+# ASCII 帧最大长度: ':' + 2 * (地址(1) + PDU(253) + LRC(1)) + CRLF
+MAX_ASCII_FRAME_SIZE = 513
+
+
+class ModbusASCIIServer:
+    """Modbus ASCII 服务器。"""
+
+    def __init__(
+        self,
+        handler: ModbusHandler,
+        port: str = "/dev/ttyUSB0",
+        baudrate: int = 9600,
+        bytesize: int = 7,
+        parity: str = "E",
+        stopbits: int = 1,
+        timeout: float = 1.0,
+        turnaround_delay: float = 0.0,
+        unit_router: Optional[UnitRouter] = None,
+        name: str = "ascii",
+    ):
+        """初始化 ASCII 服务器。
+
+        Args:
+            handler: Modbus 处理器
+            port: 串口端口
+            baudrate: 波特率
+            bytesize: 数据位（ASCII 模式通常为 7）
+            parity: 校验位 ('N', 'E', 'O')
+            stopbits: 停止位
+            timeout: 超时时间
+            turnaround_delay: 收到请求到发送响应的最小间隔（秒）
+            unit_router: 单元ID路由表，None 表示单元ID直接作为从站ID
+            name: 串口名称，用作请求来源、通信计数器和统计信息的名称
+        """
+        if serial_asyncio is None:
+            raise ImportError("需要安装 pyserial-asyncio: pip install pyserial-asyncio")
+
+        self.handler = handler
+        self.port = port
+        self.baudrate = baudrate
+        self.bytesize = bytesize
+        self.parity = parity
+        self.stopbits = stopbits
+        self.timeout = timeout
+        self.turnaround_delay = turnaround_delay
+        self.unit_router = unit_router
+        self.filter = MultidropFilter(handler, unit_router)
+        self.name = name
+        self.running = False
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.counters = handler.get_comm_counters(name)
+        self.frames = 0
+        self.discarded_bytes = 0
+        handler.add_stats_provider(name, self.get_stats)
+
+    def get_stats(self) -> Dict:
+        """获取串口统计。"""
+        return {
+            "port": self.port,
+            "baudrate": self.baudrate,
+            "mode": "ascii",
+            "turnaround_us": round(self.turnaround_delay * 1e6),
+            "frames": self.frames,
+            "foreign_frames": self.filter.foreign_frames,
+            "broadcasts": self.filter.broadcasts,
+            "discarded_bytes": self.discarded_bytes,
+        }
+
+    async def start(self) -> None:
+        """启动 ASCII 服务器。"""
+        try:
+            self.reader, self.writer = await serial_asyncio.open_serial_connection(
+                url=self.port,
+                baudrate=self.baudrate,
+                bytesize=self.bytesize,
+                parity=self.parity,
+                stopbits=self.stopbits,
+                limit=MAX_ASCII_FRAME_SIZE,
+            )
+            self.running = True
+            logger.info(
+                f"Modbus ASCII 服务器启动: {self.port} "
+                f"({self.baudrate},{self.bytesize}{self.parity}{self.stopbits})"
+            )
+
+            await self._process_frames()
+
+        except Exception as e:
+            logger.error(f"启动 ASCII 服务器失败: {e}")
+            raise
+
+    async def stop(self) -> None:
+        """停止 ASCII 服务器。"""
+        self.running = False
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        logger.info("Modbus ASCII 服务器已停止")
+
+    async def _process_frames(self) -> None:
+        """按 LF 读取行，从最后一个 ':' 开始解码帧。"""
+        while self.running:
+            try:
+                line = await self.reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError:
+                break
+            except asyncio.LimitOverrunError as e:
+                # 超过最大帧长度仍没有行结束符
+                logger.warning(f"ASCII 接收缓冲区溢出: {e.consumed} 字节")
+                self.counters.record_overrun()
+                self.discarded_bytes += e.consumed
+                await self.reader.readexactly(e.consumed)
+                continue
+            except Exception as e:
+                logger.error(f"读取串口数据错误: {e}")
+                await asyncio.sleep(0.1)
+                continue
+
+            received = time.perf_counter_ns()
+            start = line.rfind(b":")
+            if start < 0 or not line.endswith(b"\r\n"):
+                # 没有帧起始符或行结束符不完整，属于线路噪声
+                self.discarded_bytes += len(line)
+                self.counters.record_comm_error()
+                continue
+            self.discarded_bytes += start
+            await self._handle_frame(line[start + 1 : -2], received)
+
+    async def _handle_frame(self, frame: bytes, received: int) -> None:
+        """处理单个 ASCII 帧。
+
+        Args:
+            frame: ':' 和 CRLF 之间的十六进制字符
+            received: 收到帧的时间（`time.perf_counter_ns()`）
+        """
+        data = decode_ascii_frame(frame)
+        if data is None:
+            logger.warning("ASCII 帧格式错误或 LRC 校验失败")
+            self.discarded_bytes += len(frame) + 3
+            self.counters.record_comm_error()
+            return
+
+        self.counters.bus_message_count += 1
+        self.frames += 1
+
+        slave_id = data[0]
+        function_code = data[1]
+        # 总线上其它设备的流量和广播请求不响应
+        response = await self.filter.dispatch(slave_id, function_code, data[2:], self.name)
+        if not response:
+            logger.debug("ASCII 请求无响应")
+            return
+
+        # 保证主站有足够时间切换收发方向
+        if self.turnaround_delay:
+            elapsed = (time.perf_counter_ns() - received) / 1e9
+            if elapsed < self.turnaround_delay:
+                await asyncio.sleep(self.turnaround_delay - elapsed)
+
+        self.writer.write(encode_ascii_frame(bytes([slave_id]) + response))
+        await self.writer.drain()
@@ -0,0 +1,38 @@
+"""请求上下文。
+
+传输层在处理请求前设置当前客户端的信息（对端地址、TLS 证书角色等），
+中间件通过 `current_client()` 读取，不需要修改中间件和功能码处理器的签名。
+基于 `contextvars`，同一连接上创建的处理任务继承连接的上下文。
+"""
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class ClientInfo:
+    """客户端连接信息。"""
+
+    peer: Any = None
+    tls: bool = False
+    role: Optional[str] = None
+    subject: Optional[str] = None
+    session_reused: bool = False
+
+
+_current_client: ContextVar[Optional[ClientInfo]] = ContextVar("modbus_client", default=None)
+
+
+def current_client() -> Optional[ClientInfo]:
+    """返回当前请求所属的客户端信息，传输层未设置时返回 None。"""
+    return _current_client.get()
+
+
+def set_current_client(client: Optional[ClientInfo]) -> None:
+    """设置当前上下文中的客户端信息。
+
+    Args:
+        client: 客户端信息
+    """
+    _current_client.set(client)
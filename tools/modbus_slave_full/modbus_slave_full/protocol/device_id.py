@@ -0,0 +1,137 @@
+"""设备标识模块 (FC43 / MEI 0x0E)。
+
+在启动时将设备标识对象编码为完整的响应 PDU，请求时只做一次字典查找。
+"""
+
+import struct
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+MEI_READ_DEVICE_ID = 0x0E
+
+# 读设备标识码
+READ_BASIC = 0x01
+READ_REGULAR = 0x02
+READ_EXTENDED = 0x03
+READ_SPECIFIC = 0x04
+
+# 基本对象
+VENDOR_NAME = 0x00
+PRODUCT_CODE = 0x01
+MAJOR_MINOR_REVISION = 0x02
+# 常规对象
+VENDOR_URL = 0x03
+PRODUCT_NAME = 0x04
+MODEL_NAME = 0x05
+USER_APPLICATION_NAME = 0x06
+
+# 各读取码对应的对象ID范围（含）
+_CATEGORY_RANGES = {
+    READ_BASIC: (0x00, 0x02),
+    READ_REGULAR: (0x00, 0x7F),
+    READ_EXTENDED: (0x00, 0xFF),
+}
+
+# 响应头部: FC, MEI, 读取码, 一致性等级, 后续标志, 下一个对象ID, 对象数量
+_HEADER_SIZE = 7
+_MAX_PDU_SIZE = 253
+# 单个对象值最大长度（保证单个对象能放入一个响应）
+MAX_OBJECT_SIZE = _MAX_PDU_SIZE - _HEADER_SIZE - 2
+
+
+class DeviceIdentification:
+    """预编码的设备标识对象集合。"""
+
+    def __init__(self, objects: Mapping[int, Union[str, bytes]]):
+        """初始化并预编码所有响应。
+
+        Args:
+            objects: 对象ID 到对象值的映射，必须包含基本对象 0x00-0x02
+
+        Raises:
+            ValueError: 缺少基本对象或对象ID无效
+        """
+        encoded: Dict[int, bytes] = {}
+        for object_id, value in objects.items():
+            if not 0 <= object_id <= 0xFF or 0x07 <= object_id <= 0x7F:
+                raise ValueError(f"无效的设备标识对象ID: 0x{object_id:02X}")
+            if isinstance(value, str):
+                value = value.encode("utf-8")
+            encoded[object_id] = bytes(value[:MAX_OBJECT_SIZE])
+        for object_id in (VENDOR_NAME, PRODUCT_CODE, MAJOR_MINOR_REVISION):
+            if object_id not in encoded:
+                raise ValueError(f"缺少基本设备标识对象: 0x{object_id:02X}")
+
+        self.objects = dict(sorted(encoded.items()))
+        if any(object_id >= 0x80 for object_id in self.objects):
+            level = READ_EXTENDED
+        elif any(object_id >= 0x03 for object_id in self.objects):
+            level = READ_REGULAR
+        else:
+            level = READ_BASIC
+        # 0x80 表示支持单个对象访问
+        self.conformity_level = 0x80 | level
+        self._responses: Dict[Tuple[int, int], bytes] = {}
+        self._first_object: Dict[int, int] = {}
+        self._encode_all()
+
+    def _encode_all(self) -> None:
+        """预编码全部流式访问和单个对象访问的响应。"""
+        for read_code, (low, high) in _CATEGORY_RANGES.items():
+            stream = [object_id for object_id in self.objects if low <= object_id <= high]
+            if not stream:
+                continue
+            self._first_object[read_code] = stream[0]
+            for index, object_id in enumerate(stream):
+                self._responses[(read_code, object_id)] = self._encode_page(
+                    read_code, stream[index:]
+                )
+        for object_id in self.objects:
+            self._responses[(READ_SPECIFIC, object_id)] = self._encode_page(
+                READ_SPECIFIC, [object_id]
+            )
+
+    def _encode_page(self, read_code: int, object_ids: List[int]) -> bytes:
+        """编码一页响应，超出 PDU 长度的对象通过"后续"标志分页。"""
+        body = bytearray()
+        count = 0
+        next_object = 0
+        more_follows = 0x00
+        for object_id in object_ids:
+            value = self.objects[object_id]
+            if _HEADER_SIZE + len(body) + 2 + len(value) > _MAX_PDU_SIZE:
+                more_follows = 0xFF
+                next_object = object_id
+                break
+            body += struct.pack("BB", object_id, len(value)) + value
+            count += 1
+        header = struct.pack(
+            "BBBBBBB",
+            0x2B,
+            MEI_READ_DEVICE_ID,
+            read_code,
+            self.conformity_level,
+            more_follows,
+            next_object,
+            count,
+        )
+        return header + bytes(body)
+
+    def response(self, read_code: int, object_id: int) -> Optional[bytes]:
+        """查找预编码的响应。
+
+        流式访问时若对象ID不存在，按规范从该类别的第一个对象开始。
+
+        Args:
+            read_code: 读设备标识码
+            object_id: 起始对象ID
+
+        Returns:
+            响应 PDU；单个对象不存在或类别不支持时返回 None
+        """
+        response = self._responses.get((read_code, object_id))
+        if response is not None or read_code == READ_SPECIFIC:
+            return response
+        first = self._first_object.get(read_code)
+        if first is None:
+            return None
+        return self._responses[(read_code, first)]
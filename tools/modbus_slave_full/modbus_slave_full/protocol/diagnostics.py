@@ -0,0 +1,218 @@
+"""通信诊断计数器模块。
+
+实现 Modbus 规范中 FC08 诊断子功能所需的计数器，以及 FC11/FC12
+使用的通信事件计数器和 64 条目事件日志。每个传输层（TCP、RTU 等）
+持有一组独立的计数器。
+"""
+
+from typing import Dict
+
+# FC08 诊断子功能码
+DIAG_RETURN_QUERY_DATA = 0x00
+DIAG_RESTART_COMMUNICATIONS = 0x01
+DIAG_RETURN_DIAGNOSTIC_REGISTER = 0x02
+DIAG_FORCE_LISTEN_ONLY = 0x04
+DIAG_CLEAR_COUNTERS = 0x0A
+DIAG_BUS_MESSAGE_COUNT = 0x0B
+DIAG_BUS_COMM_ERROR_COUNT = 0x0C
+DIAG_SLAVE_EXCEPTION_COUNT = 0x0D
+DIAG_SLAVE_MESSAGE_COUNT = 0x0E
+DIAG_SLAVE_NO_RESPONSE_COUNT = 0x0F
+DIAG_SLAVE_NAK_COUNT = 0x10
+DIAG_SLAVE_BUSY_COUNT = 0x11
+DIAG_BUS_CHAR_OVERRUN_COUNT = 0x12
+DIAG_CLEAR_OVERRUN = 0x14
+
+# 事件日志字节定义
+EVENT_RECEIVE = 0x80
+EVENT_RECEIVE_COMM_ERROR = 0x02
+EVENT_RECEIVE_OVERRUN = 0x10
+EVENT_RECEIVE_LISTEN_ONLY = 0x20
+EVENT_RECEIVE_BROADCAST = 0x40
+EVENT_SEND = 0x40
+EVENT_SEND_READ_EXCEPTION = 0x01
+EVENT_SEND_ABORT_EXCEPTION = 0x02
+EVENT_SEND_BUSY_EXCEPTION = 0x04
+EVENT_SEND_NAK_EXCEPTION = 0x08
+EVENT_SEND_LISTEN_ONLY = 0x20
+EVENT_ENTER_LISTEN_ONLY = 0x04
+EVENT_RESTART = 0x00
+
+EVENT_LOG_SIZE = 64
+
+
+def send_event_for_exception(exception_code: int) -> int:
+    """根据异常码生成发送事件字节。
+
+    Args:
+        exception_code: 异常码
+
+    Returns:
+        事件字节
+    """
+    if exception_code <= 0x03:
+        return EVENT_SEND | EVENT_SEND_READ_EXCEPTION
+    if exception_code == 0x04:
+        return EVENT_SEND | EVENT_SEND_ABORT_EXCEPTION
+    if exception_code in (0x05, 0x06):
+        return EVENT_SEND | EVENT_SEND_BUSY_EXCEPTION
+    if exception_code == 0x07:
+        return EVENT_SEND | EVENT_SEND_NAK_EXCEPTION
+    return EVENT_SEND
+
+
+class CommEventLog:
+    """通信事件日志（固定 64 条目环形缓冲区）。"""
+
+    __slots__ = ("_buffer", "_index", "_size")
+
+    def __init__(self):
+        """初始化事件日志。"""
+        self._buffer = bytearray(EVENT_LOG_SIZE)
+        self._index = 0
+        self._size = 0
+
+    def add(self, event: int) -> None:
+        """追加一个事件字节。
+
+        Args:
+            event: 事件字节
+        """
+        self._buffer[self._index] = event
+        self._index = (self._index + 1) % EVENT_LOG_SIZE
+        if self._size < EVENT_LOG_SIZE:
+            self._size += 1
+
+    def clear(self) -> None:
+        """清空事件日志。"""
+        self._index = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def recent_first(self) -> bytes:
+        """按从新到旧的顺序返回事件字节。"""
+        if self._size == 0:
+            return b""
+        ordered = self._buffer[self._index :] + self._buffer[: self._index]
+        return bytes(reversed(ordered[EVENT_LOG_SIZE - self._size :]))
+
+
+class CommCounters:
+    """单个传输层的通信诊断计数器。
+
+    计数器为普通整数属性，传输层和处理器可直接自增，开销极低。
+    """
+
+    __slots__ = (
+        "bus_message_count",
+        "bus_comm_error_count",
+        "slave_exception_count",
+        "slave_message_count",
+        "slave_no_response_count",
+        "slave_nak_count",
+        "slave_busy_count",
+        "bus_char_overrun_count",
+        "event_count",
+        "diagnostic_register",
+        "listen_only",
+        "overrun",
+        "events",
+    )
+
+    def __init__(self):
+        """初始化计数器。"""
+        self.events = CommEventLog()
+        self.listen_only = False
+        self.diagnostic_register = 0
+        self.clear()
+
+    def clear(self) -> None:
+        """清零所有计数器（不清空事件日志）。"""
+        self.bus_message_count = 0
+        self.bus_comm_error_count = 0
+        self.slave_exception_count = 0
+        self.slave_message_count = 0
+        self.slave_no_response_count = 0
+        self.slave_nak_count = 0
+        self.slave_busy_count = 0
+        self.bus_char_overrun_count = 0
+        self.event_count = 0
+        self.overrun = False
+
+    def restart(self, clear_log: bool = False) -> None:
+        """重启通信选项：清零计数器并退出只听模式。
+
+        Args:
+            clear_log: 是否同时清空事件日志
+        """
+        self.clear()
+        self.diagnostic_register = 0
+        self.listen_only = False
+        if clear_log:
+            self.events.clear()
+        self.events.add(EVENT_RESTART)
+
+    def record_comm_error(self) -> None:
+        """记录一次通信错误（如 CRC 校验失败）。"""
+        self.bus_message_count += 1
+        self.bus_comm_error_count += 1
+        self.events.add(EVENT_RECEIVE | EVENT_RECEIVE_COMM_ERROR)
+
+    def record_overrun(self) -> None:
+        """记录一次字符溢出。"""
+        self.bus_char_overrun_count += 1
+        self.overrun = True
+        self.events.add(EVENT_RECEIVE | EVENT_RECEIVE_OVERRUN)
+
+    def counter(self, sub_function: int) -> int:
+        """返回 FC08 计数器子功能对应的计数值。
+
+        Args:
+            sub_function: 诊断子功能码
+
+        Returns:
+            16 位计数值
+        """
+        value = {
+            DIAG_BUS_MESSAGE_COUNT: self.bus_message_count,
+            DIAG_BUS_COMM_ERROR_COUNT: self.bus_comm_error_count,
+            DIAG_SLAVE_EXCEPTION_COUNT: self.slave_exception_count,
+            DIAG_SLAVE_MESSAGE_COUNT: self.slave_message_count,
+            DIAG_SLAVE_NO_RESPONSE_COUNT: self.slave_no_response_count,
+            DIAG_SLAVE_NAK_COUNT: self.slave_nak_count,
+            DIAG_SLAVE_BUSY_COUNT: self.slave_busy_count,
+            DIAG_BUS_CHAR_OVERRUN_COUNT: self.bus_char_overrun_count,
+        }[sub_function]
+        return value & 0xFFFF
+
+    def to_dict(self) -> Dict:
+        """导出计数器。"""
+        return {
+            "bus_message_count": self.bus_message_count,
+            "bus_comm_error_count": self.bus_comm_error_count,
+            "slave_exception_count": self.slave_exception_count,
+            "slave_message_count": self.slave_message_count,
+            "slave_no_response_count": self.slave_no_response_count,
+            "slave_nak_count": self.slave_nak_count,
+            "slave_busy_count": self.slave_busy_count,
+            "bus_char_overrun_count": self.bus_char_overrun_count,
+            "event_count": self.event_count,
+            "listen_only": self.listen_only,
+            "events": list(self.events.recent_first()),
+        }
+
+
+COUNTER_SUB_FUNCTIONS = frozenset(
+    (
+        DIAG_BUS_MESSAGE_COUNT,
+        DIAG_BUS_COMM_ERROR_COUNT,
+        DIAG_SLAVE_EXCEPTION_COUNT,
+        DIAG_SLAVE_MESSAGE_COUNT,
+        DIAG_SLAVE_NO_RESPONSE_COUNT,
+        DIAG_SLAVE_NAK_COUNT,
+        DIAG_SLAVE_BUSY_COUNT,
+        DIAG_BUS_CHAR_OVERRUN_COUNT,
+    )
+)
@@ -0,0 +1,199 @@
+"""帧长度规则模块。
+
+为每个功能码声明请求 PDU 数据部分（功能码之后）的长度规则，
+供 TCP/RTU 等传输层校验和切分帧，无需按请求猜测帧边界。
+"""
+
+from typing import Callable, Dict, Optional, Union
+
+# 长度未知（无法由规则确定）
+UNKNOWN_LENGTH = -1
+
+# Modbus PDU 最大长度（功能码 + 252 字节数据）
+MAX_PDU_SIZE = 253
+
+# 网络传输（TCP/UDP）的帧格式：MBAP 头部 + PDU，或 RTU 帧（从站ID + PDU + CRC16）
+FRAMING_MBAP = "mbap"
+FRAMING_RTU = "rtu"
+FRAMINGS = (FRAMING_MBAP, FRAMING_RTU)
+
+# Modbus TCP: MBAP 头部长度和 ADU 最大长度（MBAP 头部 7 字节 + PDU 253 字节）
+MBAP_HEADER_SIZE = 7
+MAX_TCP_ADU_SIZE = MBAP_HEADER_SIZE + MAX_PDU_SIZE
+# MBAP 长度字段（单元ID + PDU）的有效范围
+MIN_MBAP_LENGTH = 2
+MAX_MBAP_LENGTH = MAX_PDU_SIZE + 1
+
+
+def valid_mbap_length(length: int) -> bool:
+    """MBAP 长度字段是否有效（至少包含单元ID和功能码，且 PDU 不超过 253 字节）。"""
+    return MIN_MBAP_LENGTH <= length <= MAX_MBAP_LENGTH
+
+
+class RequestLength:
+    """请求长度规则。
+
+    支持三种形式：
+
+    - 固定长度：`RequestLength(4)`
+    - 字节计数字段：`RequestLength(5, count_offset=4)` 表示数据长度为
+      `5 + data[4]`，即固定头部之后跟随 `data[4]` 个字节
+    - 自定义解析函数：`RequestLength(resolver=func)`，`func(data)` 返回数据长度，
+      需要更多字节时返回 None，无法确定时返回 `UNKNOWN_LENGTH`
+    """
+
+    __slots__ = ("fixed", "count_offset", "resolver")
+
+    def __init__(
+        self,
+        fixed: int = 0,
+        count_offset: Optional[int] = None,
+        resolver: Optional[Callable[[bytes], Optional[int]]] = None,
+    ):
+        """初始化长度规则。
+
+        Args:
+            fixed: 固定部分长度
+            count_offset: 字节计数字段在数据中的偏移
+            resolver: 自定义解析函数
+        """
+        self.fixed = fixed
+        self.count_offset = count_offset
+        self.resolver = resolver
+
+    def expected(self, data: bytes) -> Optional[int]:
+        """计算请求数据部分的期望长度。
+
+        Args:
+            data: 已收到的数据部分（功能码之后）
+
+        Returns:
+            期望长度；需要更多字节才能确定时返回 None；
+            无法确定时返回 `UNKNOWN_LENGTH`
+        """
+        if self.resolver is not None:
+            return self.resolver(data)
+        if self.count_offset is None:
+            return self.fixed
+        if len(data) <= self.count_offset:
+            return None
+        return self.fixed + data[self.count_offset]
+
+    @property
+    def min_size(self) -> int:
+        """确定长度前至少需要的数据字节数。"""
+        if self.count_offset is not None:
+            return self.count_offset + 1
+        return 0 if self.resolver is None else 1
+
+    @classmethod
+    def coerce(
+        cls, rule: Union["RequestLength", int, Callable[[bytes], Optional[int]], None]
+    ) -> Optional["RequestLength"]:
+        """将整数或函数转换为长度规则。
+
+        Args:
+            rule: 长度规则、固定长度或解析函数
+
+        Returns:
+            长度规则，rule 为 None 时返回 None
+        """
+        if rule is None or isinstance(rule, RequestLength):
+            return rule
+        if isinstance(rule, int):
+            return cls(rule)
+        if callable(rule):
+            return cls(resolver=rule)
+        raise TypeError(f"无效的请求长度规则: {rule!r}")
+
+    def __repr__(self) -> str:
+        if self.resolver is not None:
+            return f"RequestLength(resolver={self.resolver!r})"
+        if self.count_offset is not None:
+            return f"RequestLength({self.fixed}, count_offset={self.count_offset})"
+        return f"RequestLength({self.fixed})"
+
+
+def _fc08_length(data: bytes) -> Optional[int]:
+    """FC08 请求和响应长度。
+
+    子功能码 0x0000（返回查询数据）回送任意长度的数据，长度无法由规则确定；
+    其它子功能码为 2 字节子功能码 + 2 字节数据。
+    """
+    if len(data) < 2:
+        return None
+    if data[:2] == b"\x00\x00":
+        return UNKNOWN_LENGTH
+    return 4
+
+
+# 标准功能码的请求长度规则
+STANDARD_REQUEST_LENGTHS: Dict[int, RequestLength] = {
+    0x01: RequestLength(4),
+    0x02: RequestLength(4),
+    0x03: RequestLength(4),
+    0x04: RequestLength(4),
+    0x05: RequestLength(4),
+    0x06: RequestLength(4),
+    0x07: RequestLength(0),
+    0x08: RequestLength(resolver=_fc08_length),
+    0x0B: RequestLength(0),
+    0x0C: RequestLength(0),
+    0x0F: RequestLength(5, count_offset=4),
+    0x10: RequestLength(5, count_offset=4),
+    0x11: RequestLength(0),
+    0x14: RequestLength(1, count_offset=0),
+    0x15: RequestLength(1, count_offset=0),
+    0x16: RequestLength(6),
+    0x17: RequestLength(9, count_offset=8),
+    0x18: RequestLength(2),
+}
+
+
+def _fc18_response_length(data: bytes) -> Optional[int]:
+    """FC18 响应长度：2 字节的字节计数字段之后跟随相应数量的字节。"""
+    if len(data) < 2:
+        return None
+    return 2 + int.from_bytes(data[:2], "big")
+
+
+# 标准功能码的响应长度规则（主站据此切分响应帧，规则形式与请求相同）
+STANDARD_RESPONSE_LENGTHS: Dict[int, RequestLength] = {
+    0x01: RequestLength(1, count_offset=0),
+    0x02: RequestLength(1, count_offset=0),
+    0x03: RequestLength(1, count_offset=0),
+    0x04: RequestLength(1, count_offset=0),
+    0x05: RequestLength(4),
+    0x06: RequestLength(4),
+    0x07: RequestLength(1),
+    0x08: RequestLength(resolver=_fc08_length),
+    0x0B: RequestLength(4),
+    0x0C: RequestLength(1, count_offset=0),
+    0x0F: RequestLength(4),
+    0x10: RequestLength(4),
+    0x11: RequestLength(1, count_offset=0),
+    0x14: RequestLength(1, count_offset=0),
+    0x15: RequestLength(1, count_offset=0),
+    0x16: RequestLength(6),
+    0x17: RequestLength(1, count_offset=0),
+    0x18: RequestLength(resolver=_fc18_response_length),
+}
+
+
+def expected_response_length(function_code: int, data: bytes) -> Optional[int]:
+    """计算响应数据部分（功能码之后）的期望长度。
+
+    Args:
+        function_code: 响应功能码（异常响应的最高位为 1）
+        data: 已收到的数据部分
+
+    Returns:
+        期望长度；需要更多字节时返回 None；无规则时返回 `UNKNOWN_LENGTH`
+    """
+    if function_code & 0x80:
+        # 异常响应只有异常码
+        return 1
+    rule = STANDARD_RESPONSE_LENGTHS.get(function_code)
+    if rule is None:
+        return UNKNOWN_LENGTH
+    return rule.expected(data)
@@ -0,0 +1,389 @@
+"""TCP 到 RTU 网关。
+
+配置的单元ID的请求不访问本地数据存储，而是经 `BusScheduler` 排队后由
+`RTUMaster` 转发到下游 RTU 总线。网关作为中间件安装在处理器上，因此对所有
+传输层（TCP、UDP、RTU over TCP）生效；其它单元ID照常由本地处理。公平排队按
+客户端区分：TCP 按连接，UDP 按客户端地址（UDP 为转发的数据报单独创建任务，
+见 `ModbusHandler.add_forwarder`）。
+
+总线调度：
+
+- 公平排队：每个客户端一个队列，按轮转顺序每次取一个请求，一个客户端的大量
+  请求不会让其它客户端饿死
+- 合并读请求：与排队中或执行中的读请求（单元ID和 PDU 相同）合并为一次总线事务；
+  对某个单元的写请求之后到达的读请求不再与之前的读请求合并
+- 超时：每个请求从提交起计时，超时返回异常码 0x0B（网关目标设备无响应）；
+  总线事务的响应超时不超过请求的剩余时间
+- 退避：从站无响应后暂停访问一段时间（连续无响应时加倍），期间发往该从站的请求
+  立即返回 0x0B，不占用总线，无响应的从站不会拖慢其它从站
+- 总线故障：串口读写错误（如 USB 转串口适配器被拔出）时调度器停止，排队中和之后
+  的请求立即返回 0x0A（网关路径不可用）
+"""
+
+import asyncio
+import logging
+import struct
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from .context import current_client
+from .handlers import GATEWAY_PATH_UNAVAILABLE, GATEWAY_TARGET_FAILED, ModbusHandler
+from .middleware import CallNext
+from .routing import UnitRouter
+from .rtu_master import RTUMaster
+
+logger = logging.getLogger(__name__)
+
+# 从站设备忙（客户端排队请求过多）
+SLAVE_DEVICE_BUSY = 0x06
+
+# 可以合并的读功能码
+READ_FUNCTION_CODES = frozenset((0x01, 0x02, 0x03, 0x04))
+
+
+def exception_response(function_code: int, code: int) -> bytes:
+    """构建异常响应 PDU。"""
+    return struct.pack("BB", function_code | 0x80, code)
+
+
+@dataclass
+class _Job:
+    """一次总线事务及等待它的请求。"""
+
+    unit_id: int
+    pdu: bytes
+    deadline: float
+    future: asyncio.Future
+    key: Optional[Tuple[int, bytes]] = None
+    waiters: int = 1
+    started: bool = False
+
+
+@dataclass
+class _UnitState:
+    """下游从站的退避状态。"""
+
+    failures: int = 0
+    retry_at: float = 0.0
+
+
+class BusScheduler:
+    """下游 RTU 总线调度器：一次只进行一个事务。"""
+
+    def __init__(
+        self,
+        timeout: float = 0.5,
+        request_timeout: float = 2.0,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        queue_size: int = 32,
+    ):
+        """初始化调度器。
+
+        Args:
+            timeout: 下游从站响应超时（秒）
+            request_timeout: 请求总超时（排队 + 总线事务，秒）
+            backoff: 从站无响应后暂停访问的时间（秒）
+            max_backoff: 连续无响应时暂停时间的上限（秒）
+            queue_size: 每个客户端最多排队的请求数
+        """
+        self.timeout = timeout
+        self.request_timeout = request_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue_size = queue_size
+        self.master: Optional[RTUMaster] = None
+        self.transactions = 0
+        self.merged = 0
+        self.timeouts = 0
+        self.bus_timeouts = 0
+        self.bus_errors = 0
+        self.fast_failures = 0
+        self.busy = 0
+        self._queues: Dict[Any, Deque[_Job]] = {}
+        # 有排队请求的客户端，按轮转顺序
+        self._ready: Deque[Any] = deque()
+        self._inflight: Dict[Tuple[int, bytes], _Job] = {}
+        self._units: Dict[int, _UnitState] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, master: RTUMaster) -> None:
+        """开始调度。
+
+        Args:
+            master: 下游总线主站
+        """
+        self.master = master
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def running(self) -> bool:
+        """调度器是否在运行（未停止，总线也没有故障）。"""
+        return self._task is not None and not self._task.done()
+
+    async def stop(self) -> None:
+        """停止调度，排队中的请求返回 0x0A。"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.master = None
+        self._fail_queued()
+
+    def _fail_queued(self) -> None:
+        """排队中的请求返回 0x0A。"""
+        for queue in self._queues.values():
+            for job in queue:
+                self._finish(job, exception_response(job.pdu[0], GATEWAY_PATH_UNAVAILABLE))
+        self._queues.clear()
+        self._ready.clear()
+
+    async def submit(self, client: Any, unit_id: int, pdu: bytes) -> Optional[bytes]:
+        """提交请求并等待响应。
+
+        Args:
+            client: 客户端标识（用于公平排队）
+            unit_id: 下游从站地址
+            pdu: 请求 PDU
+
+        Returns:
+            响应 PDU（可能是下游从站或网关的异常响应）；广播请求返回 None
+        """
+        function_code = pdu[0]
+        if not self.running:
+            return exception_response(function_code, GATEWAY_PATH_UNAVAILABLE)
+        loop = asyncio.get_running_loop()
+        if self._backing_off(unit_id, time.monotonic()):
+            self.fast_failures += 1
+            return exception_response(function_code, GATEWAY_TARGET_FAILED)
+
+        key = (unit_id, pdu) if function_code in READ_FUNCTION_CODES else None
+        job = self._inflight.get(key) if key is not None else None
+        if job is not None:
+            self.merged += 1
+            job.waiters += 1
+        else:
+            queue = self._queues.setdefault(client, deque())
+            if len(queue) >= self.queue_size:
+                self.busy += 1
+                return exception_response(function_code, SLAVE_DEVICE_BUSY)
+            if key is None:
+                # 写请求之后的读请求必须读到写入后的值
+                for stale in [k for k in self._inflight if k[0] == unit_id]:
+                    del self._inflight[stale]
+            job = _Job(
+                unit_id, pdu, time.monotonic() + self.request_timeout, loop.create_future(), key
+            )
+            if key is not None:
+                self._inflight[key] = job
+            if not queue:
+                self._ready.append(client)
+            queue.append(job)
+            self._wakeup.set()
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), self.request_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._abandon(job)
+            return exception_response(function_code, GATEWAY_TARGET_FAILED)
+        except asyncio.CancelledError:
+            # 客户端断开
+            self._abandon(job)
+            raise
+
+    def get_stats(self) -> Dict:
+        """获取调度统计。"""
+        now = time.monotonic()
+        return {
+            "transactions": self.transactions,
+            "merged": self.merged,
+            "timeouts": self.timeouts,
+            "bus_timeouts": self.bus_timeouts,
+            "bus_errors": self.bus_errors,
+            "fast_failures": self.fast_failures,
+            "busy": self.busy,
+            "running": self.running,
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "clients": len(self._ready),
+            "backoff_units": sorted(
+                unit for unit, state in self._units.items() if state.retry_at > now
+            ),
+        }
+
+    def _backing_off(self, unit_id: int, now: float) -> bool:
+        state = self._units.get(unit_id)
+        return state is not None and state.retry_at > now
+
+    def _next_job(self) -> Optional[_Job]:
+        """按轮转顺序从下一个客户端的队列中取一个请求。"""
+        while self._ready:
+            client = self._ready.popleft()
+            queue = self._queues[client]
+            job = queue.popleft()
+            if queue:
+                self._ready.append(client)
+            else:
+                del self._queues[client]
+            if not job.future.done():
+                return job
+        return None
+
+    async def _run(self) -> None:
+        """依次执行排队的总线事务，总线故障时结束。"""
+        while True:
+            job = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            now = time.monotonic()
+            remaining = job.deadline - now
+            if remaining <= 0 or self._backing_off(job.unit_id, now):
+                self._finish(job, exception_response(job.pdu[0], GATEWAY_TARGET_FAILED))
+                continue
+            job.started = True
+            try:
+                response = await self._execute(job, min(self.timeout, remaining))
+            except OSError as e:
+                # 串口错误（serial.SerialException、串口关闭等）：总线不可用，停止调度
+                self.bus_errors += 1
+                logger.error(f"下游总线不可用，网关停止转发: {e}")
+                self._finish(job, exception_response(job.pdu[0], GATEWAY_PATH_UNAVAILABLE))
+                self._fail_queued()
+                return
+            self._finish(job, response)
+
+    async def _execute(self, job: _Job, timeout: float) -> Optional[bytes]:
+        """执行一次总线事务，返回响应 PDU。
+
+        Raises:
+            OSError: 串口读写错误
+        """
+        function_code = job.pdu[0]
+        self.transactions += 1
+        try:
+            response = await self.master.execute(job.unit_id, job.pdu, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.bus_timeouts += 1
+            state = self._units.setdefault(job.unit_id, _UnitState())
+            delay = min(self.backoff * 2**state.failures, self.max_backoff)
+            state.failures += 1
+            state.retry_at = time.monotonic() + delay
+            logger.warning(f"下游从站 {job.unit_id} 无响应，{delay:.1f} 秒内不再访问")
+            return exception_response(function_code, GATEWAY_TARGET_FAILED)
+        except ValueError as e:
+            self.bus_errors += 1
+            logger.warning(f"下游从站 {job.unit_id} 响应错误: {e}")
+            return exception_response(function_code, GATEWAY_TARGET_FAILED)
+        except OSError:
+            raise
+        except Exception as e:
+            # 其它意外错误只影响当前请求，调度继续
+            self.bus_errors += 1
+            logger.error(f"转发到下游从站 {job.unit_id} 失败: {e}")
+            return exception_response(function_code, GATEWAY_TARGET_FAILED)
+        self._units.pop(job.unit_id, None)
+        return response
+
+    def _abandon(self, job: _Job) -> None:
+        job.waiters -= 1
+        if not job.waiters and not job.started:
+            # 没有请求再等待，排队中的事务不再执行
+            job.future.cancel()
+            self._forget(job)
+
+    def _finish(self, job: _Job, response: Optional[bytes]) -> None:
+        self._forget(job)
+        if not job.future.done():
+            job.future.set_result(response)
+
+    def _forget(self, job: _Job) -> None:
+        if job.key is not None and self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+
+
+class RTUGateway:
+    """TCP 到 RTU 网关（请求中间件）。"""
+
+    def __init__(
+        self,
+        handler: ModbusHandler,
+        routes: UnitRouter,
+        scheduler: Optional[BusScheduler] = None,
+        name: str = "gateway",
+    ):
+        """初始化网关并安装到处理器上。
+
+        Args:
+            handler: Modbus 处理器
+            routes: 转发的单元ID到下游从站地址的映射
+            scheduler: 总线调度器，None 表示使用默认参数
+            name: 统计信息中的名称
+        """
+        self.handler = handler
+        self.routes = routes
+        self.scheduler = scheduler or BusScheduler()
+        self.master: Optional[RTUMaster] = None
+        self.forwarded = 0
+        handler.add_middleware(self)
+        handler.add_forwarder(self.forwards)
+        handler.add_stats_provider(name, self.get_stats)
+
+    async def open(self, port: str, **serial_kwargs) -> None:
+        """打开下游串口并开始调度。
+
+        Args:
+            port: 串口设备
+            **serial_kwargs: 传给 `RTUMaster.open` 的串口参数
+        """
+        master = await RTUMaster.open(port, **serial_kwargs)
+        self.start(master)
+        logger.info(f"Modbus 网关启动: 单元ID {sorted(self.routes.table)} -> {port}")
+
+    def start(self, master: RTUMaster) -> None:
+        """使用已打开的下游总线主站开始调度（如伪终端测试环境的主站）。
+
+        Args:
+            master: 下游总线主站
+        """
+        self.master = master
+        self.scheduler.start(master)
+
+    async def stop(self) -> None:
+        """停止调度并关闭下游串口。"""
+        await self.scheduler.stop()
+        if self.master is not None:
+            await self.master.close()
+            self.master = None
+        logger.info("Modbus 网关已停止")
+
+    def forwards(self, unit_id: int) -> bool:
+        """单元ID的请求是否转发到下游总线。"""
+        return self.routes.resolve(unit_id) is not None
+
+    def get_stats(self) -> Dict:
+        """获取网关统计。"""
+        return {
+            "units": dict(sorted(self.routes.table.items())),
+            "forwarded": self.forwarded,
+            **self.scheduler.get_stats(),
+        }
+
+    async def __call__(
+        self, slave_id: int, function_code: int, data: bytes, source: str, call_next: CallNext
+    ) -> Optional[bytes]:
+        target = self.routes.resolve(slave_id)
+        if target is None:
+            return await call_next(slave_id, function_code, data, source)
+        self.forwarded += 1
+        # 同一连接的请求属于同一个客户端；没有连接信息时按传输层区分
+        client = current_client()
+        key = client.peer if client is not None and client.peer is not None else source
+        return await self.scheduler.submit(key, target, bytes([function_code]) + bytes(data))
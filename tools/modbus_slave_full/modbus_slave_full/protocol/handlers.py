@@ -3,11 +3,43 @@
 实现所有标准 Modbus 功能码的处理逻辑。
 """
 
+import functools
 import logging
 import struct
-from typing import Optional, Tuple
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
+from .. import __version__
 from ..datastore import ModbusDataStore
+from ..utils.metrics import DEFAULT_PERCENTILES, RequestMetrics
+from .diagnostics import (
+    COUNTER_SUB_FUNCTIONS,
+    DIAG_CLEAR_COUNTERS,
+    DIAG_CLEAR_OVERRUN,
+    DIAG_FORCE_LISTEN_ONLY,
+    DIAG_RESTART_COMMUNICATIONS,
+    DIAG_RETURN_DIAGNOSTIC_REGISTER,
+    DIAG_RETURN_QUERY_DATA,
+    EVENT_ENTER_LISTEN_ONLY,
+    EVENT_RECEIVE,
+    EVENT_RECEIVE_BROADCAST,
+    EVENT_RECEIVE_LISTEN_ONLY,
+    EVENT_SEND,
+    CommCounters,
+    send_event_for_exception,
+)
+from .device_id import (
+    MAJOR_MINOR_REVISION,
+    MEI_READ_DEVICE_ID,
+    MODEL_NAME,
+    PRODUCT_CODE,
+    PRODUCT_NAME,
+    READ_SPECIFIC,
+    VENDOR_NAME,
+    DeviceIdentification,
+)
+from .framing import STANDARD_REQUEST_LENGTHS, UNKNOWN_LENGTH, RequestLength
+from .middleware import Middleware
 from .utils import bits_to_bytes, bytes_to_bits, bytes_to_words, words_to_bytes
 
 logger = logging.getLogger(__name__)
@@ -18,6 +50,15 @@ ILLEGAL_FUNCTION = 0x01
 ILLEGAL_DATA_ADDRESS = 0x02
 ILLEGAL_DATA_VALUE = 0x03
 SLAVE_DEVICE_FAILURE = 0x04
+GATEWAY_PATH_UNAVAILABLE = 0x0A
+GATEWAY_TARGET_FAILED = 0x0B
+
+# 文件记录请求/响应数据最大长度 (FC20/FC21)
+FILE_RECORD_MAX_DATA_LENGTH = 0xF5
+FILE_RECORD_MAX_WRITE_LENGTH = 0xFB
+
+# 功能码处理器签名: async handler(slave_id, data, source) -> Optional[bytes]
+FunctionHandler = Callable[[int, bytes, str], Awaitable[Optional[bytes]]]
 
 
 class ModbusHandler:
@@ -33,28 +74,18 @@ class ModbusHandler:
         self.stats = {
             "total_requests": 0,
             "successful_requests": 0,
+            "exception_responses": 0,
             "function_codes": {},
         }
-
-    async def handle_request(
-        self, slave_id: int, function_code: int, data: bytes, source: str = "unknown"
-    ) -> Optional[bytes]:
-        """处理 Modbus 请求。
-
-        Args:
-            slave_id: 从站ID
-            function_code: 功能码
-            data: 请求数据
-            source: 请求来源
-
-        Returns:
-            响应数据，如果失败返回 None
-        """
-        self.stats["total_requests"] += 1
-        fc_name = f"FC{function_code:02d}"
-        self.stats["function_codes"][fc_name] = self.stats["function_codes"].get(fc_name, 0) + 1
-
-        handlers = {
+        self.metrics = RequestMetrics()
+        self.comm_counters: Dict[str, CommCounters] = {}
+        # 传输层统计提供者（连接数等），名称 -> 返回统计字典的函数
+        self.stats_providers: Dict[str, Callable[[], Dict]] = {}
+        self.middlewares: List[Middleware] = []
+        # 判断单元ID的请求是否由中间件转发到其它设备的函数（见 `add_forwarder`）
+        self.forwarders: List[Callable[[int], bool]] = []
+        self._chain: Optional[Callable[..., Awaitable[Optional[bytes]]]] = None
+        self._handlers = {
             0x01: self._handle_read_coils,
             0x02: self._handle_read_discrete_inputs,
             0x03: self._handle_read_holding_registers,
@@ -73,21 +104,355 @@ class ModbusHandler:
             0x16: self._handle_mask_write_register,
             0x17: self._handle_read_write_multiple_registers,
             0x18: self._handle_read_fifo_queue,
+            0x2B: self._handle_encapsulated_interface,
         }
+        self.request_lengths: Dict[int, RequestLength] = dict(STANDARD_REQUEST_LENGTHS)
+        self.request_lengths[0x2B] = RequestLength(resolver=self._mei_request_length)
+        self._mei_handlers: Dict[int, FunctionHandler] = {}
+        self._mei_request_lengths: Dict[int, RequestLength] = {}
+        self.register_mei_type(
+            MEI_READ_DEVICE_ID, self._handle_read_device_identification, request_length=2
+        )
+        self._device_identifications: Dict[int, DeviceIdentification] = {}
+        self._report_slave_id_responses: Dict[int, bytes] = {}
+
+    def set_device_identification(
+        self, slave_id: int, objects: Dict[int, object]
+    ) -> DeviceIdentification:
+        """设置从站的设备标识对象 (FC43/14)，并预编码所有响应。
+
+        Args:
+            slave_id: 从站ID
+            objects: 对象ID 到对象值的映射
+
+        Returns:
+            预编码的设备标识
+        """
+        identification = DeviceIdentification(objects)
+        self._device_identifications[slave_id] = identification
+        return identification
+
+    def set_report_slave_id(
+        self, slave_id: int, slave_id_info: bytes, run_indicator: bool = True
+    ) -> bytes:
+        """设置并缓存从站的报告从站ID (FC17) 响应。
+
+        Args:
+            slave_id: 从站ID
+            slave_id_info: 从站特定数据
+            run_indicator: 运行指示（True 表示运行中）
+
+        Returns:
+            缓存的响应 PDU
+        """
+        byte_count = len(slave_id_info) + 1
+        response = (
+            struct.pack("BB", 0x11, byte_count)
+            + slave_id_info
+            + bytes([0xFF if run_indicator else 0x00])
+        )
+        self._report_slave_id_responses[slave_id] = response
+        return response
+
+    @staticmethod
+    def default_device_identification(slave_id: int) -> Dict[int, str]:
+        """生成默认设备标识对象。
+
+        Args:
+            slave_id: 从站ID
+
+        Returns:
+            对象ID 到对象值的映射
+        """
+        return {
+            VENDOR_NAME: "clint",
+            PRODUCT_CODE: "modbus-slave-full",
+            MAJOR_MINOR_REVISION: __version__,
+            PRODUCT_NAME: "Modbus Slave Full",
+            MODEL_NAME: f"Slave {slave_id}",
+        }
+
+    def register_function_code(
+        self,
+        function_code: int,
+        handler: FunctionHandler,
+        request_length=None,
+        replace: bool = False,
+    ) -> None:
+        """注册功能码处理器。
+
+        注册的处理器与内置功能码共享分发路径、统计和异常处理。
+        处理器签名为 `async handler(slave_id, data, source)`，返回完整的
+        响应 PDU（含功能码），返回 None 表示不响应。
+
+        Args:
+            function_code: 功能码 (1-127)
+            handler: 处理器
+            request_length: 请求长度规则（`RequestLength`、固定长度整数或解析函数），
+                传输层据此校验和切分帧；None 表示长度未知
+            replace: 是否允许覆盖已注册的功能码
+
+        Raises:
+            ValueError: 功能码无效或已注册
+        """
+        if not 1 <= function_code <= 0x7F:
+            raise ValueError(f"无效的功能码: {function_code}")
+        if function_code in self._handlers and not replace:
+            raise ValueError(f"功能码已注册: {function_code}")
+        self._handlers[function_code] = handler
+        rule = RequestLength.coerce(request_length)
+        if rule is None:
+            self.request_lengths.pop(function_code, None)
+        else:
+            self.request_lengths[function_code] = rule
+        logger.info(f"注册功能码处理器: FC{function_code:02d}")
+
+    def unregister_function_code(self, function_code: int) -> None:
+        """注销功能码处理器。
+
+        Args:
+            function_code: 功能码
+        """
+        self._handlers.pop(function_code, None)
+        self.request_lengths.pop(function_code, None)
+
+    def register_mei_type(
+        self, mei_type: int, handler: FunctionHandler, request_length=None, replace: bool = False
+    ) -> None:
+        """注册 FC43 (封装接口传输) 的 MEI 类型处理器。
+
+        Args:
+            mei_type: MEI 类型
+            handler: 处理器，收到的 data 以 MEI 类型字节开头
+            request_length: MEI 类型之后数据部分的长度规则
+            replace: 是否允许覆盖已注册的 MEI 类型
+
+        Raises:
+            ValueError: MEI 类型无效或已注册
+        """
+        if not 0 <= mei_type <= 0xFF:
+            raise ValueError(f"无效的 MEI 类型: {mei_type}")
+        if mei_type in self._mei_handlers and not replace:
+            raise ValueError(f"MEI 类型已注册: {mei_type}")
+        self._mei_handlers[mei_type] = handler
+        rule = RequestLength.coerce(request_length)
+        if rule is None:
+            self._mei_request_lengths.pop(mei_type, None)
+        else:
+            self._mei_request_lengths[mei_type] = rule
+
+    def expected_request_length(self, function_code: int, data: bytes) -> Optional[int]:
+        """根据已注册的规则计算请求数据部分的期望长度。
+
+        Args:
+            function_code: 功能码
+            data: 已收到的数据部分（功能码之后）
+
+        Returns:
+            期望长度；需要更多字节时返回 None；无规则时返回 `UNKNOWN_LENGTH`
+        """
+        rule = self.request_lengths.get(function_code)
+        if rule is None:
+            return UNKNOWN_LENGTH
+        return rule.expected(data)
+
+    def _mei_request_length(self, data: bytes) -> Optional[int]:
+        """FC43 请求长度解析：根据 MEI 类型查找规则。"""
+        if not data:
+            return None
+        rule = self._mei_request_lengths.get(data[0])
+        if rule is None:
+            return UNKNOWN_LENGTH
+        length = rule.expected(data[1:])
+        if length is None or length < 0:
+            return length
+        return length + 1
+
+    def add_middleware(self, middleware: Middleware) -> None:
+        """注册请求中间件。
+
+        中间件按注册顺序由外到内执行，签名为
+        `async middleware(slave_id, function_code, data, source, call_next)`，
+        通过 `await call_next(slave_id, function_code, data, source)` 调用下一层。
+        中间件链只在注册时构建，未注册任何中间件时分发路径不受影响。
+
+        Args:
+            middleware: 中间件
+        """
+        self.middlewares.append(middleware)
+        self._build_chain()
+
+    def add_forwarder(self, forwards: Callable[[int], bool]) -> None:
+        """注册转发判断函数。
+
+        转发到其它设备的请求（如 `RTUGateway` 转发到下游总线）的处理时间取决于下游
+        设备，按批次顺序处理请求的传输层（UDP）为这些请求单独创建任务。
+
+        Args:
+            forwards: `forwards(unit_id)` 返回该单元ID的请求是否被转发
+        """
+        self.forwarders.append(forwards)
+
+    def is_forwarded(self, unit_id: int) -> bool:
+        """单元ID的请求是否被转发到其它设备。"""
+        for forwards in self.forwarders:
+            if forwards(unit_id):
+                return True
+        return False
+
+    def remove_middleware(self, middleware: Middleware) -> None:
+        """移除请求中间件。
+
+        Args:
+            middleware: 之前注册的中间件
+
+        Raises:
+            ValueError: 中间件未注册
+        """
+        self.middlewares.remove(middleware)
+        self._build_chain()
+
+    def _build_chain(self) -> None:
+        """根据已注册的中间件构建调用链。"""
+        if not self.middlewares:
+            self._chain = None
+            return
+        call_next = self._call_handler
+        for middleware in reversed(self.middlewares):
+            call_next = functools.partial(middleware, call_next=call_next)
+        self._chain = call_next
+
+    async def _call_handler(
+        self, slave_id: int, function_code: int, data: bytes, source: str
+    ) -> Optional[bytes]:
+        """调用功能码处理器（中间件链的最内层）。"""
+        handler = self._handlers.get(function_code)
+        if handler is None:
+            return self._unsupported_function(function_code)
+        return await handler(slave_id, data, source)
+
+    def _unsupported_function(self, function_code: int) -> bytes:
+        """构建不支持功能码的异常响应。"""
+        logger.warning(f"不支持的功能码: {function_code}")
+        return self._build_exception_response(function_code, ILLEGAL_FUNCTION)
+
+    def get_comm_counters(self, source: str) -> CommCounters:
+        """获取（必要时创建）传输层的通信诊断计数器。
+
+        传输层在初始化时获取自己的计数器并直接更新总线级计数，
+        处理器负责从站级计数和事件日志。
+
+        Args:
+            source: 请求来源（传输层名称）
+
+        Returns:
+            通信诊断计数器
+        """
+        counters = self.comm_counters.get(source)
+        if counters is None:
+            counters = self.comm_counters[source] = CommCounters()
+        return counters
+
+    def validate_request_length(
+        self, unit_id: int, function_code: int, data: bytes, source: str, peer: Any = None
+    ) -> Optional[bytes]:
+        """按功能码长度规则校验请求 PDU（用于 TCP、UDP 等自带长度的传输层）。
+
+        长度不符时记录一次通信错误，请求计入统计和指标，不再交给 `handle_request`。
+
+        Args:
+            unit_id: 单元ID
+            function_code: 功能码
+            data: 请求数据（功能码之后）
+            source: 请求来源
+            peer: 客户端地址（用于日志）
+
+        Returns:
+            长度不符时返回异常响应 PDU（0x03），否则返回 None
+        """
+        expected = self.expected_request_length(function_code, data)
+        if expected == UNKNOWN_LENGTH or expected == len(data):
+            return None
+        logger.warning(
+            f"PDU 长度不匹配来自 {peer if peer is not None else source}: "
+            f"FC={function_code:02X}, 期望={expected}, 实际={len(data)}"
+        )
+        self.get_comm_counters(source).bus_comm_error_count += 1
+        response = self._build_exception_response(function_code, ILLEGAL_DATA_VALUE)
+        self.stats["total_requests"] += 1
+        fc_name = f"FC{function_code:02d}"
+        self.stats["function_codes"][fc_name] = self.stats["function_codes"].get(fc_name, 0) + 1
+        self.stats["exception_responses"] += 1
+        self.metrics.record(unit_id, function_code, len(data) + 1, response, 0)
+        return response
+
+    async def handle_request(
+        self, slave_id: int, function_code: int, data: bytes, source: str = "unknown"
+    ) -> Optional[bytes]:
+        """处理 Modbus 请求。
+
+        Args:
+            slave_id: 从站ID
+            function_code: 功能码
+            data: 请求数据
+            source: 请求来源
 
-        handler = handlers.get(function_code)
-        if not handler:
-            logger.warning(f"不支持的功能码: {function_code}")
-            return self._build_exception_response(function_code, ILLEGAL_FUNCTION)
+        Returns:
+            响应数据，不需要响应（如只听模式）时返回 None
+        """
+        start = time.perf_counter_ns()
+        self.stats["total_requests"] += 1
+        fc_name = f"FC{function_code:02d}"
+        self.stats["function_codes"][fc_name] = self.stats["function_codes"].get(fc_name, 0) + 1
 
+        counters = self.comm_counters.get(source)
+        if counters is None:
+            counters = self.get_comm_counters(source)
+        counters.slave_message_count += 1
+        if counters.listen_only and not (function_code == 0x08 and data[:2] == b"\x00\x01"):
+            # 只听模式：仅记录事件，不做任何响应
+            counters.slave_no_response_count += 1
+            counters.events.add(EVENT_RECEIVE | EVENT_RECEIVE_LISTEN_ONLY)
+            return None
+        counters.events.add(
+            EVENT_RECEIVE | EVENT_RECEIVE_BROADCAST if slave_id == 0 else EVENT_RECEIVE
+        )
+
+        chain = self._chain
         try:
-            response = await handler(slave_id, data, source)
-            if response:
-                self.stats["successful_requests"] += 1
-            return response
+            if chain is None:
+                # 未注册中间件时直接调用功能码处理器
+                handler = self._handlers.get(function_code)
+                if handler is None:
+                    response = self._unsupported_function(function_code)
+                else:
+                    response = await handler(slave_id, data, source)
+            else:
+                response = await chain(slave_id, function_code, data, source)
         except Exception as e:
             logger.error(f"处理请求失败: {e}")
-            return self._build_exception_response(function_code, SLAVE_DEVICE_FAILURE)
+            response = self._build_exception_response(function_code, SLAVE_DEVICE_FAILURE)
+
+        if response:
+            if response[0] & 0x80:
+                self.stats["exception_responses"] += 1
+                counters.slave_exception_count += 1
+                counters.events.add(send_event_for_exception(response[1]))
+            else:
+                self.stats["successful_requests"] += 1
+                if function_code not in (0x0B, 0x0C):
+                    counters.event_count += 1
+                counters.events.add(EVENT_SEND)
+        else:
+            counters.slave_no_response_count += 1
+        self.metrics.record(
+            slave_id,
+            function_code,
+            len(data) + 1,
+            response,
+            (time.perf_counter_ns() - start) // 1000,
+        )
+        return response
 
     async def _handle_read_coils(
         self, slave_id: int, data: bytes, source: str
@@ -308,169 +673,226 @@ class ModbusHandler:
         self, slave_id: int, data: bytes, source: str
     ) -> Optional[bytes]:
         """处理诊断请求 (FC08)。
-        
-        支持多种诊断子功能。
+
+        支持返回查询数据、重启通信、诊断寄存器、只听模式、清除计数器
+        以及各总线/从站计数器子功能，计数器按传输层独立维护。
         """
         if len(data) < 4:
             return self._build_exception_response(0x08, ILLEGAL_DATA_VALUE)
 
         sub_function, diag_data = struct.unpack(">HH", data[:4])
+        counters = self.get_comm_counters(source)
+
+        if sub_function == DIAG_RETURN_QUERY_DATA:
+            return struct.pack(">BH", 0x08, sub_function) + data[2:]
+
+        if sub_function == DIAG_RESTART_COMMUNICATIONS:
+            if diag_data not in (0x0000, 0xFF00):
+                return self._build_exception_response(0x08, ILLEGAL_DATA_VALUE)
+            # 在只听模式下收到时重启但不返回响应，否则先响应再重启
+            was_listen_only = counters.listen_only
+            counters.restart(clear_log=diag_data == 0xFF00)
+            if was_listen_only:
+                return None
+            return struct.pack(">BHH", 0x08, sub_function, diag_data)
+
+        if diag_data != 0x0000:
+            return self._build_exception_response(0x08, ILLEGAL_DATA_VALUE)
 
-        # 简单实现：回显请求数据
-        return struct.pack(">BHH", 0x08, sub_function, diag_data)
+        if sub_function == DIAG_RETURN_DIAGNOSTIC_REGISTER:
+            return struct.pack(">BHH", 0x08, sub_function, counters.diagnostic_register)
+
+        if sub_function == DIAG_FORCE_LISTEN_ONLY:
+            # 进入只听模式后不返回响应
+            counters.listen_only = True
+            counters.events.add(EVENT_ENTER_LISTEN_ONLY)
+            return None
+
+        if sub_function == DIAG_CLEAR_COUNTERS:
+            counters.clear()
+            counters.diagnostic_register = 0
+            return struct.pack(">BHH", 0x08, sub_function, 0)
+
+        if sub_function in COUNTER_SUB_FUNCTIONS:
+            return struct.pack(">BHH", 0x08, sub_function, counters.counter(sub_function))
+
+        if sub_function == DIAG_CLEAR_OVERRUN:
+            counters.bus_char_overrun_count = 0
+            counters.overrun = False
+            return struct.pack(">BHH", 0x08, sub_function, 0)
+
+        return self._build_exception_response(0x08, ILLEGAL_FUNCTION)
 
     async def _handle_get_comm_event_counter(
         self, slave_id: int, data: bytes, source: str
     ) -> Optional[bytes]:
         """处理获取通信事件计数器请求 (FC11)。
-        
-        返回状态字和事件计数。
+
+        返回状态字和事件计数（成功完成的报文数，不含异常响应和 FC11/FC12）。
         """
-        status = 0xFFFF  # 表示设备就绪
-        event_count = self.stats["total_requests"] & 0xFFFF
-        return struct.pack(">BHH", 0x0B, status, event_count)
+        counters = self.get_comm_counters(source)
+        status = 0x0000  # 无正在处理的程序命令
+        return struct.pack(">BHH", 0x0B, status, counters.event_count & 0xFFFF)
 
     async def _handle_get_comm_event_log(
         self, slave_id: int, data: bytes, source: str
     ) -> Optional[bytes]:
         """处理获取通信事件日志请求 (FC12)。
-        
-        返回事件计数、消息计数和事件日志。
+
+        返回状态字、事件计数、总线报文计数和最多 64 个事件（最新的在前）。
         """
-        status = 0xFFFF
-        event_count = self.stats["total_requests"] & 0xFFFF
-        message_count = self.stats["successful_requests"] & 0xFFFF
-        
-        # 简化实现：返回空事件日志
-        byte_count = 6
-        events = b""
-        
-        response = struct.pack(">BBHHH", 0x0C, byte_count, status, event_count, message_count)
+        counters = self.get_comm_counters(source)
+        status = 0x0000
+        events = counters.events.recent_first()
+        byte_count = 6 + len(events)
+        response = struct.pack(
+            ">BBHHH",
+            0x0C,
+            byte_count,
+            status,
+            counters.event_count & 0xFFFF,
+            counters.bus_message_count & 0xFFFF,
+        )
         return response + events
 
     async def _handle_report_slave_id(
         self, slave_id: int, data: bytes, source: str
     ) -> Optional[bytes]:
         """处理报告从站ID请求 (FC17)。
-        
-        返回从站ID、运行状态和其他从站特定数据。
+
+        返回从站ID、运行状态和其他从站特定数据，响应按从站缓存。
         """
-        # 从站ID信息
-        slave_id_info = f"Modbus Slave {slave_id}".encode("ascii")
-        run_indicator = 0xFF  # 0xFF = ON, 0x00 = OFF
-        
-        byte_count = len(slave_id_info) + 1
-        return struct.pack("BB", 0x11, byte_count) + slave_id_info + bytes([run_indicator])
+        response = self._report_slave_id_responses.get(slave_id)
+        if response is None:
+            response = self.set_report_slave_id(
+                slave_id, f"Modbus Slave {slave_id}".encode("ascii")
+            )
+        return response
+
+    async def _handle_read_device_identification(
+        self, slave_id: int, data: bytes, source: str
+    ) -> Optional[bytes]:
+        """处理读设备标识请求 (FC43 / MEI 0x0E)。
+
+        支持基本、常规、扩展流式访问（含"后续"分页）和单个对象访问，
+        响应在配置时预编码。
+        """
+        if len(data) < 3:
+            return self._build_exception_response(0x2B, ILLEGAL_DATA_VALUE)
+
+        read_code, object_id = data[1], data[2]
+        if not 1 <= read_code <= READ_SPECIFIC:
+            return self._build_exception_response(0x2B, ILLEGAL_DATA_VALUE)
+
+        identification = self._device_identifications.get(slave_id)
+        if identification is None:
+            if slave_id not in self.datastore.slaves:
+                return self._build_exception_response(0x2B, ILLEGAL_DATA_ADDRESS)
+            identification = self.set_device_identification(
+                slave_id, self.default_device_identification(slave_id)
+            )
+
+        response = identification.response(read_code, object_id)
+        if response is None:
+            return self._build_exception_response(0x2B, ILLEGAL_DATA_ADDRESS)
+        return response
 
     async def _handle_read_file_record(
         self, slave_id: int, data: bytes, source: str
     ) -> Optional[bytes]:
         """处理读文件记录请求 (FC20)。
-        
-        支持从多个文件中读取记录。
+
+        先解析全部子请求并校验响应总长度，再在一次加锁内批量读取，
+        子响应直接写入预分配的响应缓冲区。
         """
         if len(data) < 8:  # 最少需要 byte_count + 1个子请求(7字节)
             return self._build_exception_response(0x14, ILLEGAL_DATA_VALUE)
 
         byte_count = data[0]
-        if len(data) < 1 + byte_count or byte_count < 7:
+        if (
+            len(data) < 1 + byte_count
+            or byte_count < 7
+            or byte_count > FILE_RECORD_MAX_DATA_LENGTH
+            or byte_count % 7
+        ):
             return self._build_exception_response(0x14, ILLEGAL_DATA_VALUE)
 
-        # 解析子请求
-        response_data = bytearray()
-        offset = 1
-
-        while offset + 7 <= 1 + byte_count:
-            ref_type = data[offset]
-            file_number, record_number, record_length = struct.unpack(
-                ">HHH", data[offset + 1 : offset + 7]
+        # 解析全部子请求
+        blocks = []
+        total_length = 0
+        for offset in range(1, 1 + byte_count, 7):
+            ref_type, file_number, record_number, record_length = struct.unpack_from(
+                ">BHHH", data, offset
             )
-
-            if ref_type != 0x06:
+            if ref_type != 0x06 or record_length > 120:
                 return self._build_exception_response(0x14, ILLEGAL_DATA_VALUE)
+            # 将文件映射到保持寄存器
+            blocks.append((file_number * 10000 + record_number, record_length))
+            # 子响应: 长度(1) + ref_type(1) + 数据
+            total_length += 2 + record_length * 2
 
-            # 限制记录长度以避免字节溢出
-            if record_length > 120:
-                return self._build_exception_response(0x14, ILLEGAL_DATA_VALUE)
-
-            # 从保持寄存器读取（将文件映射到寄存器）
-            file_offset = file_number * 10000
-            start_address = file_offset + record_number
-            
-            values = await self.datastore.read_holding_registers(
-                slave_id, start_address, record_length
-            )
-
-            if values is None:
-                return self._build_exception_response(0x14, ILLEGAL_DATA_ADDRESS)
-
-            # 构建子响应
-            sub_response_length = record_length * 2 + 1  # 数据字节数 + ref_type
-            response_data.append(sub_response_length & 0xFF)
-            response_data.append(ref_type)
-            response_data.extend(words_to_bytes(values))
-
-            offset += 7
-
-        total_length = len(response_data)
-        if total_length > 255:
+        # 读取数据之前拒绝超长响应
+        if total_length > FILE_RECORD_MAX_DATA_LENGTH:
             return self._build_exception_response(0x14, ILLEGAL_DATA_VALUE)
-            
-        return struct.pack("BB", 0x14, total_length) + bytes(response_data)
+
+        values_list = await self.datastore.read_holding_register_blocks(slave_id, blocks)
+        if values_list is None:
+            return self._build_exception_response(0x14, ILLEGAL_DATA_ADDRESS)
+
+        response = bytearray(2 + total_length)
+        response[0] = 0x14
+        response[1] = total_length
+        offset = 2
+        for (_, record_length), values in zip(blocks, values_list):
+            response[offset] = record_length * 2 + 1
+            response[offset + 1] = 0x06
+            struct.pack_into(f">{record_length}H", response, offset + 2, *values)
+            offset += 2 + record_length * 2
+        return bytes(response)
 
     async def _handle_write_file_record(
         self, slave_id: int, data: bytes, source: str
     ) -> Optional[bytes]:
         """处理写文件记录请求 (FC21)。
-        
-        支持向多个文件写入记录。
+
+        先解析并校验全部子请求，再在一次加锁内原子写入。
         """
         if len(data) < 8:  # 最少需要 byte_count + 1个子请求(7字节) + 数据
             return self._build_exception_response(0x15, ILLEGAL_DATA_VALUE)
 
         byte_count = data[0]
-        if len(data) < 1 + byte_count:
+        if len(data) < 1 + byte_count or byte_count > FILE_RECORD_MAX_WRITE_LENGTH:
             return self._build_exception_response(0x15, ILLEGAL_DATA_VALUE)
 
-        # 解析并处理子请求
+        # 解析全部子请求
+        blocks = []
         offset = 1
-
-        while offset + 7 <= 1 + byte_count:
-            ref_type = data[offset]
-            file_number, record_number, record_length = struct.unpack(
-                ">HHH", data[offset + 1 : offset + 7]
+        end = 1 + byte_count
+        while offset + 7 <= end:
+            ref_type, file_number, record_number, record_length = struct.unpack_from(
+                ">BHHH", data, offset
             )
-
-            if ref_type != 0x06:
-                return self._build_exception_response(0x15, ILLEGAL_DATA_VALUE)
-
-            # 限制记录长度
-            if record_length > 120:
+            if ref_type != 0x06 or record_length > 120:
                 return self._build_exception_response(0x15, ILLEGAL_DATA_VALUE)
 
             data_length = record_length * 2
-            if offset + 7 + data_length > len(data):
+            if offset + 7 + data_length > end:
                 return self._build_exception_response(0x15, ILLEGAL_DATA_VALUE)
 
-            # 提取寄存器值
-            register_data = data[offset + 7 : offset + 7 + data_length]
-            values = bytes_to_words(register_data)
-
-            # 写入保持寄存器（将文件映射到寄存器）
-            file_offset = file_number * 10000
-            start_address = file_offset + record_number
-
-            success = await self.datastore.write_registers(
-                slave_id, start_address, values, source
-            )
+            values = struct.unpack_from(f">{record_length}H", data, offset + 7)
+            # 将文件映射到保持寄存器
+            blocks.append((file_number * 10000 + record_number, values))
+            offset += 7 + data_length
 
-            if not success:
-                return self._build_exception_response(0x15, ILLEGAL_DATA_ADDRESS)
+        if not blocks or offset != end:
+            return self._build_exception_response(0x15, ILLEGAL_DATA_VALUE)
 
-            offset += 7 + data_length
+        success = await self.datastore.write_holding_register_blocks(slave_id, blocks, source)
+        if not success:
+            return self._build_exception_response(0x15, ILLEGAL_DATA_ADDRESS)
 
         # 回显请求
-        return bytes([0x15]) + data[:byte_count + 1]
+        return bytes([0x15]) + data[: byte_count + 1]
 
     async def _handle_mask_write_register(
         self, slave_id: int, data: bytes, source: str
@@ -538,10 +960,56 @@ class ModbusHandler:
 
         return response
 
+    async def _handle_encapsulated_interface(
+        self, slave_id: int, data: bytes, source: str
+    ) -> Optional[bytes]:
+        """处理封装接口传输请求 (FC43)。
+
+        按 MEI 类型分发到已注册的处理器。
+        """
+        if len(data) < 1:
+            return self._build_exception_response(0x2B, ILLEGAL_DATA_VALUE)
+
+        handler = self._mei_handlers.get(data[0])
+        if handler is None:
+            return self._build_exception_response(0x2B, ILLEGAL_FUNCTION)
+        return await handler(slave_id, data, source)
+
     def _build_exception_response(self, function_code: int, exception_code: int) -> bytes:
         """构建异常响应。"""
         return struct.pack("BB", function_code | 0x80, exception_code)
 
-    def get_stats(self) -> dict:
-        """获取统计信息。"""
-        return self.stats.copy()
+    def get_stats(self, percentiles=DEFAULT_PERCENTILES) -> dict:
+        """获取统计信息。
+
+        Args:
+            percentiles: 延迟直方图需要计算的百分位列表
+
+        Returns:
+            请求计数、按功能码/从站的延迟分布、异常码统计和收发字节数
+        """
+        stats = self.stats.copy()
+        stats["function_codes"] = dict(self.stats["function_codes"])
+        stats.update(self.metrics.summary(percentiles))
+        stats["comm_counters"] = {
+            source: counters.to_dict() for source, counters in self.comm_counters.items()
+        }
+        stats["transports"] = {name: provider() for name, provider in self.stats_providers.items()}
+        return stats
+
+    def add_stats_provider(self, name: str, provider: Callable[[], Dict]) -> None:
+        """注册传输层统计提供者，其结果出现在 `get_stats()["transports"][name]` 中。
+
+        Args:
+            name: 传输层名称（如 "tcp"）
+            provider: 返回统计字典的函数
+        """
+        self.stats_providers[name] = provider
+
+    def reset_stats(self) -> None:
+        """清空统计信息。"""
+        self.stats["total_requests"] = 0
+        self.stats["successful_requests"] = 0
+        self.stats["exception_responses"] = 0
+        self.stats["function_codes"].clear()
+        self.metrics.reset()
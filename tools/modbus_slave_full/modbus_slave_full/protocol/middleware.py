@@ -0,0 +1,150 @@
+"""请求处理中间件。
+
+中间件包裹 `ModbusHandler` 的功能码分发，用于审计、访问控制、
+延迟注入和自定义指标等场景。中间件是一个异步可调用对象::
+
+    async def middleware(slave_id, function_code, data, source, call_next):
+        ...
+        return await call_next(slave_id, function_code, data, source)
+
+返回 `None` 表示不响应，返回字节串则直接作为响应 PDU。
+"""
+
+import asyncio
+import logging
+import struct
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Union
+
+from .context import current_client
+
+logger = logging.getLogger(__name__)
+
+CallNext = Callable[[int, int, bytes, str], Awaitable[Optional[bytes]]]
+Middleware = Callable[..., Awaitable[Optional[bytes]]]
+
+# 会修改数据的功能码
+WRITE_FUNCTION_CODES = frozenset((0x05, 0x06, 0x0F, 0x10, 0x15, 0x16, 0x17))
+
+
+class AuditMiddleware:
+    """审计中间件：记录写请求及其结果。"""
+
+    def __init__(self, audit_logger: Optional[logging.Logger] = None, writes_only: bool = True):
+        """初始化审计中间件。
+
+        Args:
+            audit_logger: 审计日志记录器，默认使用本模块记录器
+            writes_only: 是否只记录写请求
+        """
+        self.logger = audit_logger or logger
+        self.writes_only = writes_only
+
+    async def __call__(
+        self, slave_id: int, function_code: int, data: bytes, source: str, call_next: CallNext
+    ) -> Optional[bytes]:
+        response = await call_next(slave_id, function_code, data, source)
+        if not self.writes_only or function_code in WRITE_FUNCTION_CODES:
+            if not response:
+                result = "无响应"
+            elif response[0] & 0x80:
+                result = f"异常 0x{response[1]:02X}"
+            else:
+                result = "成功"
+            self.logger.info(
+                f"审计: 来源={source}, 从站={slave_id}, FC={function_code:02X}, "
+                f"数据={bytes(data).hex()}, 结果={result}"
+            )
+        return response
+
+
+class UnitAccessMiddleware:
+    """按从站ID限制可用功能码的访问控制中间件。"""
+
+    def __init__(
+        self,
+        allowed: Optional[Dict[int, Iterable[int]]] = None,
+        read_only_units: Iterable[int] = (),
+    ):
+        """初始化访问控制中间件。
+
+        Args:
+            allowed: 从站ID 到允许功能码集合的映射，未列出的从站不受限制
+            read_only_units: 只读从站ID列表，拒绝所有写功能码
+        """
+        self.allowed = {unit: frozenset(codes) for unit, codes in (allowed or {}).items()}
+        self.read_only_units = frozenset(read_only_units)
+
+    async def __call__(
+        self, slave_id: int, function_code: int, data: bytes, source: str, call_next: CallNext
+    ) -> Optional[bytes]:
+        codes = self.allowed.get(slave_id)
+        if (codes is not None and function_code not in codes) or (
+            slave_id in self.read_only_units and function_code in WRITE_FUNCTION_CODES
+        ):
+            # 规范规定授权失败返回非法功能异常
+            return struct.pack("BB", function_code | 0x80, 0x01)
+        return await call_next(slave_id, function_code, data, source)
+
+
+class RoleAccessMiddleware:
+    """按 TLS 客户端证书角色限制写操作的访问控制中间件（Modbus/TCP Security）。
+
+    只作用于 TLS 连接上的请求：读请求不受限制，写请求只允许证书角色在
+    `write_roles` 中列出、且目标从站在该角色允许范围内的客户端执行。
+    没有角色的证书和未列出的角色只读。非 TLS 传输上的请求不受影响。
+    """
+
+    def __init__(self, write_roles: Dict[str, Union[str, Iterable[int], None]]):
+        """初始化访问控制中间件。
+
+        Args:
+            write_roles: 角色到允许写入的从站ID列表的映射，"*" 或 None 表示所有从站
+        """
+        self.write_roles: Dict[str, Optional[frozenset]] = {
+            role: None if units is None or units == "*" else frozenset(units)
+            for role, units in write_roles.items()
+        }
+        self.denied = 0
+
+    def allows_write(self, role: Optional[str], slave_id: int) -> bool:
+        """判断角色是否允许写入指定从站。"""
+        if role is None or role not in self.write_roles:
+            return False
+        units = self.write_roles[role]
+        return units is None or slave_id in units
+
+    async def __call__(
+        self, slave_id: int, function_code: int, data: bytes, source: str, call_next: CallNext
+    ) -> Optional[bytes]:
+        if function_code in WRITE_FUNCTION_CODES:
+            client = current_client()
+            if client is not None and client.tls and not self.allows_write(client.role, slave_id):
+                self.denied += 1
+                logger.warning(
+                    f"拒绝写请求: 客户端={client.peer}, 角色={client.role}, "
+                    f"从站={slave_id}, FC={function_code:02X}"
+                )
+                # 规范规定授权失败返回非法功能异常
+                return struct.pack("BB", function_code | 0x80, 0x01)
+        return await call_next(slave_id, function_code, data, source)
+
+
+class LatencyInjectionMiddleware:
+    """延迟注入中间件：为指定从站或全部请求增加处理延迟。"""
+
+    def __init__(self, delay: float, units: Optional[Iterable[int]] = None):
+        """初始化延迟注入中间件。
+
+        Args:
+            delay: 延迟时间（秒）
+            units: 需要注入延迟的从站ID，None 表示全部
+        """
+        self.delay = delay
+        self.units = frozenset(units) if units is not None else None
+
+    async def __call__(
+        self, slave_id: int, function_code: int, data: bytes, source: str, call_next: CallNext
+    ) -> Optional[bytes]:
+        if self.units is None or slave_id in self.units:
+            await asyncio.sleep(self.delay)
+        return await call_next(slave_id, function_code, data, source)
@@ -0,0 +1,292 @@
+"""RTU 总线监听。
+
+监听模式下串口服务器只接收、从不发送：总线上的每个帧按请求和响应配对，带微秒
+时间戳，写入二进制抓包文件并推送给订阅者（如 Web 控制台的 `/ws/monitor`）。
+
+抓包文件格式（小端）::
+
+    文件头: 魔数 b"MBRTUCAP" + 版本(u16) + 波特率(u32)
+    记录:   时间戳(u64, Unix 纪元微秒) + 帧类型(u8) + 帧长度(u16) + 帧（含单元ID和CRC）
+
+时间戳为帧最后一个字节的接收时间，由数据块到达时间减去之后收到的字节的传输
+时间估算。
+"""
+
+import asyncio
+import logging
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set
+
+from ..utils.metrics import LatencyHistogram
+from .framing import expected_response_length
+from .routing import BROADCAST_UNIT_ID
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b"MBRTUCAP"
+CAPTURE_VERSION = 1
+CAPTURE_HEADER = struct.Struct("<8sHI")
+RECORD_HEADER = struct.Struct("<QBH")
+# 抓包文件写缓冲大小
+CAPTURE_BUFFER_SIZE = 64 * 1024
+
+# 帧类型
+FRAME_REQUEST = 0
+FRAME_RESPONSE = 1
+FRAME_BROADCAST = 2
+FRAME_KINDS = ("request", "response", "broadcast")
+
+# 每个订阅者队列的最大事件数，订阅者处理不过来时丢弃新事件
+SUBSCRIBER_QUEUE_SIZE = 4096
+
+
+@dataclass
+class CaptureRecord:
+    """抓包记录。"""
+
+    timestamp_us: int
+    kind: int
+    frame: bytes
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """读取抓包文件。
+
+    Args:
+        path: 抓包文件路径
+
+    Returns:
+        记录迭代器
+
+    Raises:
+        ValueError: 不是抓包文件或版本不支持
+    """
+    with open(path, "rb") as f:
+        magic, version, _ = CAPTURE_HEADER.unpack(f.read(CAPTURE_HEADER.size))
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            raise ValueError(f"不支持的抓包文件: {path}")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            timestamp_us, kind, length = RECORD_HEADER.unpack(header)
+            frame = f.read(length)
+            if len(frame) < length:
+                return
+            yield CaptureRecord(timestamp_us, kind, frame)
+
+
+def decode_pdu(kind: int, function_code: int, data: bytes) -> Dict[str, Any]:
+    """解析标准功能码的请求或响应字段。
+
+    Args:
+        kind: 帧类型
+        function_code: 功能码
+        data: 功能码之后的数据
+
+    Returns:
+        字段字典；未知功能码或数据长度不符时为空
+    """
+    if function_code & 0x80:
+        return {"exception_code": data[0]} if data else {}
+    response = kind == FRAME_RESPONSE
+    try:
+        if function_code in (0x01, 0x02, 0x03, 0x04):
+            if not response:
+                address, count = struct.unpack(">HH", data[:4])
+                return {"address": address, "count": count}
+            if function_code in (0x03, 0x04):
+                return {"registers": list(struct.unpack(f">{data[0] // 2}H", data[1:]))}
+            return {"bits": data[1:].hex()}
+        if function_code in (0x05, 0x06):
+            address, value = struct.unpack(">HH", data[:4])
+            return {"address": address, "value": value}
+        if function_code in (0x0F, 0x10):
+            address, count = struct.unpack(">HH", data[:4])
+            fields = {"address": address, "count": count}
+            if not response and function_code == 0x10:
+                fields["registers"] = list(struct.unpack(f">{count}H", data[5:]))
+            return fields
+        if function_code == 0x17:
+            if response:
+                return {"registers": list(struct.unpack(f">{data[0] // 2}H", data[1:]))}
+            read_address, read_count, write_address, write_count = struct.unpack(
+                ">HHHH", data[:8]
+            )
+            return {
+                "read_address": read_address,
+                "read_count": read_count,
+                "write_address": write_address,
+                "write_count": write_count,
+            }
+    except (struct.error, IndexError):
+        pass
+    return {}
+
+
+class BusMonitor:
+    """RTU 总线监听器：请求响应配对、抓包文件和实时事件推送。"""
+
+    def __init__(self, name: str = "rtu", capture_file: str = "", baudrate: int = 0):
+        """初始化监听器。
+
+        Args:
+            name: 串口名称，出现在推送的事件中
+            capture_file: 抓包文件路径，为空时不写文件
+            baudrate: 波特率，记录在抓包文件头中
+        """
+        self.name = name
+        self.capture_file = capture_file
+        self.baudrate = baudrate
+        self.frames = 0
+        self.requests = 0
+        self.responses = 0
+        self.exceptions = 0
+        self.broadcasts = 0
+        self.unanswered = 0
+        self.dropped_events = 0
+        self.capture_bytes = 0
+        self.latencies = LatencyHistogram()
+        self.subscribers: Set[asyncio.Queue] = set()
+        self._file: Optional[BinaryIO] = None
+        # perf_counter_ns 到 Unix 纪元纳秒的偏移
+        self._epoch_offset = time.time_ns() - time.perf_counter_ns()
+        # 等待响应的请求: (单元ID, 功能码, 时间戳)
+        self._pending: Optional[tuple] = None
+
+    def open(self) -> None:
+        """打开抓包文件并写入文件头。"""
+        if not self.capture_file or self._file is not None:
+            return
+        self._file = open(self.capture_file, "wb", buffering=CAPTURE_BUFFER_SIZE)
+        self._file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, self.baudrate))
+        self.capture_bytes = CAPTURE_HEADER.size
+        logger.info(f"RTU 总线抓包写入: {self.capture_file}")
+
+    def close(self) -> None:
+        """关闭抓包文件。"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def subscribe(self, queue: asyncio.Queue) -> None:
+        """订阅帧事件。
+
+        Args:
+            queue: 接收事件字典的队列；队列满时新事件被丢弃
+        """
+        self.subscribers.add(queue)
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """取消订阅。"""
+        self.subscribers.discard(queue)
+
+    def record(self, frame: bytes, received_ns: int) -> int:
+        """记录一个帧。
+
+        帧紧跟在同一单元ID、同一功能码的单播请求之后、且长度符合响应长度规则时为
+        响应（功能码最高位为 1 时为异常响应），否则为新的请求；请求之后没有响应即
+        开始下一个请求时计为未响应。
+
+        Args:
+            frame: CRC 正确的完整帧（含单元ID和CRC）
+            received_ns: 帧最后一个字节的接收时间（`time.perf_counter_ns()`）
+
+        Returns:
+            帧类型（`FRAME_REQUEST`、`FRAME_RESPONSE` 或 `FRAME_BROADCAST`）
+        """
+        unit_id = frame[0]
+        function_code = frame[1]
+        timestamp_us = (received_ns + self._epoch_offset) // 1000
+        pending = self._pending
+        latency_us = None
+        self.frames += 1
+        if (
+            pending
+            and unit_id == pending[0]
+            and function_code & 0x7F == pending[1]
+            and self._response_shaped(frame)
+        ):
+            kind = FRAME_RESPONSE
+            self.responses += 1
+            if function_code & 0x80:
+                self.exceptions += 1
+            latency_us = timestamp_us - pending[2]
+            self.latencies.record(latency_us)
+            self._pending = None
+        else:
+            if pending:
+                self.unanswered += 1
+            if unit_id == BROADCAST_UNIT_ID:
+                kind = FRAME_BROADCAST
+                self.broadcasts += 1
+                self._pending = None
+            else:
+                kind = FRAME_REQUEST
+                self.requests += 1
+                self._pending = (unit_id, function_code, timestamp_us)
+
+        if self._file is not None:
+            self._file.write(RECORD_HEADER.pack(timestamp_us, kind, len(frame)))
+            self._file.write(frame)
+            self.capture_bytes += RECORD_HEADER.size + len(frame)
+
+        if self.subscribers:
+            # 没有订阅者时不解析字段，保证连续满速流量下的处理速度
+            data = frame[2:-2]
+            event = {
+                "port": self.name,
+                "timestamp_us": timestamp_us,
+                "kind": FRAME_KINDS[kind],
+                "unit_id": unit_id,
+                "function_code": function_code,
+                "data": data.hex(),
+                "fields": decode_pdu(kind, function_code, data),
+            }
+            if latency_us is not None:
+                event["latency_us"] = latency_us
+            for queue in self.subscribers:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self.dropped_events += 1
+        return kind
+
+    @staticmethod
+    def _response_shaped(frame: bytes) -> bool:
+        """帧长度是否符合响应长度规则（没有规则时视为符合）。
+
+        区分无响应后重发的请求和真正的响应；FC05/06 等请求和响应相同的功能码无法区分，
+        按响应处理。
+        """
+        expected = expected_response_length(frame[1], frame[2:-2])
+        return expected is None or expected < 0 or expected + 4 == len(frame)
+
+    def get_stats(self) -> Dict:
+        """获取监听统计。"""
+        return {
+            "frames": self.frames,
+            "requests": self.requests,
+            "responses": self.responses,
+            "exceptions": self.exceptions,
+            "broadcasts": self.broadcasts,
+            "unanswered": self.unanswered,
+            "subscribers": len(self.subscribers),
+            "dropped_events": self.dropped_events,
+            "capture_file": self.capture_file,
+            "capture_bytes": self.capture_bytes,
+            "latency": self.latencies.summary(),
+        }
+
+
+def drain_events(queue: asyncio.Queue, limit: int) -> List[Dict]:
+    """取出队列中已有的事件（最多 limit 个），用于批量推送。"""
+    events = []
+    while len(events) < limit:
+        try:
+            events.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return events
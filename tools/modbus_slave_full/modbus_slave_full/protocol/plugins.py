@@ -0,0 +1,74 @@
+"""功能码插件加载模块。
+
+插件通过入口点组 `modbus_slave_full.function_codes` 或 `模块:函数` 形式的
+导入路径提供一个注册函数，注册函数接收 `ModbusHandler` 并调用
+`register_function_code` / `register_mei_type` 注册处理器，例如::
+
+    [tool.poetry.plugins."modbus_slave_full.function_codes"]
+    vendor = "vendor_pkg.modbus:register"
+"""
+
+import importlib
+import logging
+from typing import Iterable, List
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "modbus_slave_full.function_codes"
+
+
+def _iter_entry_points(group: str) -> list:
+    """列出入口点组中的所有入口点。"""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return []
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=group))
+    return list(eps.get(group, []))
+
+
+def _import_object(path: str):
+    """按 `模块:属性` 导入对象。"""
+    module_name, _, attr = path.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in filter(None, attr.split(".")):
+        obj = getattr(obj, part)
+    return obj
+
+
+def load_function_code_plugins(
+    handler, modules: Iterable[str] = (), entry_points: bool = True,
+    group: str = ENTRY_POINT_GROUP,
+) -> List[str]:
+    """加载功能码插件。
+
+    Args:
+        handler: Modbus 处理器
+        modules: 额外的 `模块:函数` 导入路径
+        entry_points: 是否发现已安装包声明的入口点
+        group: 入口点组名
+
+    Returns:
+        成功加载的插件名称列表
+    """
+    registrations = []
+    if entry_points:
+        for ep in _iter_entry_points(group):
+            registrations.append((ep.name, ep.load))
+    for path in modules:
+        registrations.append((path, lambda path=path: _import_object(path)))
+
+    loaded = []
+    for name, load in registrations:
+        try:
+            register = load()
+            register(handler)
+        except Exception as e:
+            logger.error(f"加载功能码插件 {name} 失败: {e}")
+            continue
+        loaded.append(name)
+        logger.info(f"已加载功能码插件: {name}")
+    return loaded
@@ -0,0 +1,116 @@
+"""单元ID路由。
+
+每个 TCP 监听或串口可以模拟一台独立设备或一组设备：将请求中的单元ID映射到
+数据存储中的从站ID。TCP 上未映射的单元ID返回网关路径不可用异常；
+串口总线上未映射的单元ID属于其它设备，由 `MultidropFilter` 静默丢弃。
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+# 广播单元ID
+BROADCAST_UNIT_ID = 0
+# 允许广播的功能码（写操作）
+BROADCAST_FUNCTION_CODES = frozenset({0x05, 0x06, 0x0F, 0x10, 0x15, 0x16})
+
+
+class UnitRouter:
+    """单元ID到从站ID的映射表。"""
+
+    __slots__ = ("table", "default")
+
+    def __init__(
+        self,
+        unit_map: Optional[Dict[int, int]] = None,
+        slave: Optional[int] = None,
+        slaves: Iterable[int] = (),
+    ):
+        """初始化路由表。
+
+        Args:
+            unit_map: 单元ID 到从站ID 的映射
+            slave: 其它所有单元ID映射到的从站ID（模拟只响应单元ID 1/255 等的独立设备）
+            slaves: 按原单元ID访问的从站集合
+        """
+        self.table: Dict[int, int] = {unit: unit for unit in slaves}
+        self.table.update({int(unit): int(target) for unit, target in (unit_map or {}).items()})
+        self.default = slave
+
+    def resolve(self, unit_id: int) -> Optional[int]:
+        """返回单元ID对应的从站ID，未映射时返回 None。"""
+        return self.table.get(unit_id, self.default)
+
+    def targets(self) -> List[int]:
+        """返回路由表中的所有从站ID（去重，按从站ID排序）。"""
+        targets = set(self.table.values())
+        if self.default is not None:
+            targets.add(self.default)
+        return sorted(targets)
+
+    def __repr__(self) -> str:
+        return f"UnitRouter(table={self.table!r}, default={self.default!r})"
+
+
+class MultidropFilter:
+    """多点串口总线的地址过滤。
+
+    在分发请求之前按单元ID过滤：
+
+    - 不属于本服务器的单元ID是总线上其它设备的流量，静默丢弃（不响应，避免与
+      真实设备的响应冲突），计入 `foreign_frames`
+    - 单元ID 0 的广播写请求依次应用到本服务器的所有从站，不响应；
+      其它功能码的广播被丢弃，计入 `foreign_frames`
+
+    没有路由表时，数据存储中存在的从站属于本服务器。
+    """
+
+    def __init__(self, handler, unit_router: Optional[UnitRouter] = None):
+        """初始化过滤器。
+
+        Args:
+            handler: Modbus 处理器
+            unit_router: 单元ID路由表，None 表示单元ID直接作为从站ID
+        """
+        self.handler = handler
+        self.unit_router = unit_router
+        self.foreign_frames = 0
+        self.broadcasts = 0
+
+    def resolve(self, unit_id: int) -> Optional[int]:
+        """返回单元ID对应的本地从站ID，不属于本服务器时返回 None。"""
+        if self.unit_router is not None:
+            return self.unit_router.resolve(unit_id)
+        return unit_id if unit_id in self.handler.datastore.slaves else None
+
+    def broadcast_targets(self) -> List[int]:
+        """返回广播请求应用到的从站ID列表。"""
+        if self.unit_router is not None:
+            return self.unit_router.targets()
+        return sorted(self.handler.datastore.slaves)
+
+    async def dispatch(
+        self, unit_id: int, function_code: int, data: bytes, source: str
+    ) -> Optional[bytes]:
+        """过滤并分发请求。
+
+        Args:
+            unit_id: 请求中的单元ID
+            function_code: 功能码
+            data: 请求数据
+            source: 请求来源
+
+        Returns:
+            响应 PDU；广播、其它设备的请求或处理器不响应时返回 None
+        """
+        if unit_id == BROADCAST_UNIT_ID:
+            if function_code not in BROADCAST_FUNCTION_CODES:
+                self.foreign_frames += 1
+                return None
+            self.broadcasts += 1
+            for slave_id in self.broadcast_targets():
+                await self.handler.handle_request(slave_id, function_code, data, source)
+            return None
+        target = self.resolve(unit_id)
+        if target is None:
+            self.foreign_frames += 1
+            return None
+        return await self.handler.handle_request(target, function_code, data, source)
@@ -1,22 +1,403 @@
 """Modbus RTU 服务器。
 
-实现 Modbus RTU 协议服务器，通过串口通信。
+实现 Modbus RTU 协议服务器，通过串口通信。监听模式下只接收、从不发送，
+总线上的帧交给 `BusMonitor` 记录（见 `monitor` 模块）。
 """
 
 import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Callable, Dict, List, Optional
 
 try:
     import serial_asyncio
 except ImportError:
     serial_asyncio = None
 
+from ..utils.metrics import LatencyHistogram
+from .diagnostics import CommCounters
+from .framing import UNKNOWN_LENGTH, expected_response_length
 from .handlers import ModbusHandler
-from .utils import add_crc16, verify_crc16
+from .monitor import FRAME_REQUEST, BusMonitor
+from .routing import BROADCAST_UNIT_ID, MultidropFilter, UnitRouter
+from .utils import CRC16_TABLE, add_crc16, crc16_update, verify_crc16
 
 logger = logging.getLogger(__name__)
 
+# RTU 帧最大长度: slave_id(1) + PDU(253) + CRC(2)
+MAX_RTU_FRAME_SIZE = 256
+# RTU 帧最小长度: slave_id(1) + fc(1) + CRC(2)
+MIN_RTU_FRAME_SIZE = 4
+# 串口接收环形缓冲区容量：未完成的帧加一次读取的数据
+RX_RING_SIZE = 2 * MAX_RTU_FRAME_SIZE
+
+# 请求长度解析函数签名: expected(function_code, data) -> Optional[int]
+ExpectedLength = Callable[[int, bytes], Optional[int]]
+
+# 波特率高于此值时字符间隔和帧间隔使用固定值（Modbus over Serial Line 规范 2.5.1.1）
+FIXED_TIMING_BAUDRATE = 19200
+# 固定字符间隔 T1.5 和帧间隔 T3.5（秒）
+FIXED_T15 = 0.00075
+FIXED_T35 = 0.00175
+
+
+def character_time(
+    baudrate: int, bytesize: int = 8, parity: str = "N", stopbits: float = 1
+) -> float:
+    """计算传输一个字符的时间（秒）：起始位 + 数据位 + 校验位 + 停止位。
+
+    Args:
+        baudrate: 波特率
+        bytesize: 数据位
+        parity: 校验位 ('N', 'E', 'O')
+        stopbits: 停止位
+
+    Returns:
+        字符时间（秒）
+    """
+    bits = 1 + bytesize + (0 if parity == "N" else 1) + stopbits
+    return bits / baudrate
+
+
+def char_gap(
+    baudrate: int, bytesize: int = 8, parity: str = "N", stopbits: float = 1
+) -> float:
+    """计算帧内最大字符间隔 T1.5（秒），波特率高于 19200 时固定为 0.75 ms。
+
+    Args:
+        baudrate: 波特率
+        bytesize: 数据位
+        parity: 校验位
+        stopbits: 停止位
+
+    Returns:
+        T1.5（秒）
+    """
+    if baudrate > FIXED_TIMING_BAUDRATE:
+        return FIXED_T15
+    return 1.5 * character_time(baudrate, bytesize, parity, stopbits)
+
+
+def frame_gap(
+    baudrate: int, bytesize: int = 8, parity: str = "N", stopbits: float = 1
+) -> float:
+    """计算帧间静默时间 T3.5（秒），波特率高于 19200 时固定为 1.75 ms。
+
+    Args:
+        baudrate: 波特率
+        bytesize: 数据位
+        parity: 校验位
+        stopbits: 停止位
+
+    Returns:
+        T3.5（秒）
+    """
+    if baudrate > FIXED_TIMING_BAUDRATE:
+        return FIXED_T35
+    return 3.5 * character_time(baudrate, bytesize, parity, stopbits)
+
+
+class ReceiveRing:
+    """定长接收环形缓冲区。
+
+    每个字节同时写入位置 i 和 i + capacity（镜像），任意不超过容量的未读数据在
+    底层数组中都是连续的，可以直接通过 memoryview 计算长度、校验 CRC；
+    丢弃数据只移动读位置，不复制也不重新分配内存。
+    """
+
+    def __init__(self, capacity: int = RX_RING_SIZE):
+        """初始化缓冲区。
+
+        Args:
+            capacity: 容量（字节）
+        """
+        self.capacity = capacity
+        self._data = bytearray(capacity * 2)
+        self._view = memoryview(self._data)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def free(self) -> int:
+        """剩余容量。"""
+        return self.capacity - self._size
+
+    def write(self, data: bytes) -> int:
+        """追加数据，缓冲区满时丢弃最早的数据。
+
+        Args:
+            data: 新收到的字节
+
+        Returns:
+            因缓冲区满被丢弃的字节数
+        """
+        capacity = self.capacity
+        dropped = 0
+        if len(data) > capacity:
+            dropped = len(data) - capacity
+            data = data[dropped:]
+        overflow = len(data) - self.free
+        if overflow > 0:
+            self.consume(overflow)
+            dropped += overflow
+        position = (self._start + self._size) % capacity
+        first = min(len(data), capacity - position)
+        rest = len(data) - first
+        for offset in (0, capacity):
+            self._data[offset + position : offset + position + first] = data[:first]
+            self._data[offset : offset + rest] = data[first:]
+        self._size += len(data)
+        return dropped
+
+    def view(self) -> memoryview:
+        """未读数据的只读视图（在下一次 `write` 之前有效）。"""
+        return self._view[self._start : self._start + self._size].toreadonly()
+
+    def consume(self, size: int) -> None:
+        """丢弃开头的 size 个字节。"""
+        size = min(size, self._size)
+        self._start = (self._start + size) % self.capacity
+        self._size -= size
+
+    def clear(self) -> None:
+        """清空缓冲区。"""
+        self._start = 0
+        self._size = 0
+
+
+class RTUFramer:
+    """RTU 帧切分器。
+
+    接收的数据写入定长环形缓冲区（`ReceiveRing`），按功能码长度规则确定帧边界，
+    收到完整且 CRC 正确的帧即可取出，不依赖帧间隔。串口（`gaps=True`）和
+    RTU over TCP 等没有帧间隔的字节流使用同一套匹配和重新同步算法：
+
+    - 没有长度规则的功能码按 CRC 确定帧结束；字节流中立即扫描，串口在 T3.5 静默后
+      或数据达到最大帧长度时扫描，避免 CRC 偶然匹配时把帧截断
+    - 缓冲区开头不是有效帧时进入失去同步状态（记录一次通信错误），逐字节向后滑动，
+      失去同步期间只按已知长度规则匹配；开头的假帧头声明的长度尚未收齐时，向后查找
+      已经完整且 CRC 正确的帧，不必等待假帧收齐
+    - 串口静默后剩余数据 CRC 正确时整体作为一帧，否则丢弃
+    """
+
+    def __init__(
+        self,
+        expected_length: ExpectedLength,
+        counters: Optional[CommCounters] = None,
+        gaps: bool = False,
+        capacity: int = RX_RING_SIZE,
+    ):
+        """初始化切分器。
+
+        Args:
+            expected_length: 请求长度解析函数，通常为 `ModbusHandler.expected_request_length`
+            counters: 通信计数器，出现无效数据时记录通信错误，缓冲区溢出时记录字符溢出
+            gaps: 帧之间是否有 T3.5 静默（串口）
+            capacity: 接收缓冲区容量（字节）
+        """
+        self.expected_length = expected_length
+        self.counters = counters
+        self.gaps = gaps
+        self.ring = ReceiveRing(capacity)
+        # 重新同步时跳过、缓冲区溢出和静默后丢弃的字节数
+        self.discarded_bytes = 0
+        # 上一帧是其它设备的单播请求（多点总线），下一帧也按响应长度规则匹配
+        self.response_pending = False
+        self._resyncing = False
+
+    def __len__(self) -> int:
+        return len(self.ring)
+
+    def frame_length(
+        self, buffer: bytes, offset: int = 0, expected_length: Optional[ExpectedLength] = None
+    ) -> Optional[int]:
+        """按功能码长度规则计算从 offset 开始的帧的总长度（含从站ID和CRC）。
+
+        Args:
+            buffer: 缓冲区
+            offset: 帧起始位置
+            expected_length: 长度解析函数，None 表示使用请求长度规则
+
+        Returns:
+            帧长度；需要更多字节才能确定时返回 None；没有长度规则时返回 `UNKNOWN_LENGTH`
+        """
+        if len(buffer) - offset < 2:
+            return None
+        expected = (expected_length or self.expected_length)(
+            buffer[offset + 1], buffer[offset + 2 :]
+        )
+        if expected is None:
+            return None
+        if expected < 0:
+            return UNKNOWN_LENGTH
+        return expected + 4
+
+    def write(self, data: bytes) -> int:
+        """追加收到的数据，缓冲区满时丢弃最早的数据。
+
+        Args:
+            data: 新收到的字节
+
+        Returns:
+            因缓冲区满被丢弃的字节数
+        """
+        dropped = self.ring.write(data)
+        if dropped:
+            self.discarded_bytes += dropped
+            if self.counters is not None:
+                self.counters.record_overrun()
+        return dropped
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """向字节流追加数据，返回其中所有完整且 CRC 正确的帧。
+
+        数据超过缓冲区剩余容量时分段写入，每段写入后先取出完整的帧，不丢弃数据。
+
+        Args:
+            data: 新收到的字节
+
+        Returns:
+            帧列表
+        """
+        frames = []
+        offset = 0
+        while True:
+            free = self.ring.free
+            self.write(data[offset : offset + free])
+            offset += free
+            while True:
+                frame = self.next_frame()
+                if frame is None:
+                    break
+                frames.append(frame)
+            if offset >= len(data):
+                return frames
+
+    def next_frame(self, at_gap: bool = False) -> Optional[bytes]:
+        """取出缓冲区开头的下一个完整且 CRC 正确的帧，之前的无效数据被跳过。
+
+        Args:
+            at_gap: 是否已经 T3.5 静默（串口）；静默时缓冲区中的数据都属于已结束的帧
+
+        Returns:
+            帧；需要更多数据时返回 None
+        """
+        ring = self.ring
+        while len(ring) >= MIN_RTU_FRAME_SIZE:
+            view = ring.view()
+            length = self.match(view, at_gap)
+            if length is None:
+                if not self._resyncing:
+                    return None
+                ahead = self._hunt(view)
+                if ahead is None:
+                    return None
+                self._skip(ahead)
+                continue
+            if length == UNKNOWN_LENGTH:
+                # 开头不是有效帧，滑动一个字节重新同步；每段噪声记录一次通信错误
+                if not self._resyncing:
+                    self._resyncing = True
+                    if self.counters is not None:
+                        self.counters.record_comm_error()
+                self._skip(1)
+                continue
+            self._resyncing = False
+            frame = bytes(view[:length])
+            ring.consume(length)
+            return frame
+        return None
+
+    def flush(self) -> None:
+        """T3.5 静默后丢弃缓冲区中剩余的不足一帧的数据。"""
+        self.discarded_bytes += len(self.ring)
+        self.ring.clear()
+        self._resyncing = False
+
+    def match(self, buffer: memoryview, at_gap: bool = False) -> Optional[int]:
+        """检查缓冲区开头是否为完整且 CRC 正确的帧。
+
+        依次尝试请求长度规则和（其它设备的请求之后）响应长度规则；静默后剩余数据
+        CRC 正确时作为一帧；没有长度规则的功能码按 CRC 确定帧结束。缓冲区中已有
+        最大帧长度的数据时总能得出结果。
+
+        Args:
+            buffer: 缓冲区中的未读数据
+            at_gap: 是否已经 T3.5 静默
+
+        Returns:
+            帧长度；需要更多数据时返回 None；开头不是有效帧时返回 `UNKNOWN_LENGTH`
+        """
+        available = len(buffer)
+        if available < MIN_RTU_FRAME_SIZE:
+            return None
+        rules = (None, expected_response_length) if self.response_pending else (None,)
+        incomplete = unknown = False
+        for rule in rules:
+            length = self.frame_length(buffer, expected_length=rule)
+            if length is None:
+                incomplete = True
+            elif length == UNKNOWN_LENGTH:
+                unknown = True
+            elif length > MAX_RTU_FRAME_SIZE:
+                continue
+            elif length > available:
+                incomplete = True
+            elif verify_crc16(buffer[:length]):
+                return length
+
+        if at_gap and available <= MAX_RTU_FRAME_SIZE and verify_crc16(buffer):
+            # 静默界定的帧（如没有看到请求的其它设备的响应）
+            return available
+        if unknown:
+            if at_gap or available >= MAX_RTU_FRAME_SIZE or not (self.gaps or self._resyncing):
+                length = self.scan_crc(buffer)
+                if length is not None:
+                    return length
+                # 字节流中帧可能尚未收齐
+                incomplete = incomplete or not at_gap
+            elif not self._resyncing:
+                # 串口等待静默后再扫描；失去同步时只按已知长度规则重新同步
+                incomplete = True
+        if incomplete and not at_gap and available < MAX_RTU_FRAME_SIZE:
+            return None
+        return UNKNOWN_LENGTH
+
+    def _hunt(self, buffer: memoryview) -> Optional[int]:
+        """失去同步时从第二个字节开始查找第一个完整且 CRC 正确的帧的位置。"""
+        for offset in range(1, len(buffer) - MIN_RTU_FRAME_SIZE + 1):
+            length = self.match(buffer[offset:])
+            if length is not None and length > 0:
+                return offset
+        return None
+
+    def _skip(self, size: int) -> None:
+        self.ring.consume(size)
+        self.discarded_bytes += size
+
+    @staticmethod
+    def scan_crc(buffer: bytes, offset: int = 0) -> Optional[int]:
+        """逐字节累加 CRC，返回第一个 CRC 匹配的帧长度，没有匹配时返回 None。
+
+        用于没有长度规则的功能码：CRC 在一次扫描中滑动计算，不重复校验前缀。
+
+        Args:
+            buffer: 缓冲区
+            offset: 帧起始位置
+        """
+        table = CRC16_TABLE
+        end = min(len(buffer), offset + MAX_RTU_FRAME_SIZE)
+        crc = crc16_update(0xFFFF, buffer[offset : offset + 2])
+        for position in range(offset + 2, end - 1):
+            byte = buffer[position]
+            if crc == byte | (buffer[position + 1] << 8):
+                return position + 2 - offset
+            crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+        return None
+
 
 class ModbusRTUServer:
     """Modbus RTU 服务器。"""
@@ -30,6 +411,12 @@ class ModbusRTUServer:
         parity: str = "N",
         stopbits: int = 1,
         timeout: float = 1.0,
+        t15: float = 0.0,
+        t35: float = 0.0,
+        turnaround_delay: float = 0.0,
+        unit_router: Optional[UnitRouter] = None,
+        name: str = "rtu",
+        monitor: Optional[BusMonitor] = None,
     ):
         """初始化 RTU 服务器。
 
@@ -41,6 +428,12 @@ class ModbusRTUServer:
             parity: 校验位 ('N', 'E', 'O')
             stopbits: 停止位
             timeout: 超时时间
+            t15: 帧内最大字符间隔（秒），0 表示按波特率计算
+            t35: 帧间静默时间（秒），0 表示按波特率计算
+            turnaround_delay: 收到请求到发送响应的最小间隔（秒）
+            unit_router: 单元ID路由表，None 表示单元ID直接作为从站ID
+            name: 串口名称，用作请求来源、通信计数器和统计信息的名称
+            monitor: 总线监听器，设置时为监听模式（不处理请求、不发送任何数据）
         """
         if serial_asyncio is None:
             raise ImportError("需要安装 pyserial-asyncio: pip install pyserial-asyncio")
@@ -55,6 +448,56 @@ class ModbusRTUServer:
         self.running = False
         self.reader: Optional[asyncio.StreamReader] = None
         self.writer: Optional[asyncio.StreamWriter] = None
+        self.unit_router = unit_router
+        self.filter = MultidropFilter(handler, unit_router)
+        self.name = name
+        self.monitor = monitor
+        # 每条总线有独立的 FC08 诊断计数器
+        self.counters = handler.get_comm_counters(name)
+        self.framer = RTUFramer(handler.expected_request_length, self.counters, gaps=True)
+        # 没有长度规则的帧按 T3.5 静默判断结束
+        self.t15 = t15 or char_gap(baudrate, bytesize, parity, stopbits)
+        self.t35 = t35 or frame_gap(baudrate, bytesize, parity, stopbits)
+        self.turnaround_delay = turnaround_delay
+        # 字符时间（纳秒），用于估算同一数据块中各帧的结束时间
+        self._char_ns = round(character_time(baudrate, bytesize, parity, stopbits) * 1e9)
+        # 实测间隔（微秒）：帧内数据块之间、上次总线活动到下一帧开始
+        self.char_gaps = LatencyHistogram()
+        self.frame_gaps = LatencyHistogram()
+        self.t15_violations = 0
+        self.t35_violations = 0
+        self.early_frames = 0
+        self.gap_frames = 0
+        self._last_activity = 0
+        self._request_received = 0
+        handler.add_stats_provider(name, self.get_stats)
+
+    @property
+    def discarded_bytes(self) -> int:
+        """重新同步时跳过、缓冲区溢出和静默后丢弃的字节数。"""
+        return self.framer.discarded_bytes
+
+    def get_stats(self) -> Dict:
+        """获取串口时序统计。"""
+        stats = {
+            "port": self.port,
+            "baudrate": self.baudrate,
+            "t15_us": round(self.t15 * 1e6),
+            "t35_us": round(self.t35 * 1e6),
+            "turnaround_us": round(self.turnaround_delay * 1e6),
+            "foreign_frames": self.filter.foreign_frames,
+            "broadcasts": self.filter.broadcasts,
+            "early_frames": self.early_frames,
+            "gap_frames": self.gap_frames,
+            "discarded_bytes": self.discarded_bytes,
+            "t15_violations": self.t15_violations,
+            "t35_violations": self.t35_violations,
+            "char_gaps": self.char_gaps.summary(),
+            "frame_gaps": self.frame_gaps.summary(),
+        }
+        if self.monitor is not None:
+            stats["monitor"] = self.monitor.get_stats()
+        return stats
 
     async def start(self) -> None:
         """启动 RTU 服务器。"""
@@ -66,10 +509,13 @@ class ModbusRTUServer:
                 parity=self.parity,
                 stopbits=self.stopbits,
             )
+            if self.monitor is not None:
+                self.monitor.open()
             self.running = True
             logger.info(
                 f"Modbus RTU 服务器启动: {self.port} "
                 f"({self.baudrate},{self.bytesize}{self.parity}{self.stopbits})"
+                f"{' [监听模式]' if self.monitor is not None else ''}"
             )
 
             await self._process_frames()
@@ -87,33 +533,90 @@ class ModbusRTUServer:
                 await self.writer.wait_closed()
             except Exception:
                 pass
+        if self.monitor is not None:
+            self.monitor.close()
         logger.info("Modbus RTU 服务器已停止")
 
     async def _process_frames(self) -> None:
-        """处理 RTU 帧。"""
-        buffer = bytearray()
-        idle_timeout = 0.05  # 50ms 帧间隔
+        """处理 RTU 帧。
+
+        接收的数据写入切分器的定长环形缓冲区。按功能码和字节数字段计算请求长度，收到
+        完整且 CRC 正确的帧后立即处理；没有长度规则的功能码和不完整的数据在 T3.5 静默
+        后按帧间隔处理。缓冲区开头不是有效帧时逐字节向后滑动重新同步，从噪声中恢复
+        后面的有效帧，跳过的字节计入 `discarded_bytes`（见 `RTUFramer`）。
+        """
+        framer = self.framer
 
         while self.running:
             try:
-                # 读取数据
-                chunk = await asyncio.wait_for(self.reader.read(256), timeout=idle_timeout)
-                if chunk:
-                    buffer.extend(chunk)
-                    continue
-
+                # 缓冲区为空时一直等待，否则等待 T3.5 静默
+                chunk = await asyncio.wait_for(
+                    self.reader.read(MAX_RTU_FRAME_SIZE),
+                    timeout=self.t35 if len(framer) else None,
+                )
             except asyncio.TimeoutError:
-                # 超时，处理缓冲区中的帧
-                if len(buffer) >= 4:  # 最小帧长度: slave_id(1) + fc(1) + crc(2)
-                    await self._handle_frame(bytes(buffer))
-                buffer.clear()
+                # 帧间隔，处理缓冲区中剩余的帧
+                await self._drain(at_gap=True)
                 continue
-
             except Exception as e:
                 logger.error(f"读取串口数据错误: {e}")
                 await asyncio.sleep(0.1)
                 continue
 
+            if not chunk:
+                if self.reader.at_eof():
+                    break
+                continue
+
+            self._record_gap(bool(len(framer)))
+            dropped = framer.write(chunk)
+            if dropped:
+                logger.warning(f"RTU 接收缓冲区溢出: 丢弃 {dropped} 字节")
+            await self._drain(at_gap=False)
+
+    async def _drain(self, at_gap: bool) -> None:
+        """取出并处理接收缓冲区中的帧。
+
+        Args:
+            at_gap: 是否已经 T3.5 静默；静默时缓冲区中的数据都属于已结束的帧
+        """
+        framer = self.framer
+        while True:
+            frame = framer.next_frame(at_gap)
+            if frame is None:
+                break
+            if at_gap:
+                self.gap_frames += 1
+            else:
+                self.early_frames += 1
+            await self._handle_frame(frame)
+        if at_gap:
+            framer.flush()
+
+    def _record_gap(self, in_frame: bool) -> None:
+        """记录收到数据块时与上次总线活动的间隔。
+
+        串口驱动按块交付数据，测得的是数据块之间的间隔，精度受操作系统调度和
+        驱动缓冲（如 USB 转串口的延迟定时器）影响。
+
+        Args:
+            in_frame: 数据块是否属于尚未结束的帧
+        """
+        now = time.perf_counter_ns()
+        self._request_received = now
+        last, self._last_activity = self._last_activity, now
+        if not last:
+            return
+        gap = now - last
+        if in_frame:
+            self.char_gaps.record(gap // 1000)
+            if gap > self.t15 * 1e9:
+                self.t15_violations += 1
+        else:
+            self.frame_gaps.record(gap // 1000)
+            if gap < self.t35 * 1e9:
+                self.t35_violations += 1
+
     async def _handle_frame(self, frame: bytes) -> None:
         """处理单个 RTU 帧。
 
@@ -122,11 +625,22 @@ class ModbusRTUServer:
         """
         if len(frame) < 4:
             logger.warning(f"RTU 帧太短: {len(frame)} 字节")
+            self.counters.record_comm_error()
             return
 
         # 验证 CRC
         if not verify_crc16(frame):
             logger.warning(f"RTU CRC 校验失败")
+            self.counters.record_comm_error()
+            return
+
+        self.counters.bus_message_count += 1
+
+        if self.monitor is not None:
+            # 帧之后收到的字节晚于帧结束，按字符时间从数据块到达时间倒推
+            received = self._request_received - len(self.framer) * self._char_ns
+            kind = self.monitor.record(frame, received)
+            self.framer.response_pending = kind == FRAME_REQUEST
             return
 
         # 解析帧
@@ -134,21 +648,36 @@ class ModbusRTUServer:
         function_code = frame[1]
         data = frame[2:-2]  # 去掉 slave_id, fc 和 CRC
 
+        # 总线上其它设备的请求和响应在分发前丢弃；其它设备的单播请求之后是该设备的响应
+        foreign = self.filter.foreign_frames
+        framer = self.framer
+        after_request, framer.response_pending = framer.response_pending, False
+        response = await self.filter.dispatch(slave_id, function_code, data, self.name)
+        if self.filter.foreign_frames != foreign:
+            framer.response_pending = (
+                not after_request and slave_id != BROADCAST_UNIT_ID and function_code < 0x80
+            )
+            return
+
         logger.debug(
             f"RTU 请求: 从站={slave_id}, FC={function_code:02X}, 数据长度={len(data)}"
         )
 
-        # 处理请求
-        response = await self.handler.handle_request(slave_id, function_code, data, "rtu")
-
         if response:
             # 构建响应帧
             response_frame = bytes([slave_id]) + response
             response_frame = add_crc16(response_frame)
 
+            # 保证主站有足够时间切换收发方向
+            if self.turnaround_delay:
+                elapsed = (time.perf_counter_ns() - self._request_received) / 1e9
+                if elapsed < self.turnaround_delay:
+                    await asyncio.sleep(self.turnaround_delay - elapsed)
+
             # 发送响应
             self.writer.write(response_frame)
             await self.writer.drain()
+            self._last_activity = time.perf_counter_ns()
             logger.debug(f"RTU 响应发送, 长度={len(response_frame)}")
         else:
-            logger.error(f"处理 RTU 请求失败")
+            logger.debug(f"RTU 请求无响应")
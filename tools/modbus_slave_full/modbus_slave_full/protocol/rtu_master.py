@@ -0,0 +1,204 @@
+"""Modbus RTU 主站。
+
+在串口（或伪终端）上发送 RTU 请求并读取响应，一次只进行一个事务。
+响应按功能码的长度规则切分（见 `framing.STANDARD_RESPONSE_LENGTHS`），
+收齐即返回；没有长度规则的功能码在 T3.5 静默后结束。
+
+用于伪终端测试环境和基准测试，也可以作为网关的下游总线主站。
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+try:
+    import serial_asyncio
+except ImportError:
+    serial_asyncio = None
+
+from .framing import UNKNOWN_LENGTH, expected_response_length
+from .rtu import MAX_RTU_FRAME_SIZE, MIN_RTU_FRAME_SIZE, character_time, frame_gap
+from .utils import add_crc16, verify_crc16
+
+logger = logging.getLogger(__name__)
+
+
+class RTUMaster:
+    """Modbus RTU 主站。"""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        baudrate: int = 9600,
+        timeout: float = 1.0,
+        t35: float = 0.0,
+        shape: bool = False,
+    ):
+        """初始化主站。
+
+        Args:
+            reader: 串口读取流
+            writer: 串口写入流
+            baudrate: 波特率
+            timeout: 默认响应超时（秒）
+            t35: 帧间静默时间（秒），0 表示按波特率计算
+            shape: 是否按波特率模拟线路传输时间（用于不受波特率限制的伪终端）
+        """
+        self.reader = reader
+        self.writer = writer
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.t35 = t35 or frame_gap(baudrate)
+        # 模拟线路时间时每个字符的传输时间
+        self.char_time = character_time(baudrate) if shape else 0.0
+        self.transactions = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._lock = asyncio.Lock()
+        # 总线空闲（可以发送下一帧）的事件循环时间
+        self._idle_at = 0.0
+        # 上一个事务超时，之后可能收到迟到的响应
+        self._stale = False
+
+    @classmethod
+    async def open(
+        cls,
+        port: str,
+        baudrate: int = 9600,
+        bytesize: int = 8,
+        parity: str = "N",
+        stopbits: int = 1,
+        **kwargs,
+    ) -> "RTUMaster":
+        """打开串口并创建主站。
+
+        Args:
+            port: 串口设备
+            baudrate: 波特率
+            bytesize: 数据位
+            parity: 校验位
+            stopbits: 停止位
+            **kwargs: 传给构造函数的其它参数
+
+        Returns:
+            主站
+
+        Raises:
+            ImportError: 未安装 pyserial-asyncio
+        """
+        if serial_asyncio is None:
+            raise ImportError("需要安装 pyserial-asyncio: pip install pyserial-asyncio")
+        reader, writer = await serial_asyncio.open_serial_connection(
+            url=port, baudrate=baudrate, bytesize=bytesize, parity=parity, stopbits=stopbits
+        )
+        return cls(reader, writer, baudrate=baudrate, **kwargs)
+
+    async def close(self) -> None:
+        """关闭串口。"""
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+    async def execute(
+        self, unit_id: int, pdu: bytes, timeout: Optional[float] = None
+    ) -> Optional[bytes]:
+        """发送请求并等待响应。
+
+        Args:
+            unit_id: 单元ID，0 为广播（不等待响应）
+            pdu: 请求 PDU
+            timeout: 响应超时（秒），None 表示使用默认值
+
+        Returns:
+            响应 PDU（可能是异常响应）；广播请求返回 None
+
+        Raises:
+            asyncio.TimeoutError: 超时未收到完整响应
+            ValueError: 响应 CRC 错误或单元ID、功能码与请求不符
+            ConnectionError: 串口已关闭
+        """
+        frame = add_crc16(bytes([unit_id]) + pdu)
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            if self._stale:
+                await self._discard_input()
+            # 上一帧之后保持 T3.5 静默；模拟线路时间时请求在传输完成后才到达从站
+            delay = max(self._idle_at - loop.time(), 0.0) + len(frame) * self.char_time
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.writer.write(frame)
+            await self.writer.drain()
+            self.transactions += 1
+            if unit_id == 0:
+                self._idle_at = loop.time() + self.t35
+                return None
+
+            try:
+                response = await asyncio.wait_for(
+                    self._read_response(), timeout=self.timeout if timeout is None else timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._stale = True
+                self._idle_at = loop.time() + self.t35
+                raise
+            if self.char_time:
+                await asyncio.sleep(len(response) * self.char_time)
+            self._idle_at = loop.time() + self.t35
+
+        if not verify_crc16(response):
+            self.errors += 1
+            raise ValueError("RTU 响应 CRC 校验失败")
+        if response[0] != unit_id or response[1] & 0x7F != pdu[0]:
+            self.errors += 1
+            raise ValueError(
+                f"RTU 响应与请求不符: 单元ID {response[0]}, 功能码 0x{response[1]:02X}"
+            )
+        return response[1:-2]
+
+    async def _discard_input(self) -> None:
+        """丢弃超时之后迟到的数据，直到总线静默 T3.5。"""
+        discarded = 0
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self.reader.read(MAX_RTU_FRAME_SIZE), self.t35)
+            except asyncio.TimeoutError:
+                break
+            if not chunk:
+                break
+            discarded += len(chunk)
+        if discarded:
+            logger.debug(f"丢弃 {discarded} 字节迟到的数据")
+        self._stale = False
+
+    async def _read_response(self) -> bytes:
+        """读取一个响应帧（含单元ID和CRC）。"""
+        buffer = bytearray()
+        while True:
+            length = None
+            if len(buffer) >= 2:
+                expected = expected_response_length(buffer[1], bytes(buffer[2:]))
+                if expected is not None:
+                    length = UNKNOWN_LENGTH if expected < 0 else expected + 4
+            if length is not None and length > 0:
+                if len(buffer) >= length:
+                    return bytes(buffer[:length])
+                chunk = await self.reader.read(length - len(buffer))
+            elif length == UNKNOWN_LENGTH:
+                # 没有长度规则，按 T3.5 静默判断帧结束
+                try:
+                    chunk = await asyncio.wait_for(self.reader.read(MAX_RTU_FRAME_SIZE), self.t35)
+                except asyncio.TimeoutError:
+                    if len(buffer) >= MIN_RTU_FRAME_SIZE:
+                        return bytes(buffer)
+                    continue
+            else:
+                chunk = await self.reader.read(MAX_RTU_FRAME_SIZE)
+            if not chunk:
+                raise ConnectionError("串口已关闭")
+            buffer.extend(chunk)
+            if len(buffer) > MAX_RTU_FRAME_SIZE:
+                raise ValueError(f"RTU 响应超过最大帧长度: {len(buffer)} 字节")
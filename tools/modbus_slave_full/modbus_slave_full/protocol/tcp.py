@@ -5,36 +5,208 @@
 
 import asyncio
 import logging
+import ssl
 import struct
-from typing import Optional
+from typing import List, Optional
 
-from .handlers import ModbusHandler
-from .utils import build_mbap_header, parse_mbap_header
+from .admission import ConnectionLimiter, ConnectionLimits, ConnectionWatchdog, peer_ip
+from .context import ClientInfo, set_current_client
+from .framing import FRAMING_MBAP, FRAMING_RTU, FRAMINGS, valid_mbap_length
+from .handlers import GATEWAY_PATH_UNAVAILABLE, ModbusHandler
+from .routing import UnitRouter
+from .rtu import RTUFramer
+from .tcp_protocol import ModbusTCPProtocol
+from .tls import client_info
+from .utils import add_crc16, build_exception_pdu, build_mbap_header, parse_mbap_header
 
 logger = logging.getLogger(__name__)
 
+# 流水线模式每次从套接字读取的最大字节数（每连接缓冲区上限）
+READ_CHUNK_SIZE = 4096
+# StreamReader 缓冲区上限，超过 2 倍时暂停从套接字读取
+STREAM_BUFFER_LIMIT = 4096
+
+# 可选的连接处理后端
+BACKEND_STREAMS = "streams"
+BACKEND_PROTOCOL = "protocol"
+BACKENDS = (BACKEND_STREAMS, BACKEND_PROTOCOL)
+
 
 class ModbusTCPServer:
     """Modbus TCP 服务器。"""
 
-    def __init__(self, handler: ModbusHandler, host: str = "0.0.0.0", port: int = 5020):
+    def __init__(
+        self,
+        handler: ModbusHandler,
+        host: str = "0.0.0.0",
+        port: int = 5020,
+        pipelined: bool = False,
+        max_in_flight: int = 16,
+        backend: str = BACKEND_STREAMS,
+        reuse_port: bool = False,
+        limits: Optional[ConnectionLimits] = None,
+        framing: str = FRAMING_MBAP,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        unit_router: Optional[UnitRouter] = None,
+        name: str = "tcp",
+    ):
         """初始化 TCP 服务器。
 
         Args:
             handler: Modbus 处理器
             host: 监听地址
             port: 监听端口
+            pipelined: 是否启用流水线模式（同一连接上的请求并发处理，乱序响应）
+            max_in_flight: 流水线模式下每个连接同时处理的最大请求数
+            backend: 连接处理后端，"streams" 使用 StreamReader/StreamWriter，
+                "protocol" 使用 asyncio.BufferedProtocol 直接在接收缓冲区上解析帧
+            reuse_port: 是否设置 SO_REUSEPORT，允许多个进程绑定同一端口
+            limits: 连接数、接受速率、超时和写缓冲水位限制，默认使用 `ConnectionLimits()`
+            framing: 帧格式，"mbap" 为 Modbus TCP，"rtu" 为 RTU over TCP（原始 RTU 帧，
+                按功能码长度规则切分，仅支持 streams 后端的顺序模式）
+            ssl_context: TLS 上下文（Modbus/TCP Security），见 `create_server_ssl_context`
+            unit_router: 单元ID路由表，None 表示单元ID直接作为从站ID
+            name: 监听名称，用作统计信息中的传输层名称和请求来源
+
+        Raises:
+            ValueError: 未知的后端或帧格式，或 RTU 帧格式与后端/流水线模式不兼容
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"未知的 TCP 后端: {backend}")
+        if framing not in FRAMINGS:
+            raise ValueError(f"未知的 TCP 帧格式: {framing}")
+        if framing == FRAMING_RTU and (pipelined or backend != BACKEND_STREAMS):
+            # RTU 帧没有事务ID，响应必须按请求顺序返回
+            raise ValueError("RTU over TCP 仅支持 streams 后端的顺序模式")
         self.handler = handler
         self.host = host
         self.port = port
+        self.pipelined = pipelined
+        self.max_in_flight = max(1, max_in_flight)
+        self.backend = backend
+        self.framing = framing
+        self.ssl_context = ssl_context
+        self.unit_router = unit_router
+        self.name = name
+        self.tls_handshakes = 0
+        self.tls_resumed = 0
+        self.reuse_port = reuse_port
         self.server: Optional[asyncio.Server] = None
         self.clients = set()
+        # 每个监听（虚拟设备）有独立的 FC08 诊断计数器和只听模式
+        self.counters = handler.get_comm_counters(name)
+        self.limiter = ConnectionLimiter(limits)
+        self.limits = self.limiter.limits
+        handler.add_stats_provider(name, self.get_stats)
+
+    def get_stats(self) -> dict:
+        """获取连接统计。"""
+        stats = {
+            "address": f"{self.host}:{self.port}",
+            "backend": self.backend,
+            "framing": self.framing,
+            "connections": self.limiter.stats(),
+        }
+        if self.ssl_context is not None:
+            stats["tls"] = {"handshakes": self.tls_handshakes, "resumed": self.tls_resumed}
+        return stats
+
+    def admit(self, transport: asyncio.BaseTransport, addr) -> bool:
+        """新连接准入检查，通过时设置写缓冲水位。
+
+        Args:
+            transport: 连接的传输对象
+            addr: 对端地址
+
+        Returns:
+            是否接受连接；拒绝时连接已被中止
+        """
+        reason = self.limiter.admit(peer_ip(addr))
+        if reason is not None:
+            logger.debug(f"拒绝连接 {addr}: {reason}")
+            transport.abort()
+            return False
+        if self.limits.write_buffer_high > 0:
+            transport.set_write_buffer_limits(
+                high=self.limits.write_buffer_high, low=self.limits.write_buffer_low
+            )
+        return True
+
+    def client_info(self, transport: asyncio.BaseTransport, addr) -> ClientInfo:
+        """生成已接受连接的客户端信息（TLS 连接包含证书角色），并统计会话恢复。
+
+        Args:
+            transport: 连接的传输对象
+            addr: 对端地址
+
+        Returns:
+            客户端信息
+        """
+        client = client_info(transport, addr)
+        if client.tls:
+            self.tls_handshakes += 1
+            if client.session_reused:
+                self.tls_resumed += 1
+            logger.debug(
+                f"TLS 客户端 {addr}: 角色={client.role}, 主题={client.subject}, "
+                f"会话恢复={client.session_reused}"
+            )
+        return client
+
+    def route(self, unit_id: int) -> Optional[int]:
+        """将请求中的单元ID映射到从站ID，未映射时返回 None。"""
+        if self.unit_router is None:
+            return unit_id
+        return self.unit_router.resolve(unit_id)
+
+    async def listen(self) -> asyncio.Server:
+        """绑定监听端口。
+
+        Returns:
+            asyncio 服务器对象
+        """
+        tls_options = {}
+        if self.ssl_context is not None:
+            tls_options["ssl"] = self.ssl_context
+            if self.limits.read_timeout > 0:
+                tls_options["ssl_handshake_timeout"] = self.limits.read_timeout
+        if self.backend == BACKEND_PROTOCOL:
+            loop = asyncio.get_running_loop()
+            self.server = await loop.create_server(
+                lambda: ModbusTCPProtocol(self),
+                self.host,
+                self.port,
+                reuse_port=self.reuse_port,
+                **tls_options,
+            )
+        else:
+            if self.framing == FRAMING_RTU:
+                client_handler = self._handle_client_rtu
+            elif self.pipelined:
+                client_handler = self._handle_client_pipelined
+            else:
+                client_handler = self._handle_client
+            self.server = await asyncio.start_server(
+                client_handler,
+                self.host,
+                self.port,
+                reuse_port=self.reuse_port,
+                limit=STREAM_BUFFER_LIMIT,
+                **tls_options,
+            )
+        mode = f"流水线, 并发上限 {self.max_in_flight}" if self.pipelined else "顺序"
+        if self.ssl_context is not None:
+            mode += ", TLS"
+        logger.info(
+            f"Modbus TCP 服务器启动: {self.host}:{self.port} "
+            f"({self.backend}, {self.framing}, {mode})"
+        )
+        return self.server
 
     async def start(self) -> None:
         """启动服务器。"""
-        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
-        logger.info(f"Modbus TCP 服务器启动: {self.host}:{self.port}")
+        if self.server is None:
+            await self.listen()
 
         async with self.server:
             await self.server.serve_forever()
@@ -43,9 +215,53 @@ class ModbusTCPServer:
         """停止服务器。"""
         if self.server:
             self.server.close()
+            # 流后端保存 StreamWriter，协议后端保存 Transport，二者都支持 close()
+            for client in list(self.clients):
+                client.close()
             await self.server.wait_closed()
             logger.info("Modbus TCP 服务器已停止")
 
+    async def _process_pdu(
+        self, transaction_id: int, unit_id: int, pdu: bytes, addr
+    ) -> Optional[bytes]:
+        """处理一个请求 PDU。
+
+        Args:
+            transaction_id: 事务ID
+            unit_id: 单元ID
+            pdu: 请求 PDU（功能码 + 数据）
+            addr: 客户端地址
+
+        Returns:
+            完整的响应 ADU（MBAP 头部 + PDU），不需要响应时返回 None
+        """
+        function_code = pdu[0]
+        data = pdu[1:]
+
+        logger.debug(
+            f"TCP 请求来自 {addr}: 从站={unit_id}, FC={function_code:02X}, "
+            f"数据长度={len(data)}"
+        )
+
+        # 按功能码长度规则校验 PDU
+        response = self.handler.validate_request_length(
+            unit_id, function_code, data, self.name, addr
+        )
+        if response is None:
+            slave_id = self.route(unit_id)
+            if slave_id is None:
+                response = build_exception_pdu(function_code, GATEWAY_PATH_UNAVAILABLE)
+            else:
+                # 处理请求
+                response = await self.handler.handle_request(
+                    slave_id, function_code, data, self.name
+                )
+
+        if not response:
+            logger.debug(f"请求无响应来自 {addr}")
+            return None
+        return build_mbap_header(transaction_id, unit_id, len(response) + 1) + response
+
     async def _handle_client(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
     ) -> None:
@@ -56,12 +272,20 @@ class ModbusTCPServer:
             writer: 流写入器
         """
         addr = writer.get_extra_info("peername")
+        if not self.admit(writer.transport, addr):
+            return
         logger.info(f"客户端连接: {addr}")
         self.clients.add(writer)
+        # 连接任务及其创建的处理任务共享客户端信息
+        set_current_client(self.client_info(writer.transport, addr))
+        watchdog = ConnectionWatchdog(
+            asyncio.get_running_loop(), writer.transport, self.limiter, addr
+        )
 
         try:
             while True:
                 # 读取 MBAP 头部（7字节）
+                watchdog.idle()
                 header = await reader.readexactly(7)
                 if not header:
                     break
@@ -72,48 +296,258 @@ class ModbusTCPServer:
                     break
 
                 transaction_id, protocol_id, length, unit_id = parsed
+                self.counters.bus_message_count += 1
 
                 if protocol_id != 0:
                     logger.warning(f"无效的协议ID {protocol_id} 来自 {addr}")
+                    self.counters.bus_comm_error_count += 1
+                    break
+
+                # 长度字段超出 ADU 上限的帧不可能有效，不读取其余数据直接关闭
+                if not valid_mbap_length(length):
+                    logger.warning(f"无效的 MBAP 长度 {length} 来自 {addr}")
+                    self.counters.bus_comm_error_count += 1
                     break
 
                 # 读取 PDU
+                watchdog.reading()
                 pdu = await reader.readexactly(length - 1)
-                if len(pdu) < 1:
-                    logger.warning(f"PDU太短来自 {addr}")
+                watchdog.clear()
+
+                response = await self._process_pdu(transaction_id, unit_id, pdu, addr)
+                if response:
+                    writer.write(response)
+                    if self.limits.write_buffer_high and (
+                        writer.transport.get_write_buffer_size() >= self.limits.write_buffer_high
+                    ):
+                        # 客户端不读取响应时，在写缓冲降到低水位前不再读取新请求
+                        self.limiter.write_pauses += 1
+                    await writer.drain()
+                    logger.debug(f"TCP 响应发送到 {addr}, 长度={len(response)}")
+
+        except asyncio.IncompleteReadError:
+            logger.info(f"客户端断开连接: {addr}")
+        except ConnectionResetError:
+            logger.info(f"客户端连接重置: {addr}")
+        except Exception as e:
+            logger.error(f"处理客户端错误 {addr}: {e}")
+        finally:
+            watchdog.cancel()
+            self.limiter.release(peer_ip(addr))
+            self.clients.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+            logger.info(f"客户端连接关闭: {addr}")
+
+    async def _handle_client_rtu(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """处理 RTU over TCP 客户端连接。
+
+        字节流中的帧按功能码长度规则切分（见 `RTUFramer`），不使用帧间隔计时，
+        同一次读取到的多个帧依次处理，响应批量写出。
+
+        Args:
+            reader: 流读取器
+            writer: 流写入器
+        """
+        addr = writer.get_extra_info("peername")
+        if not self.admit(writer.transport, addr):
+            return
+        logger.info(f"客户端连接: {addr} (RTU)")
+        self.clients.add(writer)
+        # 连接任务及其创建的处理任务共享客户端信息
+        set_current_client(self.client_info(writer.transport, addr))
+        transport = writer.transport
+        watchdog = ConnectionWatchdog(asyncio.get_running_loop(), transport, self.limiter, addr)
+        framer = RTUFramer(self.handler.expected_request_length, self.counters)
+
+        try:
+            while True:
+                if len(framer):
+                    watchdog.reading()
+                else:
+                    watchdog.idle()
+                chunk = await reader.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    logger.info(f"客户端断开连接: {addr}")
                     break
+                frames = framer.feed(chunk)
+                if not frames:
+                    continue
+                watchdog.clear()
 
-                function_code = pdu[0]
-                data = pdu[1:]
+                responses = []
+                for frame in frames:
+                    self.counters.bus_message_count += 1
+                    slave_id = frame[0]
+                    target = self.route(slave_id)
+                    if target is None:
+                        response = build_exception_pdu(frame[1], GATEWAY_PATH_UNAVAILABLE)
+                    else:
+                        response = await self.handler.handle_request(
+                            target, frame[1], frame[2:-2], self.name
+                        )
+                    if response:
+                        responses.append(add_crc16(bytes([slave_id]) + response))
+                if responses:
+                    writer.writelines(responses)
+                    if self.limits.write_buffer_high and (
+                        transport.get_write_buffer_size() >= self.limits.write_buffer_high
+                    ):
+                        self.limiter.write_pauses += 1
+                    await writer.drain()
 
-                logger.debug(
-                    f"TCP 请求来自 {addr}: 从站={unit_id}, FC={function_code:02X}, "
-                    f"数据长度={len(data)}"
-                )
+        except ConnectionResetError:
+            logger.info(f"客户端连接重置: {addr}")
+        except Exception as e:
+            logger.error(f"处理客户端错误 {addr}: {e}")
+        finally:
+            watchdog.cancel()
+            self.limiter.release(peer_ip(addr))
+            self.clients.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+            logger.info(f"客户端连接关闭: {addr}")
 
-                # 处理请求
-                response = await self.handler.handle_request(
-                    unit_id, function_code, data, "tcp"
-                )
+    async def _handle_client_pipelined(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """以流水线模式处理客户端连接。
 
+        解码接收缓冲区中所有完整的 ADU 并并发分发（受每连接并发上限约束），
+        已完成的响应通过 `writelines` 批量写出，每批只调用一次 `drain`。
+        Modbus TCP 通过事务ID匹配请求和响应，因此响应可以乱序返回。
+
+        只有写任务调用 `drain`（StreamWriter 不支持多个协程同时等待 `drain`）：
+        写缓冲达到高水位时写任务清除 `writable`，降到低水位后重新设置，
+        读取循环等待 `writable` 暂停读取新请求。
+
+        Args:
+            reader: 流读取器
+            writer: 流写入器
+        """
+        addr = writer.get_extra_info("peername")
+        if not self.admit(writer.transport, addr):
+            return
+        logger.info(f"客户端连接: {addr} (流水线)")
+        self.clients.add(writer)
+        # 连接任务及其创建的处理任务共享客户端信息
+        set_current_client(self.client_info(writer.transport, addr))
+        transport = writer.transport
+        watchdog = ConnectionWatchdog(asyncio.get_running_loop(), transport, self.limiter, addr)
+
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+        pending: List[bytes] = []
+        ready = asyncio.Event()
+        writable = asyncio.Event()
+        writable.set()
+        write_buffer_high = self.limits.write_buffer_high
+
+        async def dispatch(transaction_id: int, unit_id: int, pdu: bytes) -> None:
+            try:
+                response = await self._process_pdu(transaction_id, unit_id, pdu, addr)
                 if response:
-                    # 构建响应
-                    response_header = build_mbap_header(
-                        transaction_id, unit_id, len(response) + 1
-                    )
-                    writer.write(response_header + response)
+                    pending.append(response)
+                    ready.set()
+            finally:
+                in_flight.release()
+
+        async def write_loop() -> None:
+            try:
+                while True:
+                    await ready.wait()
+                    ready.clear()
+                    batch = pending[:]
+                    pending.clear()
+                    writer.writelines(batch)
+                    if write_buffer_high and transport.get_write_buffer_size() >= write_buffer_high:
+                        writable.clear()
                     await writer.drain()
-                    logger.debug(f"TCP 响应发送到 {addr}, 长度={len(response)}")
+                    writable.set()
+            finally:
+                # 连接出错时不让读取循环永远等待
+                writable.set()
+
+        writer_task = asyncio.create_task(write_loop())
+        buffer = bytearray()
+        try:
+            while True:
+                if not writable.is_set():
+                    # 客户端不读取响应：写缓冲降到低水位前暂停读取
+                    self.limiter.write_pauses += 1
+                    await writable.wait()
+                if buffer:
+                    watchdog.reading()
+                elif tasks:
+                    watchdog.clear()
                 else:
-                    logger.error(f"处理请求失败来自 {addr}")
+                    watchdog.idle()
+                chunk = await reader.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    logger.info(f"客户端断开连接: {addr}")
+                    break
+                buffer.extend(chunk)
+
+                # 解码缓冲区中所有完整的 ADU
+                offset = 0
+                invalid = False
+                while len(buffer) - offset >= 7:
+                    transaction_id, protocol_id, length, unit_id = struct.unpack_from(
+                        ">HHHB", buffer, offset
+                    )
+                    if protocol_id != 0 or not valid_mbap_length(length):
+                        invalid = True
+                        break
+                    end = offset + 6 + length
+                    if end > len(buffer):
+                        break
+                    self.counters.bus_message_count += 1
+                    pdu = bytes(buffer[offset + 7 : end])
+                    offset = end
+                    watchdog.clear()
+
+                    await in_flight.acquire()
+                    task = asyncio.create_task(dispatch(transaction_id, unit_id, pdu))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if invalid:
+                    # 无效帧之后的数据无法重新同步：完成已接收的请求后关闭连接
+                    logger.warning(
+                        f"无效的 MBAP 头部来自 {addr}: 协议ID={protocol_id}, 长度={length}"
+                    )
+                    self.counters.bus_comm_error_count += 1
+                    break
+                del buffer[:offset]
+
+            # 对端关闭写方向或收到无效帧后，完成已接收的请求再关闭连接
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            # 先停止写任务（它取出的批次已写入传输层），再按顺序写出剩余响应，
+            # 避免与写任务同时等待 drain
+            writer_task.cancel()
+            await asyncio.gather(writer_task, return_exceptions=True)
+            if pending:
+                writer.writelines(pending)
+                await writer.drain()
 
-        except asyncio.IncompleteReadError:
-            logger.info(f"客户端断开连接: {addr}")
         except ConnectionResetError:
             logger.info(f"客户端连接重置: {addr}")
         except Exception as e:
             logger.error(f"处理客户端错误 {addr}: {e}")
         finally:
+            watchdog.cancel()
+            self.limiter.release(peer_ip(addr))
+            writer_task.cancel()
+            for task in tasks:
+                task.cancel()
             self.clients.discard(writer)
             writer.close()
             try:
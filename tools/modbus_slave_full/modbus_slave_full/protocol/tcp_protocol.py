@@ -0,0 +1,234 @@
+"""基于 asyncio.BufferedProtocol 的 Modbus TCP 传输。
+
+直接在预分配的 `bytearray` 接收缓冲区上解析 MBAP 帧：事件循环通过
+`get_buffer`/`buffer_updated` 使用 `recv_into` 写入缓冲区，头部通过
+`struct.unpack_from` 解析，不为每个请求分配头部和中间缓冲。
+"""
+
+import asyncio
+import contextvars
+import logging
+import struct
+from typing import TYPE_CHECKING, List, Optional
+
+from .admission import ConnectionWatchdog, peer_ip
+from .context import set_current_client
+from .framing import MAX_TCP_ADU_SIZE, valid_mbap_length
+
+if TYPE_CHECKING:
+    from .tcp import ModbusTCPServer
+
+logger = logging.getLogger(__name__)
+
+# 每连接接收缓冲区大小（固定，不随请求增长）
+RECEIVE_BUFFER_SIZE = 4096
+
+_MBAP_HEADER = struct.Struct(">HHHB")
+
+
+class ModbusTCPProtocol(asyncio.BufferedProtocol):
+    """单个客户端连接的 Modbus TCP 协议实现。"""
+
+    def __init__(self, server: "ModbusTCPServer", buffer_size: int = RECEIVE_BUFFER_SIZE):
+        """初始化协议。
+
+        Args:
+            server: 所属的 TCP 服务器
+            buffer_size: 接收缓冲区大小
+        """
+        self.server = server
+        self.transport: Optional[asyncio.Transport] = None
+        self.addr = None
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        # 顺序模式下同一时刻只处理一个请求
+        self._max_in_flight = server.max_in_flight if server.pipelined else 1
+        self._in_flight = 0
+        self._tasks = set()
+        self._pending: List[bytes] = []
+        self._flush_scheduled = False
+        self._reading_paused = False
+        self._writing_paused = False
+        self._closing = False
+        self._admitted = False
+        self._watchdog: Optional[ConnectionWatchdog] = None
+        # 处理任务在连接的上下文中创建，继承客户端信息
+        self._context = contextvars.copy_context()
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        """连接建立。"""
+        self.transport = transport
+        self.addr = transport.get_extra_info("peername")
+        if not self.server.admit(transport, self.addr):
+            return
+        self._admitted = True
+        self.server.clients.add(transport)
+        self._watchdog = ConnectionWatchdog(
+            asyncio.get_running_loop(), transport, self.server.limiter, self.addr
+        )
+        self._watchdog.idle()
+        self._context.run(set_current_client, self.server.client_info(transport, self.addr))
+        logger.info(f"客户端连接: {self.addr}")
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """连接断开。"""
+        self._closing = True
+        if not self._admitted:
+            return
+        self._watchdog.cancel()
+        self.server.limiter.release(peer_ip(self.addr))
+        self.server.clients.discard(self.transport)
+        for task in self._tasks:
+            task.cancel()
+        if exc is None:
+            logger.info(f"客户端连接关闭: {self.addr}")
+        else:
+            logger.info(f"客户端连接重置: {self.addr} ({exc})")
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """返回接收缓冲区的空闲部分供 recv_into 写入。"""
+        if len(self._buffer) - self._end < MAX_TCP_ADU_SIZE and self._start > 0:
+            # 将未解析的数据移动到缓冲区开头
+            remaining = self._end - self._start
+            self._buffer[:remaining] = self._view[self._start : self._end]
+            self._start = 0
+            self._end = remaining
+        return self._view[self._end :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """收到新数据。"""
+        self._end += nbytes
+        self._process_buffer()
+
+    def pause_writing(self) -> None:
+        """写缓冲超过高水位：客户端没有读取响应，暂停读取新请求。"""
+        self._writing_paused = True
+        self.server.limiter.write_pauses += 1
+        self._update_reading()
+
+    def resume_writing(self) -> None:
+        """写缓冲降到低水位以下，恢复处理。"""
+        self._writing_paused = False
+        self._process_buffer()
+
+    def eof_received(self) -> bool:
+        """对端关闭写方向：处理完已接收的请求后关闭连接。"""
+        if not self._tasks and not self._pending:
+            return False
+        self._closing = True
+        return True
+
+    def _process_buffer(self) -> None:
+        """解析缓冲区中所有完整的 ADU 并分发。"""
+        buffer = self._buffer
+        counters = self.server.counters
+        while (
+            self._in_flight < self._max_in_flight
+            and not self._writing_paused
+            and self._end - self._start >= 7
+        ):
+            start = self._start
+            transaction_id, protocol_id, length, unit_id = _MBAP_HEADER.unpack_from(buffer, start)
+            # 长度字段超出 ADU 上限的帧不可能有效，不等待其余数据直接关闭
+            if protocol_id != 0 or not valid_mbap_length(length):
+                logger.warning(
+                    f"无效的 MBAP 头部来自 {self.addr}: 协议ID={protocol_id}, 长度={length}"
+                )
+                counters.bus_message_count += 1
+                counters.bus_comm_error_count += 1
+                # 丢弃剩余数据，已接收的请求响应写出后关闭连接
+                self._start = self._end = 0
+                self._closing = True
+                self._watchdog.clear()
+                self._update_reading()
+                if not self._tasks:
+                    self._flush()
+                return
+            end = start + 6 + length
+            if end > self._end:
+                break
+            counters.bus_message_count += 1
+            pdu = bytes(self._view[start + 7 : end])
+            self._start = end
+            self._dispatch(transaction_id, unit_id, pdu)
+
+        if self._start == self._end:
+            self._start = self._end = 0
+            if self._in_flight:
+                self._watchdog.clear()
+            else:
+                self._watchdog.idle()
+        elif self._in_flight < self._max_in_flight and not self._writing_paused:
+            # 缓冲区中只有不完整的帧，等待剩余部分
+            self._watchdog.reading()
+        else:
+            self._watchdog.clear()
+        self._update_reading()
+
+    def _update_reading(self) -> None:
+        """根据并发上限和写缓冲状态暂停或恢复读取。
+
+        达到并发上限时未解析的数据留在缓冲区中，只有缓冲区接近写满时才暂停读取，
+        避免顺序模式下每个请求都增删一次 selector 注册；写缓冲超过高水位时立即暂停。
+        """
+        if self._writing_paused or self._closing:
+            pause = True
+        elif self._in_flight >= self._max_in_flight:
+            pause = len(self._buffer) - (self._end - self._start) < MAX_TCP_ADU_SIZE
+        else:
+            pause = False
+        if pause and not self._reading_paused:
+            self._reading_paused = True
+            self.transport.pause_reading()
+        elif not pause and self._reading_paused:
+            self._reading_paused = False
+            self.transport.resume_reading()
+
+    def _dispatch(self, transaction_id: int, unit_id: int, pdu: bytes) -> None:
+        """创建处理任务。"""
+        self._in_flight += 1
+        task = self._context.run(
+            asyncio.ensure_future,
+            self.server._process_pdu(transaction_id, unit_id, pdu, self.addr),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        """请求处理完成。"""
+        self._tasks.discard(task)
+        self._in_flight -= 1
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logger.error(f"处理客户端错误 {self.addr}: {exc}")
+        else:
+            response = task.result()
+            if response:
+                self._pending.append(response)
+                if self._in_flight and not self._flush_scheduled:
+                    # 仍有请求在处理中：合并同一轮事件循环中完成的响应
+                    self._flush_scheduled = True
+                    asyncio.get_running_loop().call_soon(self._flush)
+        transport = self.transport
+        if transport is None or transport.is_closing():
+            return
+        self._process_buffer()
+        if not self._flush_scheduled:
+            self._flush()
+
+    def _flush(self) -> None:
+        """批量写出已完成的响应。"""
+        self._flush_scheduled = False
+        transport = self.transport
+        if transport.is_closing():
+            self._pending.clear()
+            return
+        if self._pending:
+            transport.writelines(self._pending)
+            self._pending.clear()
+        if self._closing and not self._tasks:
+            transport.close()
@@ -0,0 +1,154 @@
+"""Modbus/TCP Security (TLS) 支持。
+
+- 创建服务器端 SSL 上下文：TLS 1.2 及以上，可选客户端证书认证，
+  启用会话票据以便频繁重连的主站恢复会话，跳过完整握手
+- 从客户端证书中提取角色（Modbus/TCP Security 规范定义的 X.509v3 扩展，
+  OID 1.3.6.1.4.1.50316.802.1，值为 UTF8String），供访问控制中间件使用
+
+证书扩展直接从 DER 编码中解析，不依赖额外的 ASN.1 库。
+"""
+
+import logging
+import ssl
+from typing import Optional, Tuple
+
+from .context import ClientInfo
+
+logger = logging.getLogger(__name__)
+
+# Modbus/TCP Security 角色扩展 OID
+ROLE_OID = "1.3.6.1.4.1.50316.802.1"
+# OID 的 DER 编码（标签 0x06 + 长度 + 内容）
+_ROLE_OID_DER = bytes.fromhex("060b2b0601040183890c862201")
+
+# DER 标签
+_TAG_BOOLEAN = 0x01
+_TAG_OCTET_STRING = 0x04
+_STRING_TAGS = (0x0C, 0x13, 0x16)  # UTF8String, PrintableString, IA5String
+
+# 默认每次完整握手后发送的 TLS 1.3 会话票据数
+DEFAULT_SESSION_TICKETS = 2
+
+
+def create_server_ssl_context(
+    certfile: str,
+    keyfile: Optional[str] = None,
+    ca_file: Optional[str] = None,
+    require_client_cert: bool = False,
+    session_tickets: int = DEFAULT_SESSION_TICKETS,
+) -> ssl.SSLContext:
+    """创建 Modbus/TCP Security 服务器 SSL 上下文。
+
+    Args:
+        certfile: 服务器证书（PEM，可包含证书链）
+        keyfile: 服务器私钥（PEM），为空时从 certfile 读取
+        ca_file: 用于验证客户端证书的 CA 证书，为空时不请求客户端证书
+        require_client_cert: 是否要求客户端提供证书
+        session_tickets: 每次完整握手后发送的会话票据数，0 表示禁用会话恢复
+
+    Returns:
+        SSL 上下文
+
+    Raises:
+        ValueError: 要求客户端证书但未配置 CA 证书
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    # Modbus/TCP Security 要求 TLS 1.2 及以上
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.load_cert_chain(certfile, keyfile or None)
+    if ca_file:
+        context.load_verify_locations(ca_file)
+        context.verify_mode = ssl.CERT_REQUIRED if require_client_cert else ssl.CERT_OPTIONAL
+    elif require_client_cert:
+        raise ValueError("要求客户端证书时必须配置 ca_file")
+
+    if session_tickets > 0:
+        # TLS 1.2 使用无状态会话票据，TLS 1.3 在握手后发送 num_tickets 个票据
+        context.options &= ~ssl.OP_NO_TICKET
+        context.num_tickets = session_tickets
+    else:
+        context.options |= ssl.OP_NO_TICKET
+        context.num_tickets = 0
+    return context
+
+
+def _read_tlv(der: bytes, offset: int) -> Optional[Tuple[int, int, int]]:
+    """读取一个 DER TLV，返回 (标签, 内容起始位置, 内容结束位置)。"""
+    if offset + 2 > len(der):
+        return None
+    tag = der[offset]
+    length = der[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7F
+        if size == 0 or size > 4 or offset + size > len(der):
+            return None
+        length = int.from_bytes(der[offset : offset + size], "big")
+        offset += size
+    end = offset + length
+    if end > len(der):
+        return None
+    return tag, offset, end
+
+
+def certificate_role(der: bytes) -> Optional[str]:
+    """从 DER 编码的证书中提取 Modbus/TCP Security 角色。
+
+    Args:
+        der: 证书的 DER 编码
+
+    Returns:
+        角色名称，证书不包含角色扩展或格式错误时返回 None
+    """
+    position = der.find(_ROLE_OID_DER)
+    if position < 0:
+        return None
+    # Extension ::= SEQUENCE { extnID, critical BOOLEAN DEFAULT FALSE, extnValue OCTET STRING }
+    tlv = _read_tlv(der, position + len(_ROLE_OID_DER))
+    if tlv is not None and tlv[0] == _TAG_BOOLEAN:
+        tlv = _read_tlv(der, tlv[2])
+    if tlv is None or tlv[0] != _TAG_OCTET_STRING:
+        return None
+    value = _read_tlv(der, tlv[1])
+    if value is None or value[0] not in _STRING_TAGS or value[2] > tlv[2]:
+        return None
+    try:
+        return der[value[1] : value[2]].decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def _common_name(certificate: dict) -> Optional[str]:
+    """从 `getpeercert()` 的结果中提取主题 CN。"""
+    for rdn in certificate.get("subject", ()):
+        for key, value in rdn:
+            if key == "commonName":
+                return value
+    return None
+
+
+def client_info(transport, peer=None) -> ClientInfo:
+    """根据连接的传输对象生成客户端信息。
+
+    Args:
+        transport: 连接的传输对象
+        peer: 对端地址
+
+    Returns:
+        客户端信息；非 TLS 连接只包含对端地址
+    """
+    ssl_object = transport.get_extra_info("ssl_object")
+    if ssl_object is None:
+        return ClientInfo(peer=peer)
+    role = subject = None
+    der = ssl_object.getpeercert(binary_form=True)
+    if der:
+        role = certificate_role(der)
+        subject = _common_name(ssl_object.getpeercert() or {})
+    return ClientInfo(
+        peer=peer,
+        tls=True,
+        role=role,
+        subject=subject,
+        session_reused=ssl_object.session_reused,
+    )
@@ -0,0 +1,307 @@
+"""Modbus UDP 服务器。
+
+每个数据报承载一个完整的请求 ADU，支持两种帧格式：
+
+- "mbap": Modbus TCP 帧格式（MBAP 头部 + PDU），即 Modbus/UDP
+- "rtu": RTU 帧格式（从站ID + PDU + CRC16），即 RTU over UDP
+
+无连接，不需要准入控制和超时；同一轮事件循环中收到的数据报放入队列，
+由一个处理任务按批次顺序处理，避免为每个数据报创建任务。转发到其它设备的
+请求（如网关转发到下游 RTU 总线，见 `ModbusHandler.add_forwarder`）的处理时间
+取决于下游设备，为其单独创建任务并以客户端地址作为当前客户端，慢的下游设备
+不阻塞本地单元的请求，网关也能按客户端地址公平排队。
+"""
+
+import asyncio
+import collections
+import logging
+import struct
+from typing import Deque, Optional, Set, Tuple
+
+from .context import ClientInfo, set_current_client
+from .framing import FRAMING_MBAP, FRAMING_RTU, FRAMINGS, MAX_PDU_SIZE, valid_mbap_length
+from .handlers import ModbusHandler
+from .utils import add_crc16, build_mbap_header, verify_crc16
+
+logger = logging.getLogger(__name__)
+
+# 每批最多处理的数据报数
+DEFAULT_BATCH_SIZE = 64
+# 接收队列上限，处理跟不上时丢弃新数据报（同时限制转发中的请求数）
+DEFAULT_MAX_QUEUE = 1024
+
+_MBAP_HEADER = struct.Struct(">HHHB")
+
+# 解码后的请求：(事务ID, 单元ID, PDU)
+Request = Tuple[int, int, bytes]
+
+
+class ModbusUDPProtocol(asyncio.DatagramProtocol):
+    """Modbus UDP 数据报协议。"""
+
+    def __init__(self, server: "ModbusUDPServer"):
+        """初始化协议。
+
+        Args:
+            server: 所属的 UDP 服务器
+        """
+        self.server = server
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self._queue: Deque[Tuple[bytes, tuple]] = collections.deque()
+        self._task: Optional[asyncio.Task] = None
+        # 转发中的请求任务
+        self._forwarding: Set[asyncio.Task] = set()
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        """套接字就绪。"""
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        """收到数据报：放入队列，没有处理任务时创建一个。"""
+        server = self.server
+        server.datagrams_received += 1
+        if len(self._queue) >= server.max_queue:
+            server.datagrams_dropped += 1
+            server.counters.record_overrun()
+            return
+        self._queue.append((data, addr))
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._process_queue())
+
+    def error_received(self, exc: Exception) -> None:
+        """发送或接收错误（如 ICMP 端口不可达），UDP 下忽略。"""
+        logger.debug(f"UDP 套接字错误: {exc}")
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """套接字关闭。"""
+        if self._task is not None:
+            self._task.cancel()
+        for task in self._forwarding:
+            task.cancel()
+        self._queue.clear()
+
+    async def _process_queue(self) -> None:
+        """按批次处理队列中的数据报，队列为空时结束。"""
+        server = self.server
+        queue = self._queue
+        try:
+            while queue:
+                count = min(len(queue), server.batch_size)
+                server.batches += 1
+                if count > server.max_batch:
+                    server.max_batch = count
+                for _ in range(count):
+                    data, addr = queue.popleft()
+                    try:
+                        request = server.decode_datagram(data, addr)
+                        if request is None:
+                            continue
+                        if server.handler.is_forwarded(request[1]):
+                            self._forward(request, addr)
+                            continue
+                        response = await server.process_request(request, addr)
+                    except Exception as e:
+                        logger.error(f"处理 UDP 请求错误 {addr}: {e}")
+                        continue
+                    self._send(response, addr)
+        finally:
+            self._task = None
+
+    def _forward(self, request: Request, addr) -> None:
+        """为转发的请求创建处理任务，转发中的请求达到上限时丢弃。"""
+        server = self.server
+        if len(self._forwarding) >= server.max_queue:
+            server.datagrams_dropped += 1
+            server.counters.record_overrun()
+            return
+        task = asyncio.ensure_future(self._process_forwarded(request, addr))
+        self._forwarding.add(task)
+        task.add_done_callback(self._forwarding.discard)
+
+    async def _process_forwarded(self, request: Request, addr) -> None:
+        """处理转发的请求，以客户端地址作为当前客户端。"""
+        set_current_client(ClientInfo(peer=addr))
+        try:
+            response = await self.server.process_request(request, addr)
+        except Exception as e:
+            logger.error(f"处理 UDP 请求错误 {addr}: {e}")
+            return
+        self._send(response, addr)
+
+    def _send(self, response: Optional[bytes], addr) -> None:
+        """发送响应数据报。"""
+        if response and not self.transport.is_closing():
+            self.transport.sendto(response, addr)
+            self.server.datagrams_sent += 1
+
+
+class ModbusUDPServer:
+    """Modbus UDP 服务器。"""
+
+    def __init__(
+        self,
+        handler: ModbusHandler,
+        host: str = "0.0.0.0",
+        port: int = 5020,
+        framing: str = FRAMING_MBAP,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+    ):
+        """初始化 UDP 服务器。
+
+        Args:
+            handler: Modbus 处理器
+            host: 监听地址
+            port: 监听端口
+            framing: 帧格式，"mbap" 或 "rtu"
+            batch_size: 每批最多处理的数据报数
+            max_queue: 接收队列上限
+
+        Raises:
+            ValueError: 未知的帧格式
+        """
+        if framing not in FRAMINGS:
+            raise ValueError(f"未知的 UDP 帧格式: {framing}")
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.framing = framing
+        self.batch_size = max(1, batch_size)
+        self.max_queue = max(1, max_queue)
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.protocol: Optional[ModbusUDPProtocol] = None
+        self.counters = handler.get_comm_counters("udp")
+        self.datagrams_received = 0
+        self.datagrams_sent = 0
+        self.datagrams_dropped = 0
+        self.batches = 0
+        self.max_batch = 0
+        self._stopped: Optional[asyncio.Event] = None
+        handler.add_stats_provider("udp", self.get_stats)
+
+    def get_stats(self) -> dict:
+        """获取数据报统计。"""
+        return {
+            "framing": self.framing,
+            "datagrams_received": self.datagrams_received,
+            "datagrams_sent": self.datagrams_sent,
+            "datagrams_dropped": self.datagrams_dropped,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+        }
+
+    async def listen(self) -> asyncio.DatagramTransport:
+        """绑定监听端口。
+
+        Returns:
+            数据报传输对象
+        """
+        loop = asyncio.get_running_loop()
+        self.transport, self.protocol = await loop.create_datagram_endpoint(
+            lambda: ModbusUDPProtocol(self), local_addr=(self.host, self.port)
+        )
+        logger.info(f"Modbus UDP 服务器启动: {self.host}:{self.port} ({self.framing})")
+        return self.transport
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """实际绑定的地址（端口为 0 时由系统分配）。"""
+        return self.transport.get_extra_info("sockname")[:2]
+
+    async def start(self) -> None:
+        """启动服务器并运行到停止。"""
+        self._stopped = asyncio.Event()
+        if self.transport is None:
+            await self.listen()
+        await self._stopped.wait()
+
+    async def stop(self) -> None:
+        """停止服务器。"""
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+            logger.info("Modbus UDP 服务器已停止")
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def process_datagram(self, data: bytes, addr) -> Optional[bytes]:
+        """处理一个请求数据报。
+
+        Args:
+            data: 数据报内容
+            addr: 客户端地址
+
+        Returns:
+            响应数据报，不需要响应或请求无效时返回 None
+        """
+        request = self.decode_datagram(data, addr)
+        if request is None:
+            return None
+        return await self.process_request(request, addr)
+
+    def decode_datagram(self, data: bytes, addr) -> Optional[Request]:
+        """校验并解码请求数据报。
+
+        Args:
+            data: 数据报内容
+            addr: 客户端地址
+
+        Returns:
+            (事务ID, 单元ID, PDU)，数据报无效时返回 None
+        """
+        transaction_id = 0
+        if self.framing == FRAMING_RTU:
+            if len(data) < 4 or len(data) > MAX_PDU_SIZE + 3 or not verify_crc16(data):
+                logger.warning(f"无效的 RTU 数据报来自 {addr}: {len(data)} 字节")
+                self.counters.record_comm_error()
+                return None
+            unit_id = data[0]
+            pdu = data[1:-2]
+        else:
+            if len(data) < 8:
+                logger.warning(f"MBAP 数据报太短来自 {addr}: {len(data)} 字节")
+                self.counters.record_comm_error()
+                return None
+            transaction_id, protocol_id, length, unit_id = _MBAP_HEADER.unpack_from(data)
+            # 每个数据报恰好包含一个 ADU，长度字段必须与数据报长度一致
+            if protocol_id != 0 or not valid_mbap_length(length) or length != len(data) - 6:
+                logger.warning(
+                    f"无效的 MBAP 数据报来自 {addr}: 协议ID={protocol_id}, "
+                    f"长度={length}, 数据报={len(data)} 字节"
+                )
+                self.counters.record_comm_error()
+                return None
+            pdu = data[7:]
+        self.counters.bus_message_count += 1
+        return transaction_id, unit_id, pdu
+
+    async def process_request(self, request: Request, addr) -> Optional[bytes]:
+        """处理解码后的请求。
+
+        Args:
+            request: `decode_datagram` 返回的 (事务ID, 单元ID, PDU)
+            addr: 客户端地址
+
+        Returns:
+            响应数据报，不需要响应时返回 None
+        """
+        transaction_id, unit_id, pdu = request
+        function_code = pdu[0]
+        request = pdu[1:]
+        logger.debug(
+            f"UDP 请求来自 {addr}: 从站={unit_id}, FC={function_code:02X}, "
+            f"数据长度={len(request)}"
+        )
+
+        # 按功能码长度规则校验 PDU
+        response = self.handler.validate_request_length(
+            unit_id, function_code, request, "udp", addr
+        )
+        if response is None:
+            response = await self.handler.handle_request(unit_id, function_code, request, "udp")
+
+        if not response:
+            return None
+        if self.framing == FRAMING_RTU:
+            return add_crc16(bytes([unit_id]) + response)
+        return build_mbap_header(transaction_id, unit_id, len(response) + 1) + response
@@ -7,6 +7,24 @@ import struct
 from typing import List, Optional, Tuple
 
 
+def _build_crc16_table() -> List[int]:
+    """生成 CRC16-Modbus（多项式 0xA001）的逐字节查找表。"""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        table.append(crc)
+    return table
+
+
+# CRC16 查找表：每个字节一次查表，代替逐位移位
+CRC16_TABLE = _build_crc16_table()
+
+
 def calculate_crc16(data: bytes) -> int:
     """计算 CRC16-Modbus 校验码。
 
@@ -16,14 +34,22 @@ def calculate_crc16(data: bytes) -> int:
     Returns:
         CRC16 值
     """
-    crc = 0xFFFF
+    return crc16_update(0xFFFF, data)
+
+
+def crc16_update(crc: int, data: bytes) -> int:
+    """在已有 CRC16-Modbus 中间值上继续累加数据（用于逐字节扫描帧边界）。
+
+    Args:
+        crc: 当前 CRC 值（初始为 0xFFFF）
+        data: 新数据
+
+    Returns:
+        更新后的 CRC16 值
+    """
+    table = CRC16_TABLE
     for byte in data:
-        crc ^= byte
-        for _ in range(8):
-            if crc & 0x0001:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                crc >>= 1
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
     return crc
 
 
@@ -57,6 +83,49 @@ def add_crc16(data: bytes) -> bytes:
     return data + struct.pack("<H", crc)
 
 
+def calculate_lrc(data: bytes) -> int:
+    """计算 Modbus ASCII 的 LRC 校验码（字节和的二进制补码）。
+
+    Args:
+        data: 要校验的数据（地址 + PDU）
+
+    Returns:
+        LRC 值
+    """
+    return -sum(data) & 0xFF
+
+
+def encode_ascii_frame(data: bytes) -> bytes:
+    """将地址 + PDU 编码为 Modbus ASCII 帧（':' + 十六进制 + LRC + CRLF）。
+
+    Args:
+        data: 地址 + PDU
+
+    Returns:
+        ASCII 帧
+    """
+    return b":" + (data + bytes([calculate_lrc(data)])).hex().upper().encode() + b"\r\n"
+
+
+def decode_ascii_frame(frame: bytes) -> Optional[bytes]:
+    """解码 Modbus ASCII 帧并校验 LRC。
+
+    Args:
+        frame: ':' 之后、CRLF 之前的十六进制字符
+
+    Returns:
+        地址 + PDU；字符非法、长度为奇数或 LRC 错误时返回 None
+    """
+    try:
+        data = bytes.fromhex(frame.decode("ascii"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    # 地址(1) + 功能码(1) + LRC(1)
+    if len(data) < 3 or sum(data) & 0xFF:
+        return None
+    return data[:-1]
+
+
 def parse_mbap_header(header: bytes) -> Optional[Tuple[int, int, int, int]]:
     """解析 MBAP 头部。
 
@@ -86,6 +155,19 @@ def build_mbap_header(transaction_id: int, unit_id: int, length: int) -> bytes:
     return struct.pack(">HHHB", transaction_id, 0, length, unit_id)
 
 
+def build_exception_pdu(function_code: int, exception_code: int) -> bytes:
+    """构建异常响应 PDU。
+
+    Args:
+        function_code: 请求功能码
+        exception_code: 异常码
+
+    Returns:
+        异常响应 PDU
+    """
+    return struct.pack("BB", function_code | 0x80, exception_code)
+
+
 def bytes_to_bits(data: bytes, count: int) -> List[bool]:
     """将字节数组转换为位列表。
 
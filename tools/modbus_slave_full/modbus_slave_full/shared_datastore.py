@@ -0,0 +1,301 @@
+"""共享内存数据存储模块。
+
+多进程工作模式下，所有工作进程通过 `multiprocessing.shared_memory` 共享同一份
+寄存器映像。各进程的读写都在一个跨进程锁内完成，保证多寄存器读写的原子性；
+锁内只进行内存读写，保存数据文件时在锁内取快照、锁外写文件。
+"""
+
+import array
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .datastore import DataBlock, ModbusDataStore
+
+logger = logging.getLogger(__name__)
+
+# 每个从站的数据区大小: (线圈, 离散输入, 保持寄存器, 输入寄存器)
+SlaveLayout = Tuple[int, int, int, int]
+
+# 共享内存头部：第 0 字节为"数据已修改"标志，第 4-7 字节为跨进程锁持有者的进程号
+_HEADER_SIZE = 8
+_HOLDER_OFFSET = 4
+
+# 等待跨进程锁的超时时间和轮询间隔（秒）；锁内只有内存读写，正常情况下很快释放
+LOCK_TIMEOUT = 1.0
+LOCK_POLL_INTERVAL = 0.001
+
+
+class SharedArray:
+    """共享内存上的定长数组，接口与 `list` 的索引和切片操作兼容。"""
+
+    __slots__ = ("_view", "_typecode", "_boolean")
+
+    def __init__(self, buffer: memoryview, typecode: str, boolean: bool = False):
+        """初始化数组。
+
+        Args:
+            buffer: 共享内存中的字节区域
+            typecode: 元素类型（"B" 或 "H"）
+            boolean: 读取时是否转换为 bool
+        """
+        self._view = buffer.cast(typecode)
+        self._typecode = typecode
+        self._boolean = boolean
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            values = self._view[index].tolist()
+            return [bool(v) for v in values] if self._boolean else values
+        value = self._view[index]
+        return bool(value) if self._boolean else value
+
+    def __setitem__(self, index: Union[int, slice], value) -> None:
+        if isinstance(index, slice):
+            self._view[index] = array.array(self._typecode, [int(v) for v in value])
+        else:
+            self._view[index] = int(value)
+
+    def __iter__(self) -> Iterator:
+        return iter(self[:])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, SharedArray)):
+            return self[:] == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SharedArray({self[:]!r})"
+
+    def release(self) -> None:
+        """释放对共享内存的引用。"""
+        self._view.release()
+
+
+class _InterProcessLock:
+    """异步上下文管理器：进程内 asyncio 锁 + 跨进程锁。
+
+    进程内锁保证同一进程中同时只有一个协程等待跨进程锁。跨进程锁以非阻塞方式
+    轮询获取，等待期间不阻塞事件循环；持有者的进程号记录在共享内存头部，持有者
+    异常退出（如被强制结束）后由等待者释放锁，持有者仍在运行时超时报错。
+    """
+
+    def __init__(self, lock, holder: memoryview, timeout: float = LOCK_TIMEOUT):
+        """初始化锁。
+
+        Args:
+            lock: 跨进程锁（`multiprocessing.Lock`）
+            holder: 共享内存中记录持有者进程号的区域
+            timeout: 等待跨进程锁的超时时间（秒）
+        """
+        self._local = asyncio.Lock()
+        self._lock = lock
+        self._holder = holder.cast("I")
+        self.timeout = timeout
+
+    async def __aenter__(self) -> None:
+        await self._local.acquire()
+        try:
+            await self._acquire()
+        except BaseException:
+            self._local.release()
+            raise
+        self._holder[0] = os.getpid()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._holder[0] = 0
+        self._lock.release()
+        self._local.release()
+
+    async def _acquire(self) -> None:
+        """轮询获取跨进程锁。
+
+        Raises:
+            TimeoutError: 持有锁的进程在超时时间内没有释放锁
+        """
+        deadline = time.monotonic() + self.timeout
+        while not self._lock.acquire(block=False):
+            if time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                continue
+            pid = self._holder[0]
+            if pid and not _process_alive(pid):
+                logger.error(f"持有跨进程锁的进程 {pid} 已退出，释放锁")
+                self._holder[0] = 0
+                self._lock.release()
+                deadline = time.monotonic() + self.timeout
+                continue
+            raise TimeoutError(f"等待跨进程锁超时（持有者进程 {pid}）")
+
+    def release(self) -> None:
+        """释放对共享内存的引用。"""
+        self._holder.release()
+
+
+def _process_alive(pid: int) -> bool:
+    """进程是否仍在运行。"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def shared_memory_size(layout: Dict[int, SlaveLayout]) -> int:
+    """计算布局所需的共享内存字节数。"""
+    size = _HEADER_SIZE
+    for coils, discrete_inputs, holding_registers, input_registers in layout.values():
+        size += (holding_registers + input_registers) * 2
+        size += coils + discrete_inputs + ((coils + discrete_inputs) & 1)
+    return size
+
+
+class SharedDataStore(ModbusDataStore):
+    """基于共享内存的 Modbus 数据存储。
+
+    创建者（`name=None`）分配共享内存并负责保存数据文件和释放共享内存；
+    其它进程通过相同的 `name`、`layout` 和 `lock` 附加到同一份寄存器映像。
+    从站布局在创建后固定，不支持调整大小。历史记录仅保存在各进程本地。
+    """
+
+    def __init__(
+        self,
+        layout: Dict[int, SlaveLayout],
+        name: Optional[str] = None,
+        lock=None,
+        data_file: Optional[Path] = None,
+        history_max_size: int = 1000,
+    ):
+        """创建或附加共享数据存储。
+
+        Args:
+            layout: 从站ID 到 (线圈, 离散输入, 保持寄存器, 输入寄存器) 数量的映射
+            name: 共享内存名称，None 表示创建新的共享内存
+            lock: 跨进程锁（`multiprocessing.Lock`），创建者可省略
+            data_file: 数据文件路径
+            history_max_size: 历史记录最大数量
+        """
+        self.layout = dict(sorted(layout.items()))
+        self.owner = name is None
+        if self.owner:
+            self.shm = SharedMemory(create=True, size=shared_memory_size(self.layout))
+        else:
+            self.shm = SharedMemory(name=name)
+        self.process_lock = lock if lock is not None else multiprocessing.get_context("spawn").Lock()
+        self._arrays: List[SharedArray] = []
+        super().__init__(data_file=data_file, history_max_size=history_max_size)
+        self._lock = _InterProcessLock(
+            self.process_lock, self.shm.buf[_HOLDER_OFFSET:_HEADER_SIZE]
+        )
+
+        offset = _HEADER_SIZE
+        buffer = self.shm.buf
+        for slave_id, (coils, discrete_inputs, holding_registers, input_registers) in (
+            self.layout.items()
+        ):
+            arrays = []
+            for count, typecode, boolean in (
+                (holding_registers, "H", False),
+                (input_registers, "H", False),
+                (coils, "B", True),
+                (discrete_inputs, "B", True),
+            ):
+                size = count * (2 if typecode == "H" else 1)
+                arrays.append(SharedArray(buffer[offset : offset + size], typecode, boolean))
+                offset += size
+            offset += (coils + discrete_inputs) & 1
+            self._arrays.extend(arrays)
+            self.slaves[slave_id] = DataBlock(
+                coils=arrays[2],
+                discrete_inputs=arrays[3],
+                holding_registers=arrays[0],
+                input_registers=arrays[1],
+            )
+        if self.owner:
+            logger.info(
+                f"共享数据存储已创建: {self.shm.name}, {len(self.layout)} 个从站, "
+                f"{self.shm.size} 字节"
+            )
+
+    @property
+    def name(self) -> str:
+        """共享内存名称。"""
+        return self.shm.name
+
+    @property
+    def _modified(self) -> bool:
+        return bool(self.shm.buf[0])
+
+    @_modified.setter
+    def _modified(self, value: bool) -> None:
+        # 任何进程都可以标记数据已修改，只有创建者（负责保存）可以清除标志
+        if value or self.owner:
+            self.shm.buf[0] = 1 if value else 0
+
+    def initialize_slave(
+        self,
+        slave_id: int,
+        coils: int = 100,
+        discrete_inputs: int = 100,
+        holding_registers: int = 100,
+        input_registers: int = 100,
+    ) -> None:
+        """共享数据存储的从站在创建时由布局确定，此方法只校验布局。
+
+        Raises:
+            ValueError: 从站不在布局中或大小不一致
+        """
+        if self.layout.get(slave_id) != (coils, discrete_inputs, holding_registers, input_registers):
+            raise ValueError(f"从站 {slave_id} 与共享数据存储布局不一致")
+
+    def resize_slave(self, slave_id: int, *args, **kwargs) -> bool:
+        """共享数据存储不支持调整从站大小。"""
+        logger.warning(f"共享数据存储不支持调整从站 {slave_id} 的大小")
+        return False
+
+    async def load_from_file(self) -> None:
+        """从文件加载数据到共享内存，超出布局的部分被忽略。"""
+        if not self.data_file or not self.data_file.exists():
+            return
+
+        try:
+            with open(self.data_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            async with self._lock:
+                for slave_id_str, block_data in data.get("slaves", {}).items():
+                    block = self.slaves.get(int(slave_id_str))
+                    if block is None:
+                        continue
+                    for data_type in (
+                        "coils", "discrete_inputs", "holding_registers", "input_registers"
+                    ):
+                        target = getattr(block, data_type)
+                        values = block_data.get(data_type, [])[: len(target)]
+                        target[: len(values)] = values
+
+            logger.info(f"已从 {self.data_file} 加载数据")
+        except Exception as e:
+            logger.error(f"加载数据失败: {e}")
+
+    def close(self) -> None:
+        """断开共享内存，创建者同时释放共享内存。"""
+        for shared_array in self._arrays:
+            shared_array.release()
+        self._arrays.clear()
+        self._lock.release()
+        self.slaves.clear()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,126 @@
+"""伪终端串口测试环境。
+
+没有串口硬件时，用伪终端（pty）对代替 RS-485 总线：从端运行 `ModbusRTUServer`，
+主端运行 `RTUMaster`。伪终端不受波特率限制，主站可以按波特率模拟线路传输时间，
+从而在任何 Linux 机器上得到可重复的 RTU 测试和基准结果。
+
+示例::
+
+    async with RTUHarness(handler, baudrate=19200) as harness:
+        response = await harness.master.execute(1, b"\\x03\\x00\\x00\\x00\\x0A")
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+from .protocol.handlers import ModbusHandler
+from .protocol.rtu import ModbusRTUServer
+from .protocol.rtu_master import RTUMaster
+
+# 等待服务器打开串口的最长时间（秒）
+SERVER_START_TIMEOUT = 2.0
+
+
+async def open_fd_stream(fd: int):
+    """将文件描述符（如伪终端主端）包装为 asyncio 流。
+
+    读写各使用一个复制的描述符，关闭流时不影响原描述符。
+
+    Args:
+        fd: 文件描述符
+
+    Returns:
+        (StreamReader, StreamWriter)
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(os.dup(fd), "rb", buffering=0)
+    )
+    transport, protocol = await loop.connect_write_pipe(
+        lambda: asyncio.StreamReaderProtocol(asyncio.StreamReader()),
+        os.fdopen(os.dup(fd), "wb", buffering=0),
+    )
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    return reader, writer
+
+
+class RTUHarness:
+    """伪终端 RTU 测试环境（异步上下文管理器）。"""
+
+    def __init__(
+        self,
+        handler: ModbusHandler,
+        baudrate: int = 115200,
+        shape: bool = True,
+        timeout: float = 1.0,
+        **server_kwargs,
+    ):
+        """初始化测试环境。
+
+        Args:
+            handler: Modbus 处理器
+            baudrate: 模拟的波特率，同时用于计算服务器和主站的 T3.5
+            shape: 主站是否按波特率模拟线路传输时间
+            timeout: 主站默认响应超时（秒）
+            **server_kwargs: 传给 `ModbusRTUServer` 的其它参数
+        """
+        self.handler = handler
+        self.baudrate = baudrate
+        self.shape = shape
+        self.timeout = timeout
+        self.server_kwargs = server_kwargs
+        self.server: Optional[ModbusRTUServer] = None
+        self.master: Optional[RTUMaster] = None
+        self.master_fd = -1
+        self.slave_fd = -1
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def device(self) -> str:
+        """伪终端从端的设备路径。"""
+        return os.ttyname(self.slave_fd)
+
+    async def __aenter__(self) -> "RTUHarness":
+        self.master_fd, self.slave_fd = os.openpty()
+        # 伪终端不支持校验位，使用 8N1
+        self.server = ModbusRTUServer(
+            self.handler,
+            self.device,
+            baudrate=self.baudrate,
+            bytesize=8,
+            parity="N",
+            stopbits=1,
+            **self.server_kwargs,
+        )
+        self._task = asyncio.create_task(self.server.start())
+        # 服务器打开串口（设置原始模式、关闭回显）之后主站才能发送
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SERVER_START_TIMEOUT
+        while not self.server.running:
+            if self._task.done():
+                self._task.result()
+            if loop.time() > deadline:
+                raise TimeoutError(f"RTU 服务器未能打开 {self.device}")
+            await asyncio.sleep(0.005)
+        reader, writer = await open_fd_stream(self.master_fd)
+        self.master = RTUMaster(
+            reader, writer, baudrate=self.baudrate, timeout=self.timeout, shape=self.shape
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self.master is not None:
+            await self.master.close()
+        if self.server is not None:
+            await self.server.stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        for fd in (self.master_fd, self.slave_fd):
+            if fd >= 0:
+                os.close(fd)
@@ -2,5 +2,6 @@
 
 from .history import HistoryEntry, HistoryManager
 from .logger import setup_logging
+from .metrics import LatencyHistogram, RequestMetrics
 
-__all__ = ["setup_logging", "HistoryManager", "HistoryEntry"]
+__all__ = ["setup_logging", "HistoryManager", "HistoryEntry", "LatencyHistogram", "RequestMetrics"]
@@ -0,0 +1,75 @@
+"""事件循环选择模块。
+
+支持标准 asyncio 事件循环和可选的 uvloop。uvloop 未安装时自动回退到 asyncio。
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
+LOOP_AUTO = "auto"
+LOOP_ASYNCIO = "asyncio"
+LOOP_UVLOOP = "uvloop"
+LOOP_BACKENDS = (LOOP_AUTO, LOOP_ASYNCIO, LOOP_UVLOOP)
+
+
+def uvloop_available() -> bool:
+    """uvloop 是否可用。"""
+    return uvloop is not None
+
+
+def install_event_loop_policy(backend: str = LOOP_AUTO) -> str:
+    """按配置安装事件循环策略。
+
+    必须在创建事件循环（`asyncio.run`）之前调用。
+
+    Args:
+        backend: "auto"（已安装 uvloop 时使用 uvloop）、"asyncio" 或 "uvloop"
+
+    Returns:
+        实际使用的事件循环后端名称
+
+    Raises:
+        ValueError: 未知的事件循环后端
+    """
+    if backend not in LOOP_BACKENDS:
+        raise ValueError(f"未知的事件循环后端: {backend}")
+
+    if backend == LOOP_UVLOOP and uvloop is None:
+        logger.warning("未安装 uvloop (pip install uvloop)，使用标准 asyncio 事件循环")
+        backend = LOOP_ASYNCIO
+    elif backend == LOOP_AUTO:
+        backend = LOOP_UVLOOP if uvloop is not None else LOOP_ASYNCIO
+
+    if backend == LOOP_UVLOOP:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    else:
+        asyncio.set_event_loop_policy(None)
+    return backend
+
+
+def event_loop_info(loop: Optional[asyncio.AbstractEventLoop] = None) -> Dict[str, Any]:
+    """获取当前事件循环信息。
+
+    Args:
+        loop: 事件循环，默认使用正在运行的事件循环
+
+    Returns:
+        包含 backend、class 和 version（uvloop 版本）的字典
+    """
+    if loop is None:
+        loop = asyncio.get_running_loop()
+    loop_class = type(loop)
+    is_uvloop = loop_class.__module__.split(".")[0] == "uvloop"
+    return {
+        "backend": LOOP_UVLOOP if is_uvloop else LOOP_ASYNCIO,
+        "class": f"{loop_class.__module__}.{loop_class.__qualname__}",
+        "version": uvloop.__version__ if is_uvloop and uvloop is not None else None,
+    }
@@ -0,0 +1,269 @@
+"""请求统计与延迟直方图模块。
+
+提供低开销的 HDR 风格（对数-线性分桶）延迟直方图，以及按功能码、
+按从站ID汇总的请求指标。
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+# 每个 2 的幂区间划分的子桶数量（2^4 = 16，相对误差约 6%）
+SUB_BUCKET_BITS = 4
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+# 低于该值的样本按 1 微秒精度线性分桶
+_LINEAR_LIMIT = SUB_BUCKET_COUNT * 2
+# 最大可记录值（微秒），超出部分计入最后一个桶
+MAX_TRACKABLE_US = (1 << 36) - 1
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def _bucket_index(value: int) -> int:
+    """计算样本值所在的桶索引。"""
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKET_COUNT + (value >> shift)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    """返回桶索引对应的最大等价值。"""
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = index // SUB_BUCKET_COUNT - 1
+    mantissa = index - shift * SUB_BUCKET_COUNT
+    return ((mantissa + 1) << shift) - 1
+
+
+_BUCKET_COUNT = _bucket_index(MAX_TRACKABLE_US) + 1
+
+
+class LatencyHistogram:
+    """HDR 风格延迟直方图（单位：微秒）。
+
+    记录操作只做整数运算和一次列表自增，适合在请求热路径上调用。
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        """初始化直方图。"""
+        self.counts: List[int] = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value_us: int) -> None:
+        """记录一个样本。
+
+        Args:
+            value_us: 样本值（微秒）
+        """
+        if value_us < 0:
+            value_us = 0
+        elif value_us > MAX_TRACKABLE_US:
+            value_us = MAX_TRACKABLE_US
+        if value_us < _LINEAR_LIMIT:
+            self.counts[value_us] += 1
+        else:
+            shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+            self.counts[shift * SUB_BUCKET_COUNT + (value_us >> shift)] += 1
+        if self.count == 0 or value_us < self.min:
+            self.min = value_us
+        if value_us > self.max:
+            self.max = value_us
+        self.count += 1
+        self.total += value_us
+
+    def percentile(self, percentile: float) -> int:
+        """查询百分位数。
+
+        Args:
+            percentile: 百分位（0-100）
+
+        Returns:
+            百分位对应的值（微秒，桶的最大等价值）
+        """
+        if self.count == 0:
+            return 0
+        percentile = min(max(percentile, 0.0), 100.0)
+        target = max(1, int(self.count * percentile / 100.0 + 0.5))
+        running = 0
+        for index, bucket in enumerate(self.counts):
+            if bucket:
+                running += bucket
+                if running >= target:
+                    return min(_bucket_upper_bound(index), self.max)
+        return self.max
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """合并另一个直方图。
+
+        Args:
+            other: 要合并的直方图
+        """
+        if other.count == 0:
+            return
+        counts = self.counts
+        for index, bucket in enumerate(other.counts):
+            if bucket:
+                counts[index] += bucket
+        if self.count == 0 or other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+        self.count += other.count
+        self.total += other.total
+
+    def reset(self) -> None:
+        """清空直方图。"""
+        self.counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def summary(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict:
+        """生成统计摘要。
+
+        Args:
+            percentiles: 需要计算的百分位列表
+
+        Returns:
+            包含样本数、最小/最大/平均值和各百分位的字典（单位：微秒）
+        """
+        result = {
+            "count": self.count,
+            "min_us": self.min,
+            "max_us": self.max,
+            "mean_us": round(self.total / self.count, 1) if self.count else 0.0,
+        }
+        for p in percentiles:
+            result[f"p{p:g}_us"] = self.percentile(p)
+        return result
+
+
+class RequestMetrics:
+    """Modbus 请求指标。
+
+    按功能码和从站ID维护延迟直方图，并统计异常码分布和收发字节数。
+    """
+
+    def __init__(self):
+        """初始化请求指标。"""
+        self.by_function: Dict[int, LatencyHistogram] = {}
+        self.by_unit: Dict[int, LatencyHistogram] = {}
+        self.exceptions: Dict[int, int] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(
+        self, unit_id: int, function_code: int, request_size: int, response: Optional[bytes],
+        elapsed_us: int,
+    ) -> None:
+        """记录一次请求。
+
+        Args:
+            unit_id: 从站ID
+            function_code: 功能码
+            request_size: 请求 PDU 字节数
+            response: 响应 PDU
+            elapsed_us: 处理耗时（微秒）
+        """
+        histogram = self.by_function.get(function_code)
+        if histogram is None:
+            histogram = self.by_function[function_code] = LatencyHistogram()
+        histogram.record(elapsed_us)
+
+        histogram = self.by_unit.get(unit_id)
+        if histogram is None:
+            histogram = self.by_unit[unit_id] = LatencyHistogram()
+        histogram.record(elapsed_us)
+
+        self.bytes_in += request_size
+        if response:
+            self.bytes_out += len(response)
+            if response[0] & 0x80 and len(response) > 1:
+                code = response[1]
+                self.exceptions[code] = self.exceptions.get(code, 0) + 1
+
+    def reset(self) -> None:
+        """清空所有指标。"""
+        self.by_function.clear()
+        self.by_unit.clear()
+        self.exceptions.clear()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def merge(self, other: "RequestMetrics") -> None:
+        """合并另一组指标（例如其它工作进程的指标）。
+
+        Args:
+            other: 要合并的指标
+        """
+        for target, source in ((self.by_function, other.by_function), (self.by_unit, other.by_unit)):
+            for key, histogram in source.items():
+                merged = target.get(key)
+                if merged is None:
+                    merged = target[key] = LatencyHistogram()
+                merged.merge(histogram)
+        for code, count in other.exceptions.items():
+            self.exceptions[code] = self.exceptions.get(code, 0) + count
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+
+    def overall(self) -> LatencyHistogram:
+        """返回所有功能码合并后的直方图。"""
+        merged = LatencyHistogram()
+        for histogram in self.by_function.values():
+            merged.merge(histogram)
+        return merged
+
+    def percentile(
+        self, percentile: float, function_code: Optional[int] = None,
+        unit_id: Optional[int] = None,
+    ) -> int:
+        """查询延迟百分位数。
+
+        Args:
+            percentile: 百分位（0-100）
+            function_code: 限定功能码（可选）
+            unit_id: 限定从站ID（可选，与 function_code 二选一）
+
+        Returns:
+            延迟（微秒）
+        """
+        if function_code is not None:
+            histogram = self.by_function.get(function_code)
+        elif unit_id is not None:
+            histogram = self.by_unit.get(unit_id)
+        else:
+            histogram = self.overall()
+        return histogram.percentile(percentile) if histogram else 0
+
+    def summary(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict:
+        """生成可序列化的指标摘要。
+
+        Args:
+            percentiles: 需要计算的百分位列表
+
+        Returns:
+            指标摘要字典
+        """
+        percentiles = tuple(percentiles)
+        return {
+            "latency": self.overall().summary(percentiles),
+            "latency_by_function": {
+                f"FC{fc:02d}": histogram.summary(percentiles)
+                for fc, histogram in sorted(self.by_function.items())
+            },
+            "latency_by_unit": {
+                str(unit): histogram.summary(percentiles)
+                for unit, histogram in sorted(self.by_unit.items())
+            },
+            "exception_codes": {
+                f"0x{code:02X}": count for code, count in sorted(self.exceptions.items())
+            },
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
@@ -9,6 +9,8 @@ from typing import Any, Dict
 
 from aiohttp import web
 
+from ..utils.event_loop import event_loop_info
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +39,7 @@ class ModbusAPI:
         app.router.add_get("/api/data", self.get_data)
         app.router.add_get("/api/history", self.get_history)
         app.router.add_get("/api/stats", self.get_stats)
+        app.router.add_post("/api/stats/reset", self.reset_stats)
         app.router.add_post("/api/write/coil", self.write_coil)
         app.router.add_post("/api/write/register", self.write_register)
         app.router.add_post("/api/write/string", self.write_string)
@@ -81,10 +84,29 @@ class ModbusAPI:
         return web.json_response({"history": history})
 
     async def get_stats(self, request: web.Request) -> web.Response:
-        """获取统计信息。"""
-        stats = self.handler.get_stats()
+        """获取统计信息。
+
+        支持 `percentiles` 查询参数（逗号分隔，如 `50,99,99.9`）指定延迟百分位。
+        """
+        percentiles_param = request.query.get("percentiles")
+        if percentiles_param:
+            try:
+                percentiles = [float(p) for p in percentiles_param.split(",") if p.strip()]
+            except ValueError:
+                return web.json_response({"error": "无效的百分位参数"}, status=400)
+            if any(p < 0 or p > 100 for p in percentiles):
+                return web.json_response({"error": "百分位必须在 0-100 之间"}, status=400)
+            stats = self.handler.get_stats(percentiles)
+        else:
+            stats = self.handler.get_stats()
+        stats["event_loop"] = event_loop_info()
         return web.json_response(stats)
 
+    async def reset_stats(self, request: web.Request) -> web.Response:
+        """清空统计信息。"""
+        self.handler.reset_stats()
+        return web.json_response({"success": True})
+
     async def write_coil(self, request: web.Request) -> web.Response:
         """写入线圈。"""
         try:
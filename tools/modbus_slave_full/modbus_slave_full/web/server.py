@@ -1,21 +1,25 @@
 """Web 服务器。
 
-提供 HTTP 和 WebSocket 服务。
+提供 HTTP 和 WebSocket 服务。`/ws/monitor` 推送 RTU 监听模式下总线上的帧。
 """
 
 import asyncio
 import json
 import logging
 from pathlib import Path
-from typing import Set
+from typing import List, Set
 
 from aiohttp import web
 from aiohttp_cors import ResourceOptions, setup as setup_cors
 
+from ..protocol.monitor import SUBSCRIBER_QUEUE_SIZE, BusMonitor, drain_events
 from .api import ModbusAPI
 
 logger = logging.getLogger(__name__)
 
+# 每条监听推送消息最多包含的帧数
+MONITOR_BATCH_SIZE = 256
+
 
 class ModbusWebServer:
     """Modbus Web 服务器。"""
@@ -34,6 +38,7 @@ class ModbusWebServer:
         self.app = web.Application()
         self.api = ModbusAPI(datastore, handler, config.auth)
         self.ws_clients: Set[web.WebSocketResponse] = set()
+        self.monitors: List[BusMonitor] = []
         self._setup_routes()
 
     def _setup_routes(self) -> None:
@@ -43,6 +48,7 @@ class ModbusWebServer:
 
         # WebSocket 路由
         self.app.router.add_get("/ws", self.websocket_handler)
+        self.app.router.add_get("/ws/monitor", self.monitor_handler)
 
         # 静态文件
         static_dir = Path(__file__).parent / "static"
@@ -100,6 +106,53 @@ class ModbusWebServer:
 
         return ws
 
+    def add_monitor(self, monitor: BusMonitor) -> None:
+        """添加 RTU 总线监听器，其帧通过 `/ws/monitor` 推送。
+
+        Args:
+            monitor: 总线监听器
+        """
+        self.monitors.append(monitor)
+
+    async def monitor_handler(self, request: web.Request) -> web.WebSocketResponse:
+        """RTU 总线监听 WebSocket 处理器。
+
+        订阅所有监听器，把帧事件按批推送：`{"type": "bus_frames", "frames": [...]}`。
+        客户端处理不过来时队列满，新事件被丢弃并计入监听统计的 `dropped_events`。
+        """
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        for monitor in self.monitors:
+            monitor.subscribe(queue)
+        logger.info(f"总线监听客户端连接: {request.remote}")
+
+        async def send_events() -> None:
+            while True:
+                frames = [await queue.get()]
+                frames.extend(drain_events(queue, MONITOR_BATCH_SIZE - 1))
+                try:
+                    await ws.send_json({"type": "bus_frames", "frames": frames})
+                except (ConnectionResetError, RuntimeError) as e:
+                    # 客户端已断开，接收循环随后结束
+                    logger.debug(f"总线监听推送失败 {request.remote}: {e}")
+                    return
+
+        sender = asyncio.create_task(send_events())
+        try:
+            async for msg in ws:
+                if msg.type == web.WSMsgType.ERROR:
+                    logger.error(f"WebSocket 错误: {ws.exception()}")
+        finally:
+            sender.cancel()
+            for monitor in self.monitors:
+                monitor.unsubscribe(queue)
+            logger.info(f"总线监听客户端断开: {request.remote}")
+            # 取回推送任务的结果（处理器本身可能在连接关闭时被取消，放在最后）
+            await asyncio.gather(sender, return_exceptions=True)
+
+        return ws
+
     async def _handle_ws_message(self, ws: web.WebSocketResponse, data: dict) -> None:
         """处理 WebSocket 消息。"""
         msg_type = data.get("type")
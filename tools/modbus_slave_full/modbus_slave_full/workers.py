@@ -0,0 +1,683 @@
+"""多进程 Modbus TCP 工作模式。
+
+多个工作进程通过 `SO_REUSEPORT` 绑定同一 Modbus TCP 端口，由内核在进程间分配连接；
+寄存器映像放在共享内存中（见 `SharedDataStore`）。主进程作为监督者：
+
+- 启动工作进程，工作进程异常退出时自动重启（连续快速崩溃时指数退避）
+- 通过管道定期收集各工作进程的统计快照，合并为与 `ModbusHandler.get_stats`
+  相同格式的统计信息（延迟直方图按桶合并）
+- 继续运行 Web 控制台和 RTU 服务器
+"""
+
+import asyncio
+import dataclasses
+import logging
+import multiprocessing
+import signal
+import socket
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from .config import Config, GatewayConfig, RTUConfig, TCPConfig
+from .protocol import (
+    ModbusASCIIServer,
+    ModbusHandler,
+    ModbusRTUServer,
+    ModbusTCPServer,
+    RoleAccessMiddleware,
+)
+from .protocol.admission import ConnectionLimits
+from .protocol.gateway import BusScheduler, RTUGateway
+from .protocol.monitor import BusMonitor
+from .protocol.plugins import load_function_code_plugins
+from .protocol.routing import UnitRouter
+from .protocol.tls import create_server_ssl_context
+from .shared_datastore import SharedDataStore
+from .utils import RequestMetrics, setup_logging
+from .utils.event_loop import install_event_loop_policy
+from .utils.metrics import DEFAULT_PERCENTILES
+
+logger = logging.getLogger(__name__)
+
+# 工作进程上报统计快照的间隔（秒）
+STATS_INTERVAL = 1.0
+# 监督者检查工作进程状态的间隔（秒）
+MONITOR_INTERVAL = 0.5
+# 重启延迟：工作进程运行超过 STABLE_UPTIME 秒后退出时立即重启，否则指数退避
+RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 30.0
+STABLE_UPTIME = 10.0
+
+# 管道命令
+COMMAND_RESET_STATS = "reset_stats"
+
+
+def create_handler(config: Config, datastore) -> ModbusHandler:
+    """按配置创建 Modbus 处理器。
+
+    预编码各从站的设备标识 (FC43/14) 和报告从站ID (FC17) 响应，加载功能码插件；
+    启用 TLS 并配置了角色写权限时安装 `RoleAccessMiddleware`。
+
+    Args:
+        config: 配置对象
+        datastore: 数据存储
+
+    Returns:
+        Modbus 处理器
+    """
+    handler = ModbusHandler(datastore)
+    for slave in config.slaves:
+        handler.set_device_identification(slave.id, slave.identification.to_objects())
+        handler.set_report_slave_id(slave.id, f"Modbus Slave {slave.id}".encode("ascii"))
+    load_function_code_plugins(
+        handler,
+        modules=config.plugins.modules,
+        entry_points=config.plugins.entry_points,
+    )
+    tls_config = config.server.tcp.tls
+    if tls_config.enabled and tls_config.write_roles:
+        handler.add_middleware(RoleAccessMiddleware(tls_config.write_roles))
+    return handler
+
+
+def create_tcp_server(
+    handler: ModbusHandler,
+    tcp_config: TCPConfig,
+    reuse_port: bool = False,
+    unit_router: Optional[UnitRouter] = None,
+    name: str = "tcp",
+) -> ModbusTCPServer:
+    """按配置创建 Modbus TCP 服务器。
+
+    Args:
+        handler: Modbus 处理器
+        tcp_config: TCP 配置
+        reuse_port: 是否设置 SO_REUSEPORT
+        unit_router: 单元ID路由表
+        name: 统计信息中的传输层名称
+
+    Returns:
+        TCP 服务器
+    """
+    limits = ConnectionLimits(
+        max_connections=tcp_config.max_connections,
+        max_connections_per_ip=tcp_config.max_connections_per_ip,
+        accept_rate=tcp_config.accept_rate,
+        accept_burst=tcp_config.accept_burst,
+        idle_timeout=tcp_config.idle_timeout,
+        read_timeout=tcp_config.read_timeout,
+        write_buffer_high=tcp_config.write_buffer_high,
+        write_buffer_low=tcp_config.write_buffer_low,
+    )
+    tls_config = tcp_config.tls
+    ssl_context = None
+    if tls_config.enabled:
+        ssl_context = create_server_ssl_context(
+            tls_config.certfile,
+            tls_config.keyfile,
+            tls_config.ca_file,
+            require_client_cert=tls_config.require_client_cert,
+            session_tickets=tls_config.session_tickets,
+        )
+    return ModbusTCPServer(
+        handler,
+        tcp_config.host,
+        tcp_config.port,
+        pipelined=tcp_config.pipelined,
+        max_in_flight=tcp_config.max_in_flight,
+        backend=tcp_config.backend,
+        reuse_port=reuse_port,
+        limits=limits,
+        framing=tcp_config.framing,
+        ssl_context=ssl_context,
+        unit_router=unit_router,
+        name=name,
+    )
+
+
+def create_tcp_servers(
+    handler: ModbusHandler, tcp_config: TCPConfig, reuse_port: bool = False
+) -> List[ModbusTCPServer]:
+    """按配置创建主 TCP 监听和所有附加监听。
+
+    附加监听继承主监听的后端、连接限制和 TLS 等参数，各自使用自己的地址、
+    帧格式和单元ID路由表，共享同一个处理器和数据存储。监听名称用作统计信息中的
+    传输层名称，必须唯一；重复的默认名称加 `#序号` 后缀。
+
+    Args:
+        handler: Modbus 处理器
+        tcp_config: TCP 配置
+        reuse_port: 是否设置 SO_REUSEPORT
+
+    Returns:
+        TCP 服务器列表（未启用 TCP 时为空）
+
+    Raises:
+        ValueError: 监听名称重复
+    """
+    if not tcp_config.enabled:
+        return []
+    servers = [create_tcp_server(handler, tcp_config, reuse_port=reuse_port)]
+    names = {servers[0].name}
+    for listener in tcp_config.listeners:
+        host = listener.host or tcp_config.host
+        name = listener.name
+        if name:
+            if name in names:
+                raise ValueError(f"TCP 监听名称重复: {name}")
+        else:
+            # 默认名称可能重复（如端口 0 或同一端口的不同主机名），加序号区分
+            name = default = f"tcp:{host}:{listener.port}"
+            suffix = 2
+            while name in names:
+                name = f"{default}#{suffix}"
+                suffix += 1
+        names.add(name)
+        router = None
+        if listener.slave is not None or listener.slaves or listener.unit_map:
+            router = UnitRouter(listener.unit_map, listener.slave, listener.slaves)
+        listener_config = dataclasses.replace(
+            tcp_config,
+            host=host,
+            port=listener.port,
+            framing=listener.framing or tcp_config.framing,
+            listeners=[],
+        )
+        servers.append(
+            create_tcp_server(
+                handler,
+                listener_config,
+                reuse_port=reuse_port,
+                unit_router=router,
+                name=name,
+            )
+        )
+    return servers
+
+
+# 附加串口可以单独设置、未设置时继承主串口的参数
+RTU_PORT_SETTINGS = (
+    "mode",
+    "baudrate",
+    "bytesize",
+    "parity",
+    "stopbits",
+    "t15",
+    "t35",
+    "turnaround_delay",
+)
+# 决定字符时间的串口参数；附加串口设置了其中任何一个时，不继承主串口显式设置的时序
+CHARACTER_SETTINGS = ("baudrate", "bytesize", "parity", "stopbits")
+# 串口协议
+SERIAL_MODES = ("rtu", "ascii")
+
+SerialServer = Union[ModbusRTUServer, ModbusASCIIServer]
+
+
+def create_serial_server(
+    handler: ModbusHandler,
+    port: str,
+    settings: Dict[str, Any],
+    timeout: float,
+    unit_router: Optional[UnitRouter] = None,
+    name: str = "",
+    monitor: bool = False,
+    capture_file: str = "",
+) -> SerialServer:
+    """按串口协议创建 RTU 或 ASCII 服务器。
+
+    Args:
+        handler: Modbus 处理器
+        port: 串口设备
+        settings: 串口参数和时序（键见 `RTU_PORT_SETTINGS`）
+        timeout: 超时时间
+        unit_router: 单元ID路由表
+        name: 串口名称，为空时使用协议名
+        monitor: 是否为监听模式（只接收不发送）
+        capture_file: 监听模式的抓包文件路径
+
+    Returns:
+        `ModbusRTUServer` 或 `ModbusASCIIServer`
+
+    Raises:
+        ValueError: 未知串口协议，或 ASCII 串口启用监听模式
+        ImportError: 未安装 pyserial-asyncio
+    """
+    settings = dict(settings)
+    mode = settings.pop("mode")
+    if mode not in SERIAL_MODES:
+        raise ValueError(f"未知串口协议: {mode}，可选 {', '.join(SERIAL_MODES)}")
+    name = name or mode
+    if mode == "ascii":
+        if monitor:
+            raise ValueError(f"串口 {name}: 监听模式只支持 RTU")
+        # ASCII 帧由分隔符确定边界，不使用 T1.5/T3.5
+        del settings["t15"], settings["t35"]
+        return ModbusASCIIServer(
+            handler, port, timeout=timeout, unit_router=unit_router, name=name, **settings
+        )
+    bus_monitor = None
+    if monitor:
+        bus_monitor = BusMonitor(name, capture_file, settings["baudrate"])
+    return ModbusRTUServer(
+        handler,
+        port,
+        timeout=timeout,
+        unit_router=unit_router,
+        name=name,
+        monitor=bus_monitor,
+        **settings,
+    )
+
+
+def create_rtu_servers(handler: ModbusHandler, rtu_config: RTUConfig) -> List[SerialServer]:
+    """按配置创建主串口和所有附加串口的服务器。
+
+    附加串口未设置的串口协议、参数和时序继承主串口，各自使用自己的单元ID路由表，
+    共享同一个处理器和数据存储。附加串口设置了波特率或字符格式时，未设置的时序
+    按本串口的参数计算，不继承主串口显式设置的时序。串口名称用作统计信息中的
+    传输层名称和 FC08 诊断计数器的来源，必须唯一。
+
+    Args:
+        handler: Modbus 处理器
+        rtu_config: RTU 配置
+
+    Returns:
+        串口服务器列表（未启用 RTU 时为空）
+
+    Raises:
+        ValueError: 未知串口协议或串口名称重复
+        ImportError: 未安装 pyserial-asyncio
+    """
+    if not rtu_config.enabled:
+        return []
+    settings = {key: getattr(rtu_config, key) for key in RTU_PORT_SETTINGS}
+    servers = [
+        create_serial_server(
+            handler,
+            rtu_config.port,
+            settings,
+            rtu_config.timeout,
+            monitor=rtu_config.monitor,
+            capture_file=rtu_config.capture_file,
+        )
+    ]
+    names = {servers[0].name}
+    for port in rtu_config.ports:
+        overrides = {key: getattr(port, key) for key in RTU_PORT_SETTINGS}
+        port_settings = {**settings, **{k: v for k, v in overrides.items() if v is not None}}
+        name = port.name or f"{port_settings['mode']}:{port.port}"
+        if name in names:
+            raise ValueError(f"串口名称重复: {name}")
+        names.add(name)
+        if any(overrides[key] is not None for key in CHARACTER_SETTINGS):
+            # 主串口显式设置的时序按主串口的波特率和字符格式计算，不适用于本串口
+            for key in ("t15", "t35"):
+                if overrides[key] is None:
+                    port_settings[key] = 0.0
+        router = None
+        if port.slave is not None or port.slaves or port.unit_map:
+            router = UnitRouter(port.unit_map, port.slave, port.slaves)
+        servers.append(
+            create_serial_server(
+                handler,
+                port.port,
+                port_settings,
+                rtu_config.timeout,
+                unit_router=router,
+                name=name,
+                monitor=port.monitor,
+                capture_file=port.capture_file,
+            )
+        )
+    return servers
+
+
+def create_gateway(handler: ModbusHandler, gateway_config: GatewayConfig) -> RTUGateway:
+    """按配置创建 TCP 到 RTU 网关并安装到处理器上（下游串口由 `RTUGateway.open` 打开）。
+
+    Args:
+        handler: Modbus 处理器
+        gateway_config: 网关配置
+
+    Returns:
+        网关
+    """
+    scheduler = BusScheduler(
+        timeout=gateway_config.timeout,
+        request_timeout=gateway_config.request_timeout,
+        backoff=gateway_config.backoff,
+        max_backoff=gateway_config.max_backoff,
+        queue_size=gateway_config.queue_size,
+    )
+    routes = UnitRouter(gateway_config.unit_map, slaves=gateway_config.units)
+    return RTUGateway(handler, routes, scheduler)
+
+
+def slave_layout(config: Config) -> Dict[int, tuple]:
+    """根据配置生成共享数据存储布局。"""
+    return {
+        slave.id: (
+            slave.coils,
+            slave.discrete_inputs,
+            slave.holding_registers,
+            slave.input_registers,
+        )
+        for slave in config.slaves
+    }
+
+
+def snapshot_handler(handler: ModbusHandler) -> Dict[str, Any]:
+    """生成处理器统计快照（可跨进程传输）。"""
+    stats = handler.stats.copy()
+    stats["function_codes"] = dict(handler.stats["function_codes"])
+    return {
+        "stats": stats,
+        "metrics": handler.metrics,
+        "comm_counters": {
+            source: counters.to_dict() for source, counters in handler.comm_counters.items()
+        },
+        "transports": {name: provider() for name, provider in handler.stats_providers.items()},
+    }
+
+
+def _sum_stats(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """按键递归累加数值统计，非数值字段保留第一个值。"""
+    for key, value in source.items():
+        if isinstance(value, dict):
+            _sum_stats(target.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            target[key] = target.get(key, 0) + value
+        else:
+            target.setdefault(key, value)
+
+
+def merge_snapshots(snapshots, percentiles=DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """合并多个统计快照，输出格式与 `ModbusHandler.get_stats` 相同。
+
+    Args:
+        snapshots: 统计快照列表
+        percentiles: 延迟直方图需要计算的百分位列表
+
+    Returns:
+        合并后的统计信息；通信计数器按来源求和，不包含事件日志
+    """
+    stats = {
+        "total_requests": 0,
+        "successful_requests": 0,
+        "exception_responses": 0,
+        "function_codes": {},
+    }
+    metrics = RequestMetrics()
+    comm_counters: Dict[str, Dict[str, Any]] = {}
+    transports: Dict[str, Any] = {}
+    for snapshot in snapshots:
+        for key in ("total_requests", "successful_requests", "exception_responses"):
+            stats[key] += snapshot["stats"][key]
+        function_codes = stats["function_codes"]
+        for fc, count in snapshot["stats"]["function_codes"].items():
+            function_codes[fc] = function_codes.get(fc, 0) + count
+        metrics.merge(snapshot["metrics"])
+        for source, counters in snapshot["comm_counters"].items():
+            merged = comm_counters.setdefault(source, {"listen_only": False, "events": []})
+            for key, value in counters.items():
+                if key == "listen_only":
+                    merged[key] = merged[key] or value
+                elif key != "events":
+                    merged[key] = merged.get(key, 0) + value
+        # 各进程的连接数等传输层统计求和（峰值等为各进程之和，仅供参考）
+        _sum_stats(transports, snapshot.get("transports", {}))
+    stats.update(metrics.summary(percentiles))
+    stats["comm_counters"] = comm_counters
+    stats["transports"] = transports
+    return stats
+
+
+def run_worker(index: int, config: Config, shm_name: str, layout, lock, conn) -> None:
+    """工作进程入口。
+
+    Args:
+        index: 工作进程序号
+        config: 配置对象
+        shm_name: 共享内存名称
+        layout: 共享数据存储布局
+        lock: 跨进程锁
+        conn: 与监督者通信的管道
+    """
+    # Ctrl+C 由监督者统一处理
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # 多个进程写同一个轮转日志文件不安全，工作进程只输出到控制台
+    setup_logging(level=config.logging.level)
+    install_event_loop_policy(config.server.event_loop)
+    try:
+        asyncio.run(_worker_main(index, config, shm_name, layout, lock, conn))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _worker_main(index: int, config: Config, shm_name: str, layout, lock, conn) -> None:
+    """工作进程主协程。"""
+    datastore = SharedDataStore(
+        layout, name=shm_name, lock=lock, history_max_size=config.data.history_max_size
+    )
+    handler = create_handler(config, datastore)
+    servers = create_tcp_servers(handler, config.server.tcp, reuse_port=True)
+    for server in servers:
+        await server.listen()
+
+    loop = asyncio.get_running_loop()
+    main_task = asyncio.current_task()
+    loop.add_signal_handler(signal.SIGTERM, main_task.cancel)
+    logger.info(f"工作进程 {index} 已启动 (PID {multiprocessing.current_process().pid})")
+
+    try:
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            while conn.poll():
+                if conn.recv() == COMMAND_RESET_STATS:
+                    handler.reset_stats()
+            conn.send(snapshot_handler(handler))
+    except (asyncio.CancelledError, BrokenPipeError, EOFError):
+        pass
+    finally:
+        for server in servers:
+            await server.stop()
+        conn.close()
+        datastore.close()
+        logger.info(f"工作进程 {index} 已停止")
+
+
+class _WorkerSlot:
+    """一个工作进程槽位。"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.conn = None
+        self.started = 0.0
+        self.restarts = 0
+        self.restart_delay = RESTART_DELAY
+        self.restart_at: Optional[float] = None
+        self.snapshot: Optional[Dict[str, Any]] = None
+
+
+class WorkerPool:
+    """Modbus TCP 工作进程池（监督者）。
+
+    实现 `get_stats`/`reset_stats`，可以代替 `ModbusHandler` 传给 Web 服务器。
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        datastore: SharedDataStore,
+        local_handler: Optional[ModbusHandler] = None,
+        workers: Optional[int] = None,
+    ):
+        """初始化工作进程池。
+
+        Args:
+            config: 配置对象
+            datastore: 共享数据存储（创建者）
+            local_handler: 主进程中的处理器（例如 RTU），其统计会一并合并
+            workers: 工作进程数，默认使用 `server.tcp.workers`
+
+        Raises:
+            RuntimeError: 平台不支持 SO_REUSEPORT
+        """
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("当前平台不支持 SO_REUSEPORT，无法启用多进程工作模式")
+        self.config = config
+        self.datastore = datastore
+        self.local_handler = local_handler
+        self.slots = [_WorkerSlot(i) for i in range(workers or config.server.tcp.workers)]
+        # 已退出工作进程的最后一次快照，重启后统计不丢失
+        self.retired: List[Dict[str, Any]] = []
+        self._context = multiprocessing.get_context("spawn")
+        self._running = False
+
+    async def start(self) -> None:
+        """启动所有工作进程并持续监控，直到调用 `stop`。"""
+        self._running = True
+        for slot in self.slots:
+            self._spawn(slot)
+        tcp = self.config.server.tcp
+        logger.info(
+            f"Modbus TCP 多进程模式启动: {len(self.slots)} 个工作进程, {tcp.host}:{tcp.port}"
+        )
+        await self._monitor()
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """停止所有工作进程。
+
+        Args:
+            timeout: 等待工作进程退出的时间（秒），超时后强制结束
+        """
+        self._running = False
+        for slot in self.slots:
+            if slot.process is not None and slot.process.is_alive():
+                slot.process.terminate()
+        deadline = time.monotonic() + timeout
+        for slot in self.slots:
+            if slot.process is None:
+                continue
+            while slot.process.is_alive() and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            if slot.process.is_alive():
+                logger.warning(f"工作进程 {slot.index} 未能及时退出，强制结束")
+                slot.process.kill()
+            slot.process.join(1.0)
+            self._detach(slot)
+        logger.info("Modbus TCP 工作进程已全部停止")
+
+    def _spawn(self, slot: _WorkerSlot) -> None:
+        """启动一个工作进程。"""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=run_worker,
+            args=(
+                slot.index,
+                self.config,
+                self.datastore.name,
+                self.datastore.layout,
+                self.datastore.process_lock,
+                child_conn,
+            ),
+            name=f"modbus-worker-{slot.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        slot.process = process
+        slot.conn = parent_conn
+        slot.started = time.monotonic()
+        slot.restart_at = None
+        asyncio.get_running_loop().add_reader(parent_conn.fileno(), self._receive, slot)
+
+    def _receive(self, slot: _WorkerSlot) -> None:
+        """读取工作进程发送的统计快照。"""
+        try:
+            slot.snapshot = slot.conn.recv()
+        except (EOFError, OSError):
+            # 工作进程已退出，由监控任务处理
+            asyncio.get_running_loop().remove_reader(slot.conn.fileno())
+
+    def _detach(self, slot: _WorkerSlot) -> None:
+        """断开已退出的工作进程，保留其最后的统计快照。"""
+        if slot.conn is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(slot.conn.fileno())
+            except (OSError, ValueError):
+                pass
+            slot.conn.close()
+            slot.conn = None
+        if slot.snapshot is not None:
+            self.retired.append(slot.snapshot)
+            slot.snapshot = None
+
+    async def _monitor(self) -> None:
+        """监控工作进程，异常退出时按退避策略重启。"""
+        while self._running:
+            now = time.monotonic()
+            for slot in self.slots:
+                if slot.restart_at is not None:
+                    if now >= slot.restart_at:
+                        slot.restarts += 1
+                        logger.info(f"重启工作进程 {slot.index} (第 {slot.restarts} 次)")
+                        self._spawn(slot)
+                    continue
+                if slot.process is None or slot.process.is_alive():
+                    continue
+                exitcode = slot.process.exitcode
+                slot.process.join()
+                self._detach(slot)
+                if now - slot.started >= STABLE_UPTIME:
+                    slot.restart_delay = RESTART_DELAY
+                delay = slot.restart_delay
+                slot.restart_delay = min(slot.restart_delay * 2, MAX_RESTART_DELAY)
+                slot.restart_at = now + delay
+                logger.warning(
+                    f"工作进程 {slot.index} 异常退出 (退出码 {exitcode})，{delay:.1f} 秒后重启"
+                )
+            await asyncio.sleep(MONITOR_INTERVAL)
+
+    def get_stats(self, percentiles=DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        """获取所有工作进程合并后的统计信息。
+
+        Args:
+            percentiles: 延迟直方图需要计算的百分位列表
+
+        Returns:
+            与 `ModbusHandler.get_stats` 格式相同的统计信息，另含 `workers` 工作进程状态
+        """
+        snapshots = list(self.retired)
+        snapshots.extend(slot.snapshot for slot in self.slots if slot.snapshot is not None)
+        if self.local_handler is not None:
+            snapshots.append(snapshot_handler(self.local_handler))
+        stats = merge_snapshots(snapshots, percentiles)
+        stats["workers"] = [
+            {
+                "index": slot.index,
+                "pid": slot.process.pid if slot.process is not None else None,
+                "alive": slot.process is not None and slot.process.is_alive(),
+                "restarts": slot.restarts,
+                "total_requests": slot.snapshot["stats"]["total_requests"]
+                if slot.snapshot is not None
+                else 0,
+            }
+            for slot in self.slots
+        ]
+        return stats
+
+    def reset_stats(self) -> None:
+        """清空所有工作进程的统计信息。"""
+        self.retired.clear()
+        for slot in self.slots:
+            slot.snapshot = None
+            if slot.conn is not None:
+                try:
+                    slot.conn.send(COMMAND_RESET_STATS)
+                except (BrokenPipeError, OSError):
+                    pass
+        if self.local_handler is not None:
+            self.local_handler.reset_stats()
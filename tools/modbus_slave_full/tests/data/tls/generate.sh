@@ -0,0 +1,28 @@
+#!/bin/sh
+# 生成 TLS 测试证书（CA、服务器证书和带/不带 Modbus 角色扩展的客户端证书）
+set -e
+cd "$(dirname "$0")"
+OPENSSL=${OPENSSL:-openssl}
+ROLE_OID=1.3.6.1.4.1.50316.802.1
+DAYS=36500
+
+$OPENSSL req -x509 -newkey ec -pkeyopt ec_paramgen_curve:P-256 -nodes -days $DAYS \
+    -subj "/CN=Modbus Test CA" -keyout ca.key -out ca.pem
+
+issue() {
+    name=$1
+    subject=$2
+    extensions=$3
+    $OPENSSL req -newkey ec -pkeyopt ec_paramgen_curve:P-256 -nodes \
+        -subj "$subject" -keyout "$name.key" -out "$name.csr"
+    printf '%s\n' "$extensions" > "$name.ext"
+    $OPENSSL x509 -req -in "$name.csr" -CA ca.pem -CAkey ca.key -CAcreateserial \
+        -days $DAYS -extfile "$name.ext" -out "$name.pem"
+    rm -f "$name.csr" "$name.ext"
+}
+
+issue server "/CN=localhost" "subjectAltName=DNS:localhost,IP:127.0.0.1"
+issue operator "/CN=operator-client" "$ROLE_OID=ASN1:UTF8String:operator"
+issue viewer "/CN=viewer-client" "$ROLE_OID=ASN1:UTF8String:viewer"
+issue norole "/CN=norole-client" "basicConstraints=CA:FALSE"
+rm -f ca.key ca.srl
@@ -0,0 +1,48 @@
+"""连接准入控制测试。"""
+
+from modbus_slave_full.protocol.admission import (
+    ConnectionLimiter,
+    ConnectionLimits,
+    TokenBucket,
+)
+
+
+def test_token_bucket():
+    """测试令牌桶突发和补充。"""
+    bucket = TokenBucket(rate=10, capacity=2)
+    now = bucket.updated
+    assert bucket.consume(now)
+    assert bucket.consume(now)
+    assert not bucket.consume(now)
+    assert bucket.consume(now + 0.15)
+    assert not bucket.consume(now + 0.15)
+
+
+def test_limiter_limits():
+    """测试全局和单 IP 连接数限制。"""
+    limiter = ConnectionLimiter(ConnectionLimits(max_connections=3, max_connections_per_ip=2))
+    assert limiter.admit("10.0.0.1") is None
+    assert limiter.admit("10.0.0.1") is None
+    assert limiter.admit("10.0.0.1") == "max_connections_per_ip"
+    assert limiter.admit("10.0.0.2") is None
+    assert limiter.admit("10.0.0.3") == "max_connections"
+
+    limiter.release("10.0.0.1")
+    assert limiter.admit("10.0.0.3") is None
+    stats = limiter.stats()
+    assert stats["active"] == 3
+    assert stats["peak"] == 3
+    assert stats["rejected"] == {
+        "max_connections": 1,
+        "max_connections_per_ip": 1,
+        "accept_rate": 0,
+    }
+
+
+def test_limiter_accept_rate():
+    """测试接受速率限制。"""
+    limiter = ConnectionLimiter(ConnectionLimits(accept_rate=1, accept_burst=2))
+    assert limiter.admit("10.0.0.1") is None
+    assert limiter.admit("10.0.0.1") is None
+    assert limiter.admit("10.0.0.1") == "accept_rate"
+    assert limiter.stats()["rejected"]["accept_rate"] == 1
@@ -171,3 +171,217 @@ async def test_function_code_statistics(setup):
     assert "FC03" in stats["function_codes"]
     assert "FC07" in stats["function_codes"]
     assert "FC17" in stats["function_codes"]
+
+
+@pytest.mark.asyncio
+async def test_exception_responses_not_counted_as_successful(setup):
+    """测试异常响应不计入成功请求。"""
+    handler, datastore = setup
+
+    await handler.handle_request(1, 0x03, b"\x00\x00\x00\x0A", "test")
+    await handler.handle_request(9, 0x03, b"\x00\x00\x00\x0A", "test")  # 从站不存在
+    await handler.handle_request(1, 0x63, b"", "test")  # 不支持的功能码
+
+    stats = handler.get_stats()
+    assert stats["total_requests"] == 3
+    assert stats["successful_requests"] == 1
+    assert stats["exception_responses"] == 2
+    assert stats["exception_codes"] == {"0x01": 1, "0x02": 1}
+    assert stats["latency_by_function"]["FC03"]["count"] == 2
+    assert "p99_us" in stats["latency"]
+    assert stats["bytes_in"] == 11
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_counters(setup):
+    """测试诊断计数器子功能 (FC08)。"""
+    handler, datastore = setup
+    import struct
+
+    await handler.handle_request(1, 0x03, b"\x00\x00\x00\x01", "test")
+    await handler.handle_request(1, 0x03, b"\xFF\xFF\x00\x01", "test")  # 地址异常
+    handler.get_comm_counters("test").bus_message_count = 7
+
+    response = await handler.handle_request(1, 0x08, struct.pack(">HH", 0x0D, 0), "test")
+    assert response == struct.pack(">BHH", 0x08, 0x0D, 1)
+    response = await handler.handle_request(1, 0x08, struct.pack(">HH", 0x0E, 0), "test")
+    assert response == struct.pack(">BHH", 0x08, 0x0E, 4)
+    response = await handler.handle_request(1, 0x08, struct.pack(">HH", 0x0B, 0), "test")
+    assert response == struct.pack(">BHH", 0x08, 0x0B, 7)
+
+    # 清除计数器
+    await handler.handle_request(1, 0x08, struct.pack(">HH", 0x0A, 0), "test")
+    response = await handler.handle_request(1, 0x08, struct.pack(">HH", 0x0D, 0), "test")
+    assert response == struct.pack(">BHH", 0x08, 0x0D, 0)
+
+    # 不支持的子功能
+    response = await handler.handle_request(1, 0x08, struct.pack(">HH", 0x55, 0), "test")
+    assert response == b"\x88\x01"
+
+    # 计数器按传输层独立
+    response = await handler.handle_request(1, 0x08, struct.pack(">HH", 0x0E, 0), "other")
+    assert response == struct.pack(">BHH", 0x08, 0x0E, 1)
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_listen_only_and_restart(setup):
+    """测试只听模式和重启通信 (FC08)。"""
+    handler, datastore = setup
+    import struct
+
+    response = await handler.handle_request(1, 0x08, struct.pack(">HH", 0x04, 0), "test")
+    assert response is None
+    assert await handler.handle_request(1, 0x03, b"\x00\x00\x00\x01", "test") is None
+
+    # 只听模式下重启通信退出只听模式，但不返回响应
+    response = await handler.handle_request(1, 0x08, struct.pack(">HH", 0x01, 0xFF00), "test")
+    assert response is None
+    assert await handler.handle_request(1, 0x03, b"\x00\x00\x00\x01", "test") is not None
+
+    response = await handler.handle_request(1, 0x08, struct.pack(">HH", 0x01, 0x0000), "test")
+    assert response == struct.pack(">BHH", 0x08, 0x01, 0x0000)
+
+
+@pytest.mark.asyncio
+async def test_comm_event_counter_and_log(setup):
+    """测试通信事件计数器和事件日志 (FC11/FC12)。"""
+    handler, datastore = setup
+    import struct
+
+    await handler.handle_request(1, 0x03, b"\x00\x00\x00\x01", "test")
+    await handler.handle_request(1, 0x03, b"\xFF\xFF\x00\x01", "test")
+
+    response = await handler.handle_request(1, 0x0B, b"", "test")
+    status, event_count = struct.unpack(">HH", response[1:])
+    assert status == 0x0000
+    assert event_count == 1  # 异常响应不计入
+
+    for _ in range(40):
+        await handler.handle_request(1, 0x07, b"", "test")
+    response = await handler.handle_request(1, 0x0C, b"", "test")
+    byte_count = response[1]
+    events = response[8:]
+    assert byte_count == 6 + 64
+    assert len(events) == 64
+    # 最新事件在前：上一条 FC11... 本次 FC12 的接收事件
+    assert events[0] == 0x80
+    assert events[1] == 0x40
+
+
+@pytest.mark.asyncio
+async def test_read_device_identification(setup):
+    """测试读设备标识 (FC43/14)。"""
+    handler, datastore = setup
+
+    # 基本流式访问（默认对象）
+    response = await handler.handle_request(1, 0x2B, b"\x0E\x01\x00", "test")
+    assert response[:7] == bytes([0x2B, 0x0E, 0x01, 0x82, 0x00, 0x00, 0x03])
+    assert response[7] == 0x00
+    assert response[9 : 9 + response[8]] == b"clint"
+
+    # 单个对象访问
+    response = await handler.handle_request(1, 0x2B, b"\x0E\x04\x04", "test")
+    assert response[6] == 1
+    assert response[9:] == b"Modbus Slave Full"
+    response = await handler.handle_request(1, 0x2B, b"\x0E\x04\x06", "test")
+    assert response == b"\xAB\x02"
+
+    # 无效读取码
+    response = await handler.handle_request(1, 0x2B, b"\x0E\x05\x00", "test")
+    assert response == b"\xAB\x03"
+
+    # 不存在的从站
+    response = await handler.handle_request(9, 0x2B, b"\x0E\x01\x00", "test")
+    assert response == b"\xAB\x02"
+
+
+@pytest.mark.asyncio
+async def test_read_device_identification_paging(setup):
+    """测试扩展对象的"后续"分页。"""
+    handler, datastore = setup
+    objects = {0x00: "vendor", 0x01: "code", 0x02: "1.0"}
+    objects.update({0x80 + i: chr(ord("A") + i) * 100 for i in range(4)})
+    handler.set_device_identification(1, objects)
+
+    received = {}
+    object_id = 0x00
+    for _ in range(10):
+        response = await handler.handle_request(1, 0x2B, bytes([0x0E, 0x03, object_id]), "test")
+        assert len(response) <= 253
+        assert response[3] == 0x83
+        offset = 7
+        for _ in range(response[6]):
+            length = response[offset + 1]
+            received[response[offset]] = response[offset + 2 : offset + 2 + length]
+            offset += 2 + length
+        if response[4] == 0x00:
+            break
+        object_id = response[5]
+
+    assert received[0x00] == b"vendor"
+    assert received[0x83] == b"D" * 100
+    assert len(received) == 7
+
+    # 未知的起始对象从头开始
+    response = await handler.handle_request(1, 0x2B, b"\x0E\x01\x50", "test")
+    assert response[7] == 0x00
+
+
+@pytest.mark.asyncio
+async def test_report_slave_id_cached(setup):
+    """测试 FC17 响应缓存。"""
+    handler, datastore = setup
+    handler.set_report_slave_id(1, b"PLC-1", run_indicator=False)
+    response = await handler.handle_request(1, 0x11, b"", "test")
+    assert response == b"\x11\x06PLC-1\x00"
+
+
+@pytest.mark.asyncio
+async def test_read_file_record_multiple_sub_requests(setup):
+    """测试多个子请求的批量读文件记录 (FC20)。"""
+    handler, datastore = setup
+    import struct
+
+    await datastore.write_registers(1, 10000, [0x1111, 0x2222], "test")
+    await datastore.write_registers(1, 20005, [0x3333], "test")
+
+    sub_requests = struct.pack(">BHHH", 0x06, 1, 0, 2) + struct.pack(">BHHH", 0x06, 2, 5, 1)
+    response = await handler.handle_request(
+        1, 0x14, bytes([len(sub_requests)]) + sub_requests, "test"
+    )
+    expected = bytes([0x14, 10, 5, 0x06]) + b"\x11\x11\x22\x22" + bytes([3, 0x06]) + b"\x33\x33"
+    assert response == expected
+
+
+@pytest.mark.asyncio
+async def test_read_file_record_oversized_rejected_before_read(setup):
+    """测试超长读文件记录在读取数据前被拒绝。"""
+    handler, datastore = setup
+    import struct
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("不应读取数据")
+
+    datastore.read_holding_register_blocks = fail
+    sub_requests = struct.pack(">BHHH", 0x06, 0, 0, 120) * 2
+    response = await handler.handle_request(
+        1, 0x14, bytes([len(sub_requests)]) + sub_requests, "test"
+    )
+    assert response == b"\x94\x03"
+
+
+@pytest.mark.asyncio
+async def test_write_file_record_atomic(setup):
+    """测试写文件记录任一子请求越界时不写入任何数据 (FC21)。"""
+    handler, datastore = setup
+    import struct
+
+    sub_requests = (
+        struct.pack(">BHHHH", 0x06, 0, 0, 1, 0xAAAA)
+        + struct.pack(">BHHHH", 0x06, 9, 0, 1, 0xBBBB)  # 地址 90000 越界
+    )
+    response = await handler.handle_request(
+        1, 0x15, bytes([len(sub_requests)]) + sub_requests, "test"
+    )
+    assert response == b"\x95\x02"
+    assert await datastore.read_holding_registers(1, 0, 1) == [0]
@@ -0,0 +1,82 @@
+"""Modbus ASCII 测试。"""
+
+import asyncio
+import os
+
+import pytest
+
+from modbus_slave_full.config import Config, RTUPortConfig
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusASCIIServer, ModbusHandler
+from modbus_slave_full.protocol.utils import calculate_lrc, decode_ascii_frame, encode_ascii_frame
+from modbus_slave_full.workers import create_rtu_servers
+
+from .test_rtu import read_exactly
+
+
+def test_ascii_frame_encoding():
+    """测试 LRC 计算和 ASCII 帧编解码。"""
+    # Modbus over Serial Line 规范中的示例
+    assert calculate_lrc(bytes.fromhex("F7031389000A")) == 0x60
+    assert encode_ascii_frame(bytes.fromhex("F7031389000A")) == b":F7031389000A60\r\n"
+    assert decode_ascii_frame(b"F7031389000A60") == bytes.fromhex("F7031389000A")
+    assert decode_ascii_frame(b"f7031389000a60") == bytes.fromhex("F7031389000A")
+    assert decode_ascii_frame(b"F7031389000A61") is None
+    assert decode_ascii_frame(b"F7031389000A6") is None
+    assert decode_ascii_frame(b"F70313GG000A60") is None
+
+
+@pytest.mark.asyncio
+async def test_ascii_server():
+    """测试 ASCII 服务器处理请求，噪声和 LRC 错误计入通信错误。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    handler = ModbusHandler(datastore)
+    master, slave = os.openpty()
+    os.set_blocking(master, False)
+    # 伪终端不支持校验位，使用 8N1
+    server = ModbusASCIIServer(handler, os.ttyname(slave), bytesize=8, parity="N")
+    task = asyncio.create_task(server.start())
+    try:
+        await asyncio.sleep(0.05)
+        write = encode_ascii_frame(b"\x01\x06\x00\x01\x12\x34")
+        os.write(master, write)
+        assert await read_exactly(master, len(write)) == write
+
+        # ':' 之前的噪声被丢弃，两个帧在同一次写入中
+        read = encode_ascii_frame(b"\x01\x03\x00\x01\x00\x01")
+        os.write(master, b"\x00\xff:0103" + read + read)
+        expected = encode_ascii_frame(b"\x01\x03\x02\x12\x34")
+        assert await read_exactly(master, 2 * len(expected)) == expected * 2
+
+        os.write(master, b":01030001000100\r\n" + read)
+        assert await read_exactly(master, len(expected)) == expected
+    finally:
+        await server.stop()
+        task.cancel()
+        os.close(master)
+        os.close(slave)
+
+    assert server.frames == 4
+    assert server.discarded_bytes == 7 + 17
+    assert handler.comm_counters["ascii"].bus_comm_error_count == 1
+
+
+def test_ascii_mode_from_config():
+    """测试按串口协议创建服务器，附加串口继承主串口的协议。"""
+    config = Config.get_default()
+    rtu = config.server.rtu
+    rtu.enabled = True
+    rtu.mode = "ascii"
+    rtu.ports = [RTUPortConfig(port="/dev/ttyUSB1"), RTUPortConfig(port="/dev/ttyUSB2", mode="rtu")]
+    servers = create_rtu_servers(ModbusHandler(ModbusDataStore()), rtu)
+    assert [type(server).__name__ for server in servers] == [
+        "ModbusASCIIServer",
+        "ModbusASCIIServer",
+        "ModbusRTUServer",
+    ]
+    assert [server.name for server in servers] == ["ascii", "ascii:/dev/ttyUSB1", "rtu:/dev/ttyUSB2"]
+
+    rtu.mode = "tcp"
+    with pytest.raises(ValueError):
+        create_rtu_servers(ModbusHandler(ModbusDataStore()), rtu)
@@ -0,0 +1,40 @@
+"""事件循环选择测试。"""
+
+import asyncio
+
+import pytest
+
+from modbus_slave_full.utils import event_loop
+from modbus_slave_full.utils.event_loop import event_loop_info, install_event_loop_policy
+
+
+@pytest.fixture(autouse=True)
+def restore_policy():
+    """测试后恢复默认事件循环策略。"""
+    yield
+    asyncio.set_event_loop_policy(None)
+
+
+def test_asyncio_backend():
+    """测试标准 asyncio 事件循环。"""
+    assert install_event_loop_policy("asyncio") == "asyncio"
+
+    async def main():
+        return event_loop_info()
+
+    info = asyncio.run(main())
+    assert info["backend"] == "asyncio"
+    assert info["version"] is None
+
+
+def test_uvloop_fallback(monkeypatch):
+    """测试未安装 uvloop 时回退到 asyncio。"""
+    monkeypatch.setattr(event_loop, "uvloop", None)
+    assert install_event_loop_policy("auto") == "asyncio"
+    assert install_event_loop_policy("uvloop") == "asyncio"
+
+
+def test_unknown_backend():
+    """测试未知的事件循环后端。"""
+    with pytest.raises(ValueError):
+        install_event_loop_policy("trio")
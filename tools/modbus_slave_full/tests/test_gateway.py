@@ -0,0 +1,236 @@
+"""TCP 到 RTU 网关测试。"""
+
+import asyncio
+import time
+
+import pytest
+import serial
+
+from modbus_slave_full.config import GatewayConfig
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import (
+    LatencyInjectionMiddleware,
+    ModbusHandler,
+    ModbusTCPServer,
+    ModbusUDPServer,
+)
+from modbus_slave_full.protocol.gateway import BusScheduler, RTUGateway
+from modbus_slave_full.protocol.routing import UnitRouter
+from modbus_slave_full.testing import RTUHarness
+from modbus_slave_full.workers import create_gateway
+
+from .test_tcp import build_request, read_response, start_server
+from .test_udp import ClientProtocol, open_client, receive
+
+READ = b"\x03\x00\x00\x00\x01"
+
+
+@pytest.fixture
+def downstream():
+    """下游总线上的从站 1 和 2。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    datastore.initialize_slave(2)
+    return ModbusHandler(datastore)
+
+
+@pytest.fixture
+def upstream():
+    """网关本地的从站 10。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(10)
+    return ModbusHandler(datastore)
+
+
+def make_gateway(upstream, units=(1, 2), unit_map=None, **scheduler_kwargs) -> RTUGateway:
+    """创建网关，转发 units 和 unit_map 中的单元ID。"""
+    return RTUGateway(
+        upstream, UnitRouter(unit_map, slaves=units), BusScheduler(**scheduler_kwargs)
+    )
+
+
+@pytest.mark.asyncio
+async def test_tcp_requests_forwarded_to_rtu_bus(upstream, downstream):
+    """测试 TCP 请求按单元ID转发到下游总线，其它单元ID由本地处理。"""
+    await downstream.datastore.write_registers(1, 0, [41])
+    gateway = make_gateway(upstream, units=[1], unit_map={5: 2})
+    async with RTUHarness(downstream, shape=False) as harness:
+        gateway.start(harness.master)
+        server = ModbusTCPServer(upstream)
+        task, port = await start_server(server)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            writer.write(build_request(1, 1, READ))
+            assert await read_response(reader) == (1, 1, b"\x03\x02\x00\x29")
+            writer.write(build_request(2, 5, b"\x06\x00\x00\x00\x07"))
+            assert await read_response(reader) == (2, 5, b"\x06\x00\x00\x00\x07")
+            writer.write(build_request(3, 10, READ))
+            assert await read_response(reader) == (3, 10, b"\x03\x02\x00\x00")
+        finally:
+            writer.close()
+            await server.stop()
+            task.cancel()
+            await gateway.stop()
+
+    assert await downstream.datastore.read_holding_registers(2, 0, 1) == [7]
+    stats = upstream.get_stats()["transports"]["gateway"]
+    assert stats["forwarded"] == 2
+    assert stats["transactions"] == 2
+    assert stats["units"] == {1: 1, 5: 2}
+
+
+@pytest.mark.asyncio
+async def test_identical_reads_merged(upstream, downstream):
+    """测试并发的相同读请求合并为一次总线事务，写请求之后的读请求不合并。"""
+    gateway = make_gateway(upstream)
+    async with RTUHarness(downstream, baudrate=9600) as harness:
+        gateway.start(harness.master)
+        responses = await asyncio.gather(
+            *(upstream.handle_request(1, 0x03, READ[1:], f"client{i}") for i in range(5))
+        )
+        assert responses == [b"\x03\x02\x00\x00"] * 5
+        assert harness.master.transactions == 1
+
+        first = asyncio.create_task(upstream.handle_request(1, 0x03, READ[1:], "a"))
+        await asyncio.sleep(0)
+        write = upstream.handle_request(1, 0x06, b"\x00\x00\x00\x09", "b")
+        second = upstream.handle_request(1, 0x03, READ[1:], "b")
+        results = await asyncio.gather(first, write, second)
+        await gateway.stop()
+
+    assert results[2] == b"\x03\x02\x00\x09"
+    assert harness.master.transactions == 4
+    assert gateway.scheduler.merged == 4
+
+
+@pytest.mark.asyncio
+async def test_fair_queuing_across_clients(upstream, downstream):
+    """测试一个客户端的大量请求不阻塞其它客户端。"""
+    gateway = make_gateway(upstream)
+    order = []
+
+    async def request(client: str, address: int) -> None:
+        await upstream.handle_request(1, 0x03, bytes([0, address, 0, 1]), client)
+        order.append(client)
+
+    async with RTUHarness(downstream, baudrate=38400) as harness:
+        gateway.start(harness.master)
+        busy = [asyncio.create_task(request("busy", address)) for address in range(8)]
+        await asyncio.sleep(0)
+        await request("quiet", 0)
+        await asyncio.gather(*busy)
+        await gateway.stop()
+
+    # 轮转调度：安静的客户端排在忙碌客户端的第二个请求之后
+    assert order.index("quiet") <= 2
+
+
+@pytest.mark.asyncio
+async def test_dead_slave_backoff_and_timeouts(upstream, downstream):
+    """测试无响应的从站返回 0x0B 并退避，不拖慢其它从站；慢从站按请求超时返回 0x0B。"""
+    downstream.add_middleware(LatencyInjectionMiddleware(0.3, units=[2]))
+    gateway = make_gateway(upstream, units=[1, 2, 3], timeout=0.05, request_timeout=0.1)
+    async with RTUHarness(downstream, shape=False) as harness:
+        gateway.start(harness.master)
+        assert await upstream.handle_request(3, 0x03, READ[1:], "a") == b"\x83\x0B"
+
+        start = time.perf_counter()
+        dead, alive = await asyncio.gather(
+            upstream.handle_request(3, 0x03, READ[1:], "a"),
+            upstream.handle_request(1, 0x03, READ[1:], "b"),
+        )
+        assert time.perf_counter() - start < 0.05
+        assert dead == b"\x83\x0B"
+        assert alive == b"\x03\x02\x00\x00"
+
+        assert await upstream.handle_request(2, 0x03, READ[1:], "a") == b"\x83\x0B"
+        stats = upstream.get_stats()["transports"]["gateway"]
+        await gateway.stop()
+
+    assert stats["fast_failures"] == 1
+    assert stats["bus_timeouts"] == 2
+    assert stats["backoff_units"] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_path_unavailable_and_config(upstream):
+    """测试下游总线未打开时返回 0x0A，按配置创建网关。"""
+    config = GatewayConfig(enabled=True, units=[1], unit_map={7: 2}, queue_size=4)
+    gateway = create_gateway(upstream, config)
+    assert gateway.routes.resolve(7) == 2
+    assert gateway.scheduler.queue_size == 4
+    assert await upstream.handle_request(1, 0x03, READ[1:], "a") == b"\x83\x0A"
+    assert await upstream.handle_request(10, 0x03, READ[1:], "a") == b"\x03\x02\x00\x00"
+
+
+@pytest.mark.asyncio
+async def test_udp_slow_unit_does_not_block_clients(upstream, downstream):
+    """测试 UDP 转发的请求单独处理：慢的下游从站不阻塞本地单元和其它客户端。"""
+    downstream.add_middleware(LatencyInjectionMiddleware(0.2, units=[2]))
+    gateway = make_gateway(upstream)
+    async with RTUHarness(downstream, shape=False) as harness:
+        gateway.start(harness.master)
+        server = ModbusUDPServer(upstream)
+        slow, slow_protocol = await open_client(server)
+        loop = asyncio.get_running_loop()
+        fast, fast_protocol = await loop.create_datagram_endpoint(
+            ClientProtocol, remote_addr=server.address
+        )
+        try:
+            slow.sendto(build_request(1, 2, READ))
+            await asyncio.sleep(0.02)
+            start = time.perf_counter()
+            fast.sendto(build_request(2, 1, READ))
+            fast.sendto(build_request(3, 10, READ))
+            assert await receive(fast_protocol) == build_request(3, 10, b"\x03\x02\x00\x00")
+            assert time.perf_counter() - start < 0.1
+            # 转发的请求在下游总线上排在慢从站的事务之后
+            assert await receive(slow_protocol) == build_request(1, 2, b"\x03\x02\x00\x00")
+            assert await receive(fast_protocol) == build_request(2, 1, b"\x03\x02\x00\x00")
+            stats = upstream.get_stats()["transports"]["gateway"]
+        finally:
+            slow.close()
+            fast.close()
+            await server.stop()
+            await gateway.stop()
+
+    assert stats["forwarded"] == 2
+
+
+class UnpluggedMaster:
+    """模拟 USB 转串口适配器被拔出的下游总线主站。"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self, unit_id, pdu, timeout=None):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        raise serial.SerialException("device reports readiness to read but returned no data")
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_serial_error_stops_forwarding(upstream):
+    """测试串口错误时当前和排队中的请求返回 0x0A，之后的请求立即返回 0x0A。"""
+    gateway = make_gateway(upstream)
+    master = UnpluggedMaster()
+    gateway.start(master)
+    first, queued, local = await asyncio.gather(
+        upstream.handle_request(1, 0x03, READ[1:], "a"),
+        upstream.handle_request(2, 0x03, READ[1:], "b"),
+        upstream.handle_request(10, 0x03, READ[1:], "c"),
+    )
+    assert first == queued == b"\x83\x0A"
+    assert local == b"\x03\x02\x00\x00"
+
+    start = time.perf_counter()
+    assert await upstream.handle_request(1, 0x03, READ[1:], "a") == b"\x83\x0A"
+    assert time.perf_counter() - start < 0.01
+    stats = upstream.get_stats()["transports"]["gateway"]
+    assert master.calls == 1
+    assert stats["bus_errors"] == 1
+    assert not stats["running"]
+    await gateway.stop()
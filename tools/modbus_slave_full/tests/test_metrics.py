@@ -0,0 +1,54 @@
+"""请求指标测试。"""
+
+from modbus_slave_full.utils.metrics import LatencyHistogram, RequestMetrics
+
+
+def test_histogram_percentiles():
+    """测试直方图百分位查询。"""
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+
+    assert histogram.count == 1000
+    assert histogram.min == 1
+    assert histogram.max == 1000
+    # 对数-线性分桶的相对误差约 6%
+    assert abs(histogram.percentile(50) - 500) <= 500 * 0.07
+    assert abs(histogram.percentile(99) - 990) <= 990 * 0.07
+    assert histogram.percentile(100) == 1000
+
+
+def test_histogram_small_values_exact():
+    """测试小数值精确分桶。"""
+    histogram = LatencyHistogram()
+    for value in (3, 3, 3, 7):
+        histogram.record(value)
+    assert histogram.percentile(50) == 3
+    assert histogram.percentile(100) == 7
+
+
+def test_histogram_merge():
+    """测试直方图合并。"""
+    first = LatencyHistogram()
+    second = LatencyHistogram()
+    first.record(10)
+    second.record(5000)
+    first.merge(second)
+    assert first.count == 2
+    assert first.min == 10
+    assert first.max == 5000
+
+
+def test_request_metrics_exceptions_and_bytes():
+    """测试异常码和字节统计。"""
+    metrics = RequestMetrics()
+    metrics.record(1, 0x03, 5, b"\x03\x02\x00\x01", 120)
+    metrics.record(2, 0x03, 5, b"\x83\x02", 80)
+
+    summary = metrics.summary()
+    assert summary["bytes_in"] == 10
+    assert summary["bytes_out"] == 6
+    assert summary["exception_codes"] == {"0x02": 1}
+    assert summary["latency_by_function"]["FC03"]["count"] == 2
+    assert set(summary["latency_by_unit"]) == {"1", "2"}
+    assert metrics.percentile(100, unit_id=1) == 120
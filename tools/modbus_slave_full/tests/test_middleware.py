@@ -0,0 +1,75 @@
+"""请求中间件测试。"""
+
+import pytest
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler, UnitAccessMiddleware
+
+
+@pytest.fixture
+def handler():
+    """创建处理器。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    datastore.initialize_slave(2)
+    return ModbusHandler(datastore)
+
+
+@pytest.mark.asyncio
+async def test_middleware_order_and_removal(handler):
+    """测试中间件执行顺序和移除。"""
+    calls = []
+
+    async def outer(slave_id, function_code, data, source, call_next):
+        calls.append("outer")
+        return await call_next(slave_id, function_code, data, source)
+
+    async def inner(slave_id, function_code, data, source, call_next):
+        calls.append("inner")
+        return await call_next(slave_id, function_code, data, source)
+
+    handler.add_middleware(outer)
+    handler.add_middleware(inner)
+    response = await handler.handle_request(1, 0x03, b"\x00\x00\x00\x01", "test")
+    assert response == b"\x03\x02\x00\x00"
+    assert calls == ["outer", "inner"]
+
+    handler.remove_middleware(outer)
+    handler.remove_middleware(inner)
+    assert handler._chain is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_short_circuit_and_error(handler):
+    """测试中间件直接返回响应和抛出异常。"""
+
+    async def short_circuit(slave_id, function_code, data, source, call_next):
+        # 不调用 call_next：写请求不到达功能码处理器和数据存储
+        return bytes([function_code]) + data
+
+    handler.add_middleware(short_circuit)
+    response = await handler.handle_request(1, 0x06, b"\x00\x00\x12\x34", "test")
+    assert response == b"\x06\x00\x00\x12\x34"
+    assert await handler.datastore.read_holding_registers(1, 0, 1) == [0]
+    handler.remove_middleware(short_circuit)
+
+    async def failing(slave_id, function_code, data, source, call_next):
+        raise RuntimeError("boom")
+
+    handler.add_middleware(failing)
+    response = await handler.handle_request(1, 0x03, b"\x00\x00\x00\x01", "test")
+    assert response == b"\x83\x04"
+    assert handler.get_stats()["exception_responses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unit_access_middleware(handler):
+    """测试按从站限制写功能码。"""
+    handler.add_middleware(UnitAccessMiddleware(read_only_units=[2]))
+
+    response = await handler.handle_request(2, 0x06, b"\x00\x00\x00\x01", "test")
+    assert response == b"\x86\x01"
+    response = await handler.handle_request(1, 0x06, b"\x00\x00\x00\x01", "test")
+    assert response == b"\x06\x00\x00\x00\x01"
+    response = await handler.handle_request(2, 0x03, b"\x00\x00\x00\x01", "test")
+    assert response[0] == 0x03
@@ -0,0 +1,210 @@
+"""RTU 总线监听测试。"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from modbus_slave_full.config import RTUConfig
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler, ModbusRTUServer
+from modbus_slave_full.protocol.monitor import (
+    FRAME_BROADCAST,
+    FRAME_REQUEST,
+    FRAME_RESPONSE,
+    BusMonitor,
+    decode_pdu,
+    read_capture,
+)
+from modbus_slave_full.protocol.utils import add_crc16
+from modbus_slave_full.web import ModbusWebServer
+from modbus_slave_full.workers import create_rtu_servers
+
+READ = add_crc16(b"\x01\x03\x00\x00\x00\x02")
+READ_RESPONSE = add_crc16(b"\x01\x03\x04\x00\x07\x00\x08")
+WRITE = add_crc16(b"\x02\x06\x00\x01\x00\x05")
+EXCEPTION = add_crc16(b"\x02\x86\x02")
+BROADCAST = add_crc16(b"\x00\x06\x00\x00\x00\x09")
+
+
+@pytest.fixture
+def handler():
+    """创建没有从站的处理器（监听模式不访问数据存储）。"""
+    return ModbusHandler(ModbusDataStore())
+
+
+async def run_monitor(handler, data: bytes, **monitor_kwargs) -> ModbusRTUServer:
+    """在伪终端上运行监听模式服务器，写入总线数据并等待处理完成。"""
+    master, slave = os.openpty()
+    os.set_blocking(master, False)
+    monitor = BusMonitor(baudrate=115200, **monitor_kwargs)
+    server = ModbusRTUServer(handler, os.ttyname(slave), baudrate=115200, monitor=monitor)
+    task = asyncio.create_task(server.start())
+    try:
+        while not server.running:
+            await asyncio.sleep(0.005)
+        for offset in range(0, len(data), 4096):
+            os.write(master, data[offset : offset + 4096])
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.1)
+        # 监听模式从不发送
+        with pytest.raises(BlockingIOError):
+            os.read(master, 64)
+    finally:
+        await server.stop()
+        task.cancel()
+        os.close(master)
+        os.close(slave)
+    return server
+
+
+def test_decode_pdu():
+    """测试标准功能码字段解析。"""
+    assert decode_pdu(FRAME_REQUEST, 0x03, b"\x00\x0A\x00\x02") == {"address": 10, "count": 2}
+    assert decode_pdu(FRAME_RESPONSE, 0x03, b"\x04\x00\x07\x00\x08") == {"registers": [7, 8]}
+    assert decode_pdu(FRAME_REQUEST, 0x10, b"\x00\x00\x00\x01\x02\x12\x34") == {
+        "address": 0,
+        "count": 1,
+        "registers": [0x1234],
+    }
+    assert decode_pdu(FRAME_RESPONSE, 0x86, b"\x02") == {"exception_code": 2}
+    assert decode_pdu(FRAME_REQUEST, 0x03, b"\x00") == {}
+    assert decode_pdu(FRAME_REQUEST, 0x65, b"\x01") == {}
+
+
+@pytest.mark.asyncio
+async def test_monitor_pairs_frames_and_writes_capture(handler, tmp_path):
+    """测试监听模式配对请求和响应、写入抓包文件且从不发送。"""
+    capture = tmp_path / "bus.cap"
+    # 第二个读请求没有响应
+    bus = READ + READ_RESPONSE + WRITE + EXCEPTION + BROADCAST + READ + READ + READ_RESPONSE
+    server = await run_monitor(handler, bus, capture_file=str(capture))
+
+    stats = handler.get_stats()["transports"]["rtu"]["monitor"]
+    assert stats["frames"] == 8
+    assert stats["requests"] == 4
+    assert stats["responses"] == 3
+    assert stats["exceptions"] == 1
+    assert stats["broadcasts"] == 1
+    assert stats["unanswered"] == 1
+    assert stats["capture_bytes"] == capture.stat().st_size
+    assert server.counters.bus_message_count == 8
+    assert handler.stats["total_requests"] == 0
+
+    records = list(read_capture(str(capture)))
+    assert [record.frame for record in records] == [
+        READ,
+        READ_RESPONSE,
+        WRITE,
+        EXCEPTION,
+        BROADCAST,
+        READ,
+        READ,
+        READ_RESPONSE,
+    ]
+    assert [record.kind for record in records[:5]] == [
+        FRAME_REQUEST,
+        FRAME_RESPONSE,
+        FRAME_REQUEST,
+        FRAME_RESPONSE,
+        FRAME_BROADCAST,
+    ]
+    # 同一数据块中的帧按字符时间倒推，时间戳递增
+    timestamps = [record.timestamp_us for record in records]
+    assert timestamps == sorted(timestamps)
+    assert timestamps[1] - timestamps[0] >= len(READ_RESPONSE) * 10 * 1e6 // 115200 - 1
+
+
+@pytest.mark.asyncio
+async def test_monitor_keeps_up_with_continuous_traffic(handler):
+    """测试连续的背靠背流量（无帧间隔）全部被切分和配对。"""
+    transactions = 1000
+    server = await run_monitor(handler, (READ + READ_RESPONSE) * transactions)
+    stats = server.monitor.get_stats()
+    assert stats["requests"] == transactions
+    assert stats["responses"] == transactions
+    assert server.discarded_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_monitor_websocket_feed(handler):
+    """测试 /ws/monitor 推送解析后的帧。"""
+    monitor = BusMonitor("line1")
+    config = SimpleNamespace(
+        auth=SimpleNamespace(enabled=False, username="", password=""), host="", port=0
+    )
+    web_server = ModbusWebServer(handler.datastore, handler, config)
+    web_server.add_monitor(monitor)
+    async with TestClient(TestServer(web_server.app)) as client:
+        ws = await client.ws_connect("/ws/monitor")
+        while not monitor.subscribers:
+            await asyncio.sleep(0.01)
+        monitor.record(READ, 1_000_000)
+        monitor.record(READ_RESPONSE, 3_000_000)
+        frames = []
+        while len(frames) < 2:
+            message = await ws.receive_json(timeout=1)
+            assert message["type"] == "bus_frames"
+            frames.extend(message["frames"])
+        await ws.close()
+    assert frames[0]["kind"] == "request"
+    assert frames[0]["port"] == "line1"
+    assert frames[0]["fields"] == {"address": 0, "count": 2}
+    assert frames[1]["kind"] == "response"
+    assert frames[1]["fields"] == {"registers": [7, 8]}
+    assert frames[1]["latency_us"] == 2000
+
+
+@pytest.mark.asyncio
+async def test_monitor_websocket_send_failure(handler, monkeypatch):
+    """测试推送时客户端已断开：推送任务正常结束，不留下异常。"""
+
+    async def send_json(self, data, *args, **kwargs):
+        raise ConnectionResetError("Cannot write to closing transport")
+
+    senders = []
+    create_task = asyncio.create_task
+
+    def record_task(coro, **kwargs):
+        task = create_task(coro, **kwargs)
+        if coro.__qualname__.endswith("send_events"):
+            senders.append(task)
+        return task
+
+    monkeypatch.setattr(web.WebSocketResponse, "send_json", send_json)
+    monkeypatch.setattr(asyncio, "create_task", record_task)
+    monitor = BusMonitor("line1")
+    config = SimpleNamespace(
+        auth=SimpleNamespace(enabled=False, username="", password=""), host="", port=0
+    )
+    web_server = ModbusWebServer(handler.datastore, handler, config)
+    web_server.add_monitor(monitor)
+    async with TestClient(TestServer(web_server.app)) as client:
+        ws = await client.ws_connect("/ws/monitor")
+        while not monitor.subscribers:
+            await asyncio.sleep(0.01)
+        monitor.record(READ, 1_000_000)
+        await asyncio.sleep(0.05)
+        # 推送失败后推送任务结束，连接仍由接收循环处理到关闭
+        assert senders[0].done()
+        await ws.close()
+        while monitor.subscribers:
+            await asyncio.sleep(0.01)
+
+    assert not senders[0].cancelled()
+    assert senders[0].exception() is None
+
+
+def test_monitor_from_config(handler):
+    """测试按配置创建监听模式串口，ASCII 串口不支持监听模式。"""
+    config = RTUConfig(port="/dev/null", monitor=True, capture_file="bus.cap")
+    server = create_rtu_servers(handler, config)[0]
+    assert server.monitor.capture_file == "bus.cap"
+    assert server.monitor.name == "rtu"
+
+    config.mode = "ascii"
+    with pytest.raises(ValueError):
+        create_rtu_servers(handler, config)
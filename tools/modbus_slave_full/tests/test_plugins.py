@@ -0,0 +1,101 @@
+"""自定义功能码插件测试。"""
+
+import struct
+
+import pytest
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler
+from modbus_slave_full.protocol.framing import UNKNOWN_LENGTH, RequestLength
+from modbus_slave_full.protocol.plugins import load_function_code_plugins
+from modbus_slave_full.protocol.utils import add_crc16
+
+
+def register_vendor(handler):
+    """测试用插件注册函数：FC65 返回寄存器之和。"""
+
+    async def sum_registers(slave_id, data, source):
+        address, count = struct.unpack(">HH", data)
+        values = await handler.datastore.read_holding_registers(slave_id, address, count)
+        if values is None:
+            return struct.pack("BB", 0xC1, 0x02)
+        return struct.pack(">BI", 0x41, sum(values))
+
+    handler.register_function_code(0x41, sum_registers, request_length=4)
+
+
+@pytest.fixture
+def handler():
+    """创建处理器。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    return ModbusHandler(datastore)
+
+
+@pytest.mark.asyncio
+async def test_register_custom_function_code(handler):
+    """测试注册自定义功能码。"""
+    loaded = load_function_code_plugins(
+        handler, modules=["tests.test_plugins:register_vendor"], entry_points=False
+    )
+    assert loaded == ["tests.test_plugins:register_vendor"]
+
+    await handler.datastore.write_registers(1, 0, [1, 2, 3], "test")
+    response = await handler.handle_request(1, 0x41, b"\x00\x00\x00\x03", "test")
+    assert response == struct.pack(">BI", 0x41, 6)
+    response = await handler.handle_request(1, 0x41, b"\x00\x63\x00\x03", "test")
+    assert response == b"\xC1\x02"
+
+    stats = handler.get_stats()
+    assert stats["function_codes"]["FC65"] == 2
+    assert stats["exception_responses"] == 1
+    assert handler.expected_request_length(0x41, b"") == 4
+
+    with pytest.raises(ValueError):
+        handler.register_function_code(0x41, None)
+    with pytest.raises(ValueError):
+        handler.register_function_code(0x81, None)
+
+
+@pytest.mark.asyncio
+async def test_register_mei_type(handler):
+    """测试注册 FC43 MEI 类型。"""
+    response = await handler.handle_request(1, 0x2B, b"\x0D\x00", "test")
+    assert response == b"\xAB\x01"
+
+    async def echo(slave_id, data, source):
+        return b"\x2B" + data
+
+    handler.register_mei_type(0x0D, echo, request_length=RequestLength(1, count_offset=0))
+    response = await handler.handle_request(1, 0x2B, b"\x0D\x02\xAA\xBB", "test")
+    assert response == b"\x2B\x0D\x02\xAA\xBB"
+    assert handler.expected_request_length(0x2B, b"\x0D\x02") == 4
+    assert handler.expected_request_length(0x2B, b"\x0D") is None
+    assert handler.expected_request_length(0x2B, b"\x0E") == 3
+    assert handler.expected_request_length(0x2B, b"\x0F") == UNKNOWN_LENGTH
+
+
+def test_standard_request_lengths(handler):
+    """测试标准功能码长度规则。"""
+    assert handler.expected_request_length(0x03, b"") == 4
+    assert handler.expected_request_length(0x10, b"\x00\x00\x00\x02") is None
+    assert handler.expected_request_length(0x10, b"\x00\x00\x00\x02\x04") == 9
+    assert handler.expected_request_length(0x14, b"\x0E") == 15
+    assert handler.expected_request_length(0x64, b"") == UNKNOWN_LENGTH
+
+
+def test_rtu_split_back_to_back_frames(handler):
+    """测试 RTU 按长度规则切分连续帧。"""
+    from modbus_slave_full.protocol.rtu import ModbusRTUServer
+
+    server = ModbusRTUServer(handler, port="/dev/null")
+    first = add_crc16(b"\x01\x03\x00\x00\x00\x02")
+    second = add_crc16(b"\x01\x10\x00\x00\x00\x01\x02\x12\x34")
+    framer = server.framer
+    assert framer.feed(first + second) == [first, second]
+
+    # 不完整的帧留在缓冲区中，T3.5 静默后丢弃
+    assert framer.feed(first + b"\x01\x03\x00") == [first]
+    assert framer.next_frame(at_gap=True) is None
+    framer.flush()
+    assert framer.discarded_bytes == 3
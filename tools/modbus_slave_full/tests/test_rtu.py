@@ -0,0 +1,369 @@
+"""RTU 帧切分和串口服务器测试。"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from modbus_slave_full.config import Config, RTUConfig, RTUPortConfig
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler, ModbusRTUServer
+from modbus_slave_full.protocol.diagnostics import CommCounters
+from modbus_slave_full.protocol.rtu import ReceiveRing, RTUFramer, char_gap, frame_gap
+from modbus_slave_full.protocol.utils import CRC16_TABLE, add_crc16, calculate_crc16
+from modbus_slave_full.workers import create_rtu_servers
+
+
+def make_framer(gaps: bool = False) -> RTUFramer:
+    """创建使用标准长度规则的切分器。"""
+    handler = ModbusHandler(ModbusDataStore())
+    return RTUFramer(handler.expected_request_length, CommCounters(), gaps=gaps)
+
+
+def test_feed_byte_by_byte():
+    """测试逐字节到达的帧在完整时才输出。"""
+    framer = make_framer()
+    frame = add_crc16(b"\x01\x10\x00\x00\x00\x02\x04\x00\x01\x00\x02")
+    for byte in frame[:-1]:
+        assert framer.feed(bytes([byte])) == []
+    assert framer.feed(frame[-1:]) == [frame]
+    assert not len(framer)
+
+
+def test_feed_unknown_function_code_uses_crc():
+    """测试没有长度规则的功能码按 CRC 确定帧边界。"""
+    framer = make_framer()
+    custom = add_crc16(b"\x01\x65\xAA\xBB\xCC")
+    read = add_crc16(b"\x01\x03\x00\x00\x00\x01")
+    assert framer.feed(custom + read) == [custom, read]
+
+
+def test_feed_resync_after_garbage():
+    """测试无效数据被逐字节丢弃，每次失去同步只记录一次通信错误。"""
+    framer = make_framer()
+    read = add_crc16(b"\x01\x03\x00\x00\x00\x01")
+    assert framer.feed(b"\x01\x03\x00\x00\x00\x01\x00\x00" + read) == [read]
+    assert framer.discarded_bytes == 8
+    assert framer.counters.bus_comm_error_count == 1
+
+
+def test_feed_resync_skips_false_header():
+    """测试失去同步时不等待假帧头声明的长度收齐，直接找到之后的有效帧。"""
+    framer = make_framer()
+    read = add_crc16(b"\x01\x03\x00\x00\x00\x01")
+    # CRC 错误的帧之后是声明 137 字节的假 FC16 帧头
+    noise = b"\x01\x03\x00\x00\x00\x01\x00\x00" + b"\x01\x10\x00\x00\x00\x40\x80"
+    assert framer.feed(noise + read) == [read]
+    assert framer.discarded_bytes == len(noise)
+    assert framer.counters.bus_comm_error_count == 1
+
+
+def test_feed_larger_than_buffer():
+    """测试一次写入超过接收缓冲区容量的数据时分段切分，不丢弃数据。"""
+    framer = make_framer()
+    read = add_crc16(b"\x01\x03\x00\x00\x00\x01")
+    assert framer.feed(read * 200) == [read] * 200
+    assert framer.discarded_bytes == 0
+    assert framer.counters.bus_char_overrun_count == 0
+
+
+def test_serial_frames_and_gap():
+    """测试串口：已知长度的帧收齐即可取出，没有长度规则的帧和剩余数据等待静默。"""
+    framer = make_framer(gaps=True)
+    first = add_crc16(b"\x01\x03\x00\x00\x00\x01")
+    second = add_crc16(b"\x02\x06\x00\x01\x00\x05")
+    framer.write(first + second[:-1])
+    assert framer.next_frame() == first
+    assert framer.next_frame() is None
+    framer.write(second[-1:])
+    assert framer.next_frame() == second
+
+    custom = add_crc16(b"\x01\x65\xAA")
+    framer.write(custom)
+    assert framer.next_frame() is None
+    assert framer.next_frame(at_gap=True) == custom
+
+    framer.write(first[:5])
+    assert framer.next_frame(at_gap=True) is None
+    framer.flush()
+    assert not len(framer)
+    assert framer.discarded_bytes == 5
+
+
+def test_frame_gap():
+    """测试 T1.5/T3.5 按字符时间计算，高波特率时固定为 0.75/1.75 ms。"""
+    assert char_gap(9600) == pytest.approx(1.5 * 10 / 9600)
+    assert char_gap(115200) == 0.00075
+    assert frame_gap(9600) == pytest.approx(3.5 * 10 / 9600)
+    assert frame_gap(9600, parity="E") == pytest.approx(3.5 * 11 / 9600)
+    assert frame_gap(19200) == pytest.approx(3.5 * 10 / 19200)
+    assert frame_gap(115200) == 0.00175
+
+
+async def read_exactly(fd: int, size: int, timeout: float = 2.0) -> bytes:
+    """从非阻塞文件描述符读取 size 个字节。"""
+    data = b""
+    deadline = time.monotonic() + timeout
+    while len(data) < size:
+        try:
+            data += os.read(fd, size - len(data))
+        except BlockingIOError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"只收到 {len(data)} 字节")
+            await asyncio.sleep(0.0005)
+    return data
+
+
+@pytest.mark.asyncio
+async def test_serial_early_dispatch_and_gap_fallback():
+    """测试串口上已知长度的请求立即处理，未知功能码在 T3.5 静默后处理。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    handler = ModbusHandler(datastore)
+    master, slave = os.openpty()
+    os.set_blocking(master, False)
+    # 9600 波特率下 T3.5 约 3.6 ms（伪终端不受波特率限制）
+    server = ModbusRTUServer(handler, os.ttyname(slave), baudrate=9600)
+    task = asyncio.create_task(server.start())
+    try:
+        await asyncio.sleep(0.05)
+        write = add_crc16(b"\x01\x06\x00\x01\x12\x34")
+        read = add_crc16(b"\x01\x03\x00\x01\x00\x01")
+        # 两个请求之间没有帧间隔，按长度切分后分别立即处理
+        os.write(master, write + read)
+        assert await read_exactly(master, 8) == write
+        assert await read_exactly(master, 7) == add_crc16(b"\x01\x03\x02\x12\x34")
+
+        # 未知功能码在帧间隔后处理（返回非法功能异常）
+        os.write(master, add_crc16(b"\x01\x65\x00"))
+        assert await read_exactly(master, 5) == add_crc16(b"\x01\xe5\x01")
+    finally:
+        await server.stop()
+        task.cancel()
+        os.close(master)
+        os.close(slave)
+
+    assert server.counters.bus_message_count == 3
+
+
+@pytest.mark.asyncio
+async def test_serial_timing_and_turnaround():
+    """测试可配置的 T3.5 和响应延迟，以及帧内间隔的测量。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    handler = ModbusHandler(datastore)
+    master, slave = os.openpty()
+    os.set_blocking(master, False)
+    server = ModbusRTUServer(
+        handler, os.ttyname(slave), baudrate=9600, t35=0.2, turnaround_delay=0.02
+    )
+    task = asyncio.create_task(server.start())
+    try:
+        await asyncio.sleep(0.05)
+        read = add_crc16(b"\x01\x03\x00\x00\x00\x01")
+        # 帧内 10 ms 的间隔超过 T1.5，但帧在 T3.5 内收齐并立即处理
+        os.write(master, read[:3])
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        os.write(master, read[3:])
+        assert await read_exactly(master, 7) == add_crc16(b"\x01\x03\x02\x00\x00")
+        assert 0.02 <= time.perf_counter() - start < 0.2
+    finally:
+        await server.stop()
+        task.cancel()
+        os.close(master)
+        os.close(slave)
+
+    stats = handler.get_stats()["transports"]["rtu"]
+    assert stats["t35_us"] == 200000
+    assert stats["turnaround_us"] == 20000
+    assert stats["early_frames"] == 1
+    assert stats["t15_violations"] == 1
+    assert stats["char_gaps"]["count"] == 1
+    assert stats["char_gaps"]["min_us"] >= 10000
+
+
+@pytest.mark.asyncio
+async def test_multiple_ports_from_config(tmp_path):
+    """测试按配置创建多个串口，每个串口有自己的参数、路由表和统计信息。"""
+    ptys = [os.openpty() for _ in range(3)]
+    for master, _ in ptys:
+        os.set_blocking(master, False)
+    config = Config.get_default()
+    rtu = config.server.rtu
+    rtu.enabled = True
+    rtu.port = os.ttyname(ptys[0][1])
+    rtu.baudrate = 115200
+    rtu.ports = [
+        RTUPortConfig(port=os.ttyname(ptys[1][1]), slave=2),
+        RTUPortConfig(port=os.ttyname(ptys[2][1]), name="line3", baudrate=9600, slaves=[1]),
+    ]
+    path = tmp_path / "config.yaml"
+    config.to_yaml(path)
+    loaded = Config.from_yaml(path)
+    assert loaded.server.rtu.ports == rtu.ports
+
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    datastore.initialize_slave(2)
+    await datastore.write_registers(2, 0, [42])
+    handler = ModbusHandler(datastore)
+    servers = create_rtu_servers(handler, loaded.server.rtu)
+    assert [server.name for server in servers] == ["rtu", f"rtu:{rtu.ports[0].port}", "line3"]
+    assert servers[1].t35 == servers[0].t35 == 0.00175
+    assert servers[2].t35 == pytest.approx(3.5 * 10 / 9600)
+    tasks = [asyncio.create_task(server.start()) for server in servers]
+    try:
+        await asyncio.sleep(0.05)
+        read = add_crc16(b"\x01\x03\x00\x00\x00\x01")
+        for (master, _), value in zip(ptys, (0, 42, 0)):
+            os.write(master, read)
+            response = await read_exactly(master, 7)
+            assert response == add_crc16(b"\x01\x03\x02" + value.to_bytes(2, "big"))
+
+        # line3 只响应单元ID 1，其它单元ID属于总线上的其它设备
+        master = ptys[2][0]
+        os.write(master, add_crc16(b"\x02\x03\x00\x00\x00\x01") + read)
+        assert await read_exactly(master, 7) == add_crc16(b"\x01\x03\x02\x00\x00")
+    finally:
+        for server in servers:
+            await server.stop()
+        for task in tasks:
+            task.cancel()
+        for master, slave in ptys:
+            os.close(master)
+            os.close(slave)
+
+    transports = handler.get_stats()["transports"]
+    assert transports["line3"]["early_frames"] == 3
+    assert transports["rtu"]["early_frames"] == 1
+    assert handler.comm_counters["line3"].bus_message_count == 3
+    assert handler.comm_counters["line3"].slave_message_count == 2
+
+
+def test_port_timing_inheritance():
+    """测试附加串口只在波特率和字符格式相同时继承主串口显式设置的时序。"""
+    rtu = RTUConfig(port="/dev/null", baudrate=9600, t15=0.002, t35=0.005)
+    rtu.ports = [
+        RTUPortConfig(port="/dev/null", name="same"),
+        RTUPortConfig(port="/dev/null", name="fast", baudrate=115200),
+        RTUPortConfig(port="/dev/null", name="even", parity="E", t35=0.01),
+    ]
+    handler = ModbusHandler(ModbusDataStore())
+    main, same, fast, even = create_rtu_servers(handler, rtu)
+    assert (same.t15, same.t35) == (main.t15, main.t35) == (0.002, 0.005)
+    assert (fast.t15, fast.t35) == (0.00075, 0.00175)
+    assert even.t15 == pytest.approx(1.5 * 11 / 9600)
+    assert even.t35 == 0.01
+
+
+def test_port_names_unique():
+    """测试串口名称（统计和诊断计数器的来源）重复时报错。"""
+    handler = ModbusHandler(ModbusDataStore())
+    for ports in (
+        [RTUPortConfig(port="/dev/null", name="rtu")],
+        [RTUPortConfig(port="/dev/null", name="a"), RTUPortConfig(port="/dev/zero", name="a")],
+        [RTUPortConfig(port="/dev/null"), RTUPortConfig(port="/dev/null")],
+    ):
+        rtu = RTUConfig(port="/dev/null", ports=ports)
+        with pytest.raises(ValueError, match="串口名称重复"):
+            create_rtu_servers(handler, rtu)
+
+
+@pytest.mark.asyncio
+async def test_multidrop_filter_and_broadcast():
+    """测试其它设备的请求和响应被静默丢弃，广播写请求应用到所有从站且不响应。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    datastore.initialize_slave(2)
+    handler = ModbusHandler(datastore)
+    master, slave = os.openpty()
+    os.set_blocking(master, False)
+    # T3.5 很长：帧必须按长度规则切分才能及时响应
+    server = ModbusRTUServer(handler, os.ttyname(slave), baudrate=9600, t35=0.5)
+    task = asyncio.create_task(server.start())
+    try:
+        await asyncio.sleep(0.05)
+        foreign_request = add_crc16(b"\x05\x03\x00\x00\x00\x02")
+        foreign_response = add_crc16(b"\x05\x03\x04\x00\x01\x00\x02")
+        broadcast = add_crc16(b"\x00\x06\x00\x00\x00\x09")
+        broadcast_read = add_crc16(b"\x00\x03\x00\x00\x00\x01")
+        read = add_crc16(b"\x02\x03\x00\x00\x00\x01")
+        start = time.perf_counter()
+        os.write(master, foreign_request + foreign_response + broadcast + broadcast_read + read)
+        assert await read_exactly(master, 7) == add_crc16(b"\x02\x03\x02\x00\x09")
+        assert time.perf_counter() - start < 0.3
+        await asyncio.sleep(0.05)
+        with pytest.raises(BlockingIOError):
+            os.read(master, 64)
+    finally:
+        await server.stop()
+        task.cancel()
+        os.close(master)
+        os.close(slave)
+
+    assert await datastore.read_holding_registers(1, 0, 1) == [9]
+    stats = handler.get_stats()["transports"]["rtu"]
+    assert stats["foreign_frames"] == 3
+    assert stats["broadcasts"] == 1
+    assert stats["early_frames"] == 5
+    assert server.counters.bus_message_count == 5
+
+
+def test_crc16_table():
+    """测试 CRC16 查找表与逐位算法一致。"""
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        assert CRC16_TABLE[byte] == crc
+    assert calculate_crc16(b"\x01\x03\x00\x00\x00\x01") == 0x0A84
+
+
+def test_receive_ring_wraps_without_copying():
+    """测试环形缓冲区跨越末尾时未读数据仍是连续视图，写满时丢弃最早的数据。"""
+    ring = ReceiveRing(8)
+    assert ring.write(b"abcdef") == 0
+    ring.consume(5)
+    assert ring.write(b"ghijk") == 0
+    view = ring.view()
+    assert view.obj is ring.view().obj
+    assert bytes(view) == b"fghijk"
+    assert ring.write(b"lmnop") == 3
+    assert bytes(ring.view()) == b"ijklmnop"
+    assert ring.free == 0
+
+
+@pytest.mark.asyncio
+async def test_resync_recovers_frames_from_noise():
+    """测试噪声中的有效请求被滑动重新同步找到，不等待帧间隔也不丢弃后面的帧。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    handler = ModbusHandler(datastore)
+    master, slave = os.openpty()
+    os.set_blocking(master, False)
+    server = ModbusRTUServer(handler, os.ttyname(slave), baudrate=9600, t35=0.5)
+    task = asyncio.create_task(server.start())
+    try:
+        await asyncio.sleep(0.05)
+        read = add_crc16(b"\x01\x03\x00\x00\x00\x01")
+        write = add_crc16(b"\x01\x06\x00\x00\x00\x07")
+        # 功能码 03 的假帧头和 CRC 错误的写请求
+        noise = b"\x01\x03\x00\x01\x02"
+        broken = write[:-1] + bytes([write[-1] ^ 0xFF])
+        start = time.perf_counter()
+        os.write(master, noise + read + broken + write)
+        expected = add_crc16(b"\x01\x03\x02\x00\x00") + write
+        assert await read_exactly(master, len(expected)) == expected
+        assert time.perf_counter() - start < 0.3
+    finally:
+        await server.stop()
+        task.cancel()
+        os.close(master)
+        os.close(slave)
+
+    stats = handler.get_stats()["transports"]["rtu"]
+    assert stats["discarded_bytes"] == len(noise) + len(broken)
+    assert stats["early_frames"] == 2
+    assert server.counters.bus_comm_error_count == 2
@@ -0,0 +1,104 @@
+"""RTU 主站和伪终端测试环境测试。"""
+
+import asyncio
+import time
+
+import pytest
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler
+from modbus_slave_full.protocol.framing import expected_response_length
+from modbus_slave_full.protocol.routing import UnitRouter
+from modbus_slave_full.testing import RTUHarness
+
+
+@pytest.fixture
+def handler():
+    """创建带一个从站的处理器。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    return ModbusHandler(datastore)
+
+
+def test_expected_response_length():
+    """测试响应长度规则。"""
+    assert expected_response_length(0x03, b"\x14") == 21
+    assert expected_response_length(0x03, b"") is None
+    assert expected_response_length(0x10, b"") == 4
+    assert expected_response_length(0x83, b"") == 1
+    assert expected_response_length(0x18, b"\x00\x06") == 8
+    assert expected_response_length(0x08, b"\x00\x0B\x00\x01") == 4
+    assert expected_response_length(0x08, b"\x00\x00\x12") < 0
+    assert expected_response_length(0x65, b"") < 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "request_pdu, response_pdu",
+    [
+        (b"\x05\x00\x01\xFF\x00", b"\x05\x00\x01\xFF\x00"),
+        (b"\x01\x00\x00\x00\x03", b"\x01\x01\x02"),
+        (b"\x0F\x00\x00\x00\x03\x01\x05", b"\x0F\x00\x00\x00\x03"),
+        (b"\x02\x00\x00\x00\x08", b"\x02\x01\x00"),
+        (b"\x10\x00\x00\x00\x02\x04\x00\x07\x00\x08", b"\x10\x00\x00\x00\x02"),
+        (b"\x03\x00\x00\x00\x02", b"\x03\x04\x00\x07\x00\x08"),
+        (b"\x06\x00\x00\x12\x34", b"\x06\x00\x00\x12\x34"),
+        (b"\x17\x00\x00\x00\x01\x00\x01\x00\x01\x02\x00\x09", b"\x17\x02\x12\x34"),
+        (b"\x04\x00\x00\x00\x01", b"\x04\x02\x00\x00"),
+        (b"\x03\xFF\xFF\x00\x02", b"\x83\x02"),
+    ],
+)
+async def test_function_codes_over_pty(handler, request_pdu, response_pdu):
+    """测试主站通过伪终端与 RTU 服务器完成各功能码的事务。"""
+    await handler.datastore.write_registers(1, 0, [7, 8])
+    await handler.datastore.write_coils(1, 1, [True])
+    async with RTUHarness(handler, shape=False) as harness:
+        if request_pdu[0] in (0x04, 0x17):
+            await harness.master.execute(1, b"\x06\x00\x00\x12\x34")
+        assert await harness.master.execute(1, request_pdu) == response_pdu
+        assert harness.server.early_frames >= 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_response_length_uses_gap(handler):
+    """测试没有长度规则的响应按 T3.5 静默结束。"""
+
+    async def echo(slave_id, data, source):
+        return b"\x65" + data
+
+    handler.register_function_code(0x65, echo, request_length=3)
+    async with RTUHarness(handler, shape=False) as harness:
+        assert await harness.master.execute(1, b"\x65\x01\x02\x03") == b"\x65\x01\x02\x03"
+
+
+@pytest.mark.asyncio
+async def test_return_query_data_uses_gap(handler):
+    """测试 FC08 子功能码 0x0000 的请求和回送响应按 T3.5 静默结束。"""
+    echo = b"\x08\x00\x00\x12\x34\x56\x78"
+    async with RTUHarness(handler, shape=False) as harness:
+        assert await harness.master.execute(1, echo) == echo
+        # 总线报文计数：包括之前的回送请求
+        count = await harness.master.execute(1, b"\x08\x00\x0B\x00\x00")
+        assert count == b"\x08\x00\x0B\x00\x02"
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_broadcast(handler):
+    """测试总线上没有响应的单元ID超时，广播请求不等待响应。"""
+    async with RTUHarness(handler, shape=False, unit_router=UnitRouter(slaves=[1])) as harness:
+        master = harness.master
+        with pytest.raises(asyncio.TimeoutError):
+            await master.execute(2, b"\x03\x00\x00\x00\x01", timeout=0.05)
+        assert await master.execute(0, b"\x06\x00\x00\x00\x01") is None
+        assert await master.execute(1, b"\x03\x00\x00\x00\x01") == b"\x03\x02\x00\x01"
+    assert master.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_baud_rate_shaping(handler):
+    """测试按波特率模拟线路时间：9600 8N1 下 FC03 读 10 个寄存器的请求和响应共 33 字节。"""
+    async with RTUHarness(handler, baudrate=9600) as harness:
+        start = time.perf_counter()
+        await harness.master.execute(1, b"\x03\x00\x00\x00\x0A")
+        elapsed = time.perf_counter() - start
+    assert 33 * 10 / 9600 <= elapsed < 0.2
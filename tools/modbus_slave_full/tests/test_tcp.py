@@ -0,0 +1,426 @@
+"""Modbus TCP 服务器测试。"""
+
+import asyncio
+import socket
+import struct
+
+import pytest
+
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import LatencyInjectionMiddleware, ModbusHandler, ModbusTCPServer
+from modbus_slave_full.protocol.admission import ConnectionLimits
+from modbus_slave_full.protocol.routing import UnitRouter
+from modbus_slave_full.protocol.utils import add_crc16
+
+
+def build_request(transaction_id: int, unit_id: int, pdu: bytes) -> bytes:
+    """构建 Modbus TCP 请求 ADU。"""
+    return struct.pack(">HHHB", transaction_id, 0, len(pdu) + 1, unit_id) + pdu
+
+
+async def read_response(reader: asyncio.StreamReader):
+    """读取一个响应 ADU，返回 (事务ID, 单元ID, PDU)。"""
+    header = await reader.readexactly(7)
+    transaction_id, _, length, unit_id = struct.unpack(">HHHB", header)
+    pdu = await reader.readexactly(length - 1)
+    return transaction_id, unit_id, pdu
+
+
+@pytest.fixture
+def handler():
+    """创建处理器。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    datastore.initialize_slave(2)
+    return ModbusHandler(datastore)
+
+
+async def start_server(server: ModbusTCPServer):
+    """在随机端口启动服务器，返回 (服务任务, 端口)。"""
+    server.host = "127.0.0.1"
+    server.port = 0
+    await server.listen()
+    port = server.server.sockets[0].getsockname()[1]
+    return asyncio.create_task(server.start()), port
+
+
+@pytest.mark.asyncio
+async def test_sequential_request(handler):
+    """测试顺序模式请求响应。"""
+    server = ModbusTCPServer(handler)
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(build_request(7, 1, b"\x03\x00\x00\x00\x02"))
+        assert await read_response(reader) == (7, 1, b"\x03\x04\x00\x00\x00\x00")
+
+        # 长度与功能码规则不符
+        writer.write(build_request(8, 1, b"\x03\x00\x00\x00"))
+        assert await read_response(reader) == (8, 1, b"\x83\x03")
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+    stats = handler.get_stats()
+    assert stats["total_requests"] == 2
+    assert stats["exception_codes"] == {"0x03": 1}
+    assert handler.comm_counters["tcp"].bus_comm_error_count == 1
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_return_query_data(handler):
+    """测试 FC08 子功能码 0x0000 回送任意长度的数据，其它子功能码长度固定。"""
+    server = ModbusTCPServer(handler)
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        echo = b"\x08\x00\x00\x12\x34\x56\x78"
+        writer.write(build_request(1, 1, echo))
+        assert await read_response(reader) == (1, 1, echo)
+
+        writer.write(build_request(2, 1, b"\x08\x00\x0B\x00\x00\x00"))
+        assert await read_response(reader) == (2, 1, b"\x88\x03")
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_pipelined_out_of_order(handler):
+    """测试流水线模式下慢从站不阻塞同一连接上的其他请求。"""
+    handler.add_middleware(LatencyInjectionMiddleware(0.2, units=[2]))
+    server = ModbusTCPServer(handler, pipelined=True, max_in_flight=4)
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            build_request(1, 2, b"\x03\x00\x00\x00\x01")
+            + build_request(2, 1, b"\x03\x00\x00\x00\x01")
+        )
+        first = await asyncio.wait_for(read_response(reader), 0.15)
+        assert first[:2] == (2, 1)
+        second = await asyncio.wait_for(read_response(reader), 1.0)
+        assert second[:2] == (1, 2)
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipelined", [False, True])
+async def test_protocol_backend_split_frames(handler, pipelined):
+    """测试协议后端处理跨多次接收的帧和粘连的多个帧。"""
+    server = ModbusTCPServer(handler, pipelined=pipelined, backend="protocol")
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        request = build_request(1, 1, b"\x03\x00\x00\x00\x01")
+        writer.write(request[:4])
+        await writer.drain()
+        await asyncio.sleep(0.01)
+        writer.write(request[4:] + build_request(2, 1, b"\x03\x00\x00\x00\x01"))
+        responses = [await read_response(reader) for _ in range(2)]
+        assert sorted(responses) == [(1, 1, b"\x03\x02\x00\x00"), (2, 1, b"\x03\x02\x00\x00")]
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_protocol_backend_invalid_header(handler):
+    """测试协议后端收到无效 MBAP 头部时关闭连接。"""
+    server = ModbusTCPServer(handler, backend="protocol")
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(struct.pack(">HHHB", 1, 5, 6, 1) + b"\x03\x00\x00\x00\x01")
+        assert await asyncio.wait_for(reader.read(), 1.0) == b""
+        assert server.counters.bus_comm_error_count == 1
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+
+def test_unknown_backend(handler):
+    """测试未知后端。"""
+    with pytest.raises(ValueError):
+        ModbusTCPServer(handler, backend="threads")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["streams", "protocol"])
+async def test_connection_limits(handler, backend):
+    """测试单 IP 连接数限制和连接统计。"""
+    limits = ConnectionLimits(max_connections_per_ip=1)
+    server = ModbusTCPServer(handler, backend=backend, limits=limits)
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(build_request(1, 1, b"\x03\x00\x00\x00\x01"))
+        await read_response(reader)
+
+        # 第二个连接被拒绝（立即关闭）
+        reader2, writer2 = await asyncio.open_connection("127.0.0.1", port)
+        assert await asyncio.wait_for(reader2.read(), 1.0) == b""
+        writer2.close()
+
+        connections = handler.get_stats()["transports"]["tcp"]["connections"]
+        assert connections["active"] == 1
+        assert connections["rejected"]["max_connections_per_ip"] == 1
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+
+@pytest.fixture
+def single_drain(monkeypatch):
+    """模拟 Python 3.8/3.9：同一 StreamWriter 上多个协程同时等待 drain() 时断言失败。
+
+    服务器捕获连接错误后仍会关闭连接，返回记录断言失败的列表供测试检查。
+    """
+    draining = set()
+    overlaps = []
+    drain = asyncio.StreamWriter.drain
+
+    async def single_drain(writer):
+        if writer in draining:
+            overlaps.append(writer)
+            raise AssertionError("多个协程同时等待 drain()")
+        draining.add(writer)
+        try:
+            await drain(writer)
+        finally:
+            draining.discard(writer)
+
+    monkeypatch.setattr(asyncio.StreamWriter, "drain", single_drain)
+    return overlaps
+
+
+# 客户端不读取响应时积压在服务器写缓冲中的大量读请求（每个响应 209 字节）
+BULK_COUNT = 2000
+BULK_READS = b"".join(build_request(i, 1, b"\x03\x00\x00\x00\x64") for i in range(BULK_COUNT))
+
+
+async def open_slow_client(server: ModbusTCPServer, port: int):
+    """创建套接字缓冲区很小的客户端连接，让响应积压在服务器传输层的写缓冲中。"""
+    # 接受的连接继承监听套接字的发送缓冲区大小
+    server.server.sockets[0].setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+    return await asyncio.open_connection(sock=sock)
+
+
+async def read_bulk_responses(reader: asyncio.StreamReader) -> None:
+    """读取 `BULK_READS` 的全部响应并检查完整性。"""
+    responses = [await asyncio.wait_for(read_response(reader), 1.0) for _ in range(BULK_COUNT)]
+    assert sorted(response[0] for response in responses) == list(range(BULK_COUNT))
+    assert all(len(response[2]) == 202 for response in responses)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipelined", [False, True])
+async def test_write_backpressure(handler, pipelined, single_drain):
+    """测试客户端不读取响应时暂停读取请求，客户端恢复读取后所有响应完整送达。"""
+    limits = ConnectionLimits(write_buffer_high=1024, write_buffer_low=256)
+    server = ModbusTCPServer(handler, pipelined=pipelined, limits=limits)
+    task, port = await start_server(server)
+    reader, writer = await open_slow_client(server, port)
+    try:
+        writer.write(BULK_READS)
+        for _ in range(100):
+            if server.limiter.write_pauses:
+                break
+            await asyncio.sleep(0.01)
+        assert server.limiter.write_pauses > 0
+        await read_bulk_responses(reader)
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+    assert not single_drain
+
+
+@pytest.mark.asyncio
+async def test_pipelined_flush_on_eof(handler, single_drain):
+    """测试流水线模式下对端关闭写方向后，积压的响应全部写出再关闭连接。"""
+    # 读取到 EOF 之后响应才完成；从站 2 的响应在写任务因客户端不读取而等待 drain 时完成
+    handler.add_middleware(LatencyInjectionMiddleware(0.05, units=[1]))
+    handler.add_middleware(LatencyInjectionMiddleware(0.1, units=[2]))
+    limits = ConnectionLimits(write_buffer_high=1024, write_buffer_low=256)
+    server = ModbusTCPServer(handler, pipelined=True, max_in_flight=BULK_COUNT, limits=limits)
+    task, port = await start_server(server)
+    reader, writer = await open_slow_client(server, port)
+    try:
+        writer.write(build_request(BULK_COUNT, 2, b"\x03\x00\x00\x00\x01") + BULK_READS)
+        writer.write_eof()
+        await asyncio.sleep(0.2)
+        count = BULK_COUNT + 1
+        responses = [await asyncio.wait_for(read_response(reader), 1.0) for _ in range(count)]
+        assert sorted(response[0] for response in responses) == list(range(count))
+        assert await asyncio.wait_for(reader.read(), 1.0) == b""
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+    assert not single_drain
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("framing", ["mbap", "rtu"])
+async def test_write_buffer_limits_disabled(handler, framing):
+    """测试写缓冲水位为 0（不启用）时不统计写暂停。"""
+    limits = ConnectionLimits(write_buffer_high=0)
+    server = ModbusTCPServer(handler, limits=limits, framing=framing)
+    task, port = await start_server(server)
+    reader, writer = await open_slow_client(server, port)
+    try:
+        if framing == "rtu":
+            request = add_crc16(b"\x01\x03\x00\x00\x00\x64")
+            writer.write(request * BULK_COUNT)
+            await asyncio.sleep(0.1)
+            for _ in range(BULK_COUNT):
+                response = await asyncio.wait_for(reader.readexactly(205), 1.0)
+                assert response[:3] == b"\x01\x03\xc8"
+        else:
+            writer.write(BULK_READS)
+            await asyncio.sleep(0.1)
+            await read_bulk_responses(reader)
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+    assert server.limiter.write_pauses == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["streams", "protocol"])
+async def test_idle_and_read_timeouts(handler, backend):
+    """测试空闲超时和不完整帧的读超时。"""
+    limits = ConnectionLimits(idle_timeout=0.2, read_timeout=0.1)
+    server = ModbusTCPServer(handler, backend=backend, limits=limits)
+    task, port = await start_server(server)
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(build_request(1, 1, b"\x03\x00\x00\x00\x01"))
+        await read_response(reader)
+        assert await asyncio.wait_for(reader.read(), 1.0) == b""
+        writer.close()
+
+        # 只发送半个帧，在空闲超时之前因读超时被关闭
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(build_request(2, 1, b"\x03\x00\x00\x00\x01")[:9])
+        started = asyncio.get_running_loop().time()
+        await asyncio.wait_for(reader.read(), 1.0)
+        assert asyncio.get_running_loop().time() - started < 0.19
+        writer.close()
+
+        connections = server.limiter.stats()
+        assert connections["idle_timeouts"] == 1
+        assert connections["read_timeouts"] == 1
+    finally:
+        await server.stop()
+        task.cancel()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "backend,pipelined",
+    [("streams", False), ("streams", True), ("protocol", False), ("protocol", True)],
+)
+async def test_oversized_adu_closes_connection(handler, backend, pipelined):
+    """测试 MBAP 长度超过 ADU 上限时立即关闭连接，不等待其余数据。"""
+    server = ModbusTCPServer(handler, pipelined=pipelined, backend=backend)
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        # 先发送一个正常请求，再发送长度字段为 300 的头部（只发送头部）
+        writer.write(build_request(1, 1, b"\x03\x00\x00\x00\x01"))
+        writer.write(struct.pack(">HHHB", 2, 0, 300, 1) + b"\x03")
+        assert await read_response(reader) == (1, 1, b"\x03\x02\x00\x00")
+        assert await asyncio.wait_for(reader.read(), 1.0) == b""
+        assert server.counters.bus_comm_error_count == 1
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_rtu_over_tcp(handler):
+    """测试 RTU over TCP：按长度切分字节流中的多个帧，CRC 错误后重新同步。"""
+    server = ModbusTCPServer(handler, framing="rtu")
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        write = add_crc16(b"\x01\x06\x00\x01\x12\x34")
+        read = add_crc16(b"\x01\x03\x00\x01\x00\x01")
+        # 两个帧在同一次写入中，第二个帧拆成两段
+        writer.write(write + read[:3])
+        await writer.drain()
+        await asyncio.sleep(0.01)
+        writer.write(read[3:])
+        assert await reader.readexactly(8) == write
+        assert await reader.readexactly(7) == add_crc16(b"\x01\x03\x02\x12\x34")
+
+        # 损坏的帧被丢弃，之后的帧正常处理
+        writer.write(b"\x01\x03\x00\x01\x00\x01\xFF\xFF" + read)
+        assert await reader.readexactly(7) == add_crc16(b"\x01\x03\x02\x12\x34")
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+    assert handler.comm_counters["tcp"].bus_comm_error_count == 1
+
+
+def test_rtu_framing_requires_sequential_streams(handler):
+    """测试 RTU 帧格式不支持流水线模式和协议后端。"""
+    with pytest.raises(ValueError):
+        ModbusTCPServer(handler, framing="rtu", pipelined=True)
+    with pytest.raises(ValueError):
+        ModbusTCPServer(handler, framing="rtu", backend="protocol")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["streams", "protocol"])
+async def test_unit_routing(handler, backend):
+    """测试按监听的路由表映射单元ID，未映射的单元ID返回网关路径不可用。"""
+    await handler.datastore.write_registers(2, 0, [0x1234])
+    router = UnitRouter(unit_map={7: 2}, slaves=[1])
+    server = ModbusTCPServer(handler, backend=backend, unit_router=router, name="device")
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        read = b"\x03\x00\x00\x00\x01"
+        writer.write(build_request(1, 7, read))
+        assert await read_response(reader) == (1, 7, b"\x03\x02\x12\x34")
+        writer.write(build_request(2, 1, read))
+        assert await read_response(reader) == (2, 1, b"\x03\x02\x00\x00")
+        writer.write(build_request(3, 2, read))
+        assert await read_response(reader) == (3, 2, b"\x83\x0a")
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+    assert "device" in handler.get_stats()["transports"]
+
+
+def test_unit_router_default_slave():
+    """测试独立设备模式：所有单元ID映射到同一个从站，显式映射优先。"""
+    router = UnitRouter(unit_map={0: 5}, slave=3)
+    assert router.resolve(1) == 3
+    assert router.resolve(255) == 3
+    assert router.resolve(0) == 5
+    assert UnitRouter(slaves=[1, 2]).resolve(3) is None
@@ -0,0 +1,186 @@
+"""Modbus/TCP Security (TLS) 测试。"""
+
+import asyncio
+import socket
+import ssl
+from pathlib import Path
+
+import pytest
+
+from modbus_slave_full.config import Config
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler, ModbusTCPServer, RoleAccessMiddleware
+from modbus_slave_full.protocol.context import ClientInfo, current_client, set_current_client
+from modbus_slave_full.protocol.tls import certificate_role, create_server_ssl_context
+from modbus_slave_full.workers import create_handler, create_tcp_server
+
+from .test_tcp import build_request, read_response, start_server
+
+CERTS = Path(__file__).parent / "data" / "tls"
+
+WRITE = b"\x06\x00\x00\x00\x07"
+WRITE_UNIT_2 = b"\x06\x00\x00\x00\x08"
+
+
+@pytest.fixture
+def handler():
+    """创建处理器，只有 operator 角色可以写入从站 1。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    datastore.initialize_slave(2)
+    handler = ModbusHandler(datastore)
+    handler.add_middleware(RoleAccessMiddleware({"operator": [1]}))
+    return handler
+
+
+def server_context(**kwargs) -> ssl.SSLContext:
+    """创建测试服务器 SSL 上下文。"""
+    return create_server_ssl_context(
+        str(CERTS / "server.pem"),
+        str(CERTS / "server.key"),
+        str(CERTS / "ca.pem"),
+        **kwargs,
+    )
+
+
+def client_context(name=None) -> ssl.SSLContext:
+    """创建测试客户端 SSL 上下文，name 为客户端证书名称。"""
+    context = ssl.create_default_context(cafile=str(CERTS / "ca.pem"))
+    if name is not None:
+        context.load_cert_chain(str(CERTS / f"{name}.pem"), str(CERTS / f"{name}.key"))
+    return context
+
+
+def test_certificate_role():
+    """测试从证书扩展中提取角色。"""
+    for name, role in (("operator", "operator"), ("viewer", "viewer"), ("norole", None)):
+        der = ssl.PEM_cert_to_DER_cert((CERTS / f"{name}.pem").read_text())
+        assert certificate_role(der) == role
+    assert certificate_role(b"") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["streams", "protocol"])
+@pytest.mark.parametrize(
+    "name, allowed",
+    [("operator", True), ("viewer", False), ("norole", False), (None, False)],
+)
+async def test_role_write_permissions(handler, backend, name, allowed):
+    """测试按证书角色限制写请求，读请求不受限制。"""
+    server = ModbusTCPServer(handler, backend=backend, ssl_context=server_context())
+    task, port = await start_server(server)
+    reader, writer = await asyncio.open_connection(
+        "127.0.0.1", port, ssl=client_context(name), server_hostname="localhost"
+    )
+    try:
+        writer.write(build_request(1, 1, WRITE))
+        expected = WRITE if allowed else b"\x86\x01"
+        assert await read_response(reader) == (1, 1, expected)
+
+        # operator 角色只允许写入从站 1
+        writer.write(build_request(2, 2, WRITE_UNIT_2))
+        assert await read_response(reader) == (2, 2, b"\x86\x01")
+
+        writer.write(build_request(3, 2, b"\x03\x00\x00\x00\x01"))
+        assert await read_response(reader) == (3, 2, b"\x03\x02\x00\x00")
+    finally:
+        writer.close()
+        await server.stop()
+        task.cancel()
+
+    assert server.get_stats()["tls"]["handshakes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_require_client_cert(handler):
+    """测试要求客户端证书时拒绝没有证书的客户端。"""
+    server = ModbusTCPServer(handler, ssl_context=server_context(require_client_cert=True))
+    task, port = await start_server(server)
+    try:
+        with pytest.raises((ssl.SSLError, ConnectionError, asyncio.IncompleteReadError)):
+            reader, writer = await asyncio.open_connection(
+                "127.0.0.1", port, ssl=client_context(), server_hostname="localhost"
+            )
+            # TLS 1.3 下客户端证书在握手完成后才被验证，错误在第一次读取时出现
+            writer.write(build_request(1, 1, b"\x03\x00\x00\x00\x01"))
+            await read_response(reader)
+    finally:
+        await server.stop()
+        task.cancel()
+
+
+def resume_session(port: int, context: ssl.SSLContext, session: ssl.SSLSession) -> bool:
+    """使用已有会话建立阻塞 TLS 连接，发送一个请求，返回是否恢复了会话。"""
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        with context.wrap_socket(sock, server_hostname="localhost", session=session) as tls:
+            tls.sendall(build_request(2, 1, b"\x03\x00\x00\x00\x01"))
+            tls.recv(64)
+            return tls.session_reused
+
+
+@pytest.mark.asyncio
+async def test_session_resumption(handler):
+    """测试重连时通过会话票据恢复会话。"""
+    server = ModbusTCPServer(handler, ssl_context=server_context())
+    task, port = await start_server(server)
+    context = client_context("operator")
+    try:
+        reader, writer = await asyncio.open_connection(
+            "127.0.0.1", port, ssl=context, server_hostname="localhost"
+        )
+        writer.write(build_request(1, 1, WRITE))
+        assert await read_response(reader) == (1, 1, WRITE)
+        # TLS 1.3 的会话票据在握手后发送，读取响应后才可用
+        session = writer.get_extra_info("ssl_object").session
+        writer.close()
+        await writer.wait_closed()
+        assert session is not None
+
+        # asyncio 不支持为新连接指定会话，使用阻塞套接字完成恢复握手
+        loop = asyncio.get_running_loop()
+        assert await loop.run_in_executor(None, resume_session, port, context, session)
+    finally:
+        await server.stop()
+        task.cancel()
+
+    assert server.get_stats()["tls"] == {"handshakes": 2, "resumed": 1}
+
+
+@pytest.mark.asyncio
+async def test_role_middleware_ignores_plain_transports():
+    """测试非 TLS 连接上的写请求不受角色限制。"""
+    middleware = RoleAccessMiddleware({"operator": "*"})
+
+    async def call_next(slave_id, function_code, data, source):
+        return b"ok"
+
+    set_current_client(ClientInfo(peer=("127.0.0.1", 1)))
+    assert await middleware(1, 0x06, b"", "tcp", call_next) == b"ok"
+    set_current_client(ClientInfo(tls=True, role="operator"))
+    assert current_client().role == "operator"
+    assert await middleware(9, 0x10, b"", "tcp", call_next) == b"ok"
+    set_current_client(ClientInfo(tls=True, role="viewer"))
+    assert await middleware(1, 0x06, b"", "tcp", call_next) == b"\x86\x01"
+    assert await middleware(1, 0x03, b"", "tcp", call_next) == b"ok"
+    assert middleware.denied == 1
+
+
+def test_tls_config_round_trip(tmp_path):
+    """测试 TLS 配置的保存和加载，并按配置创建 TLS 服务器和角色中间件。"""
+    config = Config.get_default()
+    tls = config.server.tcp.tls
+    tls.enabled = True
+    tls.certfile = str(CERTS / "server.pem")
+    tls.keyfile = str(CERTS / "server.key")
+    tls.ca_file = str(CERTS / "ca.pem")
+    tls.write_roles = {"operator": "*", "engineer": [1, 2]}
+    path = tmp_path / "config.yaml"
+    config.to_yaml(path)
+
+    loaded = Config.from_yaml(path)
+    assert loaded.server.tcp.tls == tls
+    loaded.plugins.entry_points = False
+    handler = create_handler(loaded, ModbusDataStore())
+    assert any(isinstance(m, RoleAccessMiddleware) for m in handler.middlewares)
+    server = create_tcp_server(handler, loaded.server.tcp)
+    assert server.ssl_context.verify_mode == ssl.CERT_OPTIONAL
@@ -0,0 +1,165 @@
+"""Modbus UDP 服务器测试。"""
+
+import asyncio
+import struct
+
+import pytest
+
+from modbus_slave_full.config import Config
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler, ModbusUDPServer
+from modbus_slave_full.protocol.utils import add_crc16
+
+
+class ClientProtocol(asyncio.DatagramProtocol):
+    """测试客户端：收集响应数据报。"""
+
+    def __init__(self):
+        self.responses = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        self.responses.put_nowait(data)
+
+
+def build_request(transaction_id: int, unit_id: int, pdu: bytes) -> bytes:
+    """构建 MBAP 请求数据报。"""
+    return struct.pack(">HHHB", transaction_id, 0, len(pdu) + 1, unit_id) + pdu
+
+
+@pytest.fixture
+def handler():
+    """创建处理器。"""
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    return ModbusHandler(datastore)
+
+
+async def open_client(server: ModbusUDPServer):
+    """在随机端口启动服务器并创建客户端，返回 (客户端传输, 客户端协议)。"""
+    server.host = "127.0.0.1"
+    server.port = 0
+    await server.listen()
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(ClientProtocol, remote_addr=server.address)
+
+
+async def receive(protocol: ClientProtocol) -> bytes:
+    """等待一个响应数据报。"""
+    return await asyncio.wait_for(protocol.responses.get(), timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_mbap_request(handler):
+    """测试 MBAP 帧请求响应。"""
+    server = ModbusUDPServer(handler)
+    transport, protocol = await open_client(server)
+    try:
+        transport.sendto(build_request(7, 1, b"\x06\x00\x01\x12\x34"))
+        assert await receive(protocol) == build_request(7, 1, b"\x06\x00\x01\x12\x34")
+
+        transport.sendto(build_request(8, 1, b"\x03\x00\x01\x00\x01"))
+        assert await receive(protocol) == build_request(8, 1, b"\x03\x02\x12\x34")
+
+        # 长度与功能码规则不符
+        transport.sendto(build_request(9, 1, b"\x03\x00\x00\x00"))
+        assert await receive(protocol) == build_request(9, 1, b"\x83\x03")
+    finally:
+        transport.close()
+        await server.stop()
+
+    assert handler.comm_counters["udp"].bus_message_count == 3
+    assert server.get_stats()["datagrams_sent"] == 3
+    # 长度不符的请求计入请求统计和指标
+    stats = handler.get_stats()
+    assert stats["total_requests"] == 3
+    assert stats["exception_responses"] == 1
+    assert stats["exception_codes"] == {"0x03": 1}
+    assert handler.comm_counters["udp"].bus_comm_error_count == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_datagrams_dropped(handler):
+    """测试无效数据报被丢弃并计入通信错误。"""
+    server = ModbusUDPServer(handler)
+    transport, protocol = await open_client(server)
+    try:
+        # 长度字段与数据报长度不一致、协议ID非0、数据报太短
+        transport.sendto(struct.pack(">HHHB", 1, 0, 10, 1) + b"\x03\x00\x00\x00\x01")
+        transport.sendto(struct.pack(">HHHB", 2, 1, 6, 1) + b"\x03\x00\x00\x00\x01")
+        transport.sendto(b"\x00\x03\x00")
+        transport.sendto(build_request(4, 1, b"\x03\x00\x00\x00\x01"))
+        assert await receive(protocol) == build_request(4, 1, b"\x03\x02\x00\x00")
+        assert protocol.responses.empty()
+    finally:
+        transport.close()
+        await server.stop()
+
+    counters = handler.comm_counters["udp"]
+    assert counters.bus_comm_error_count == 3
+    assert counters.bus_message_count == 4
+
+
+@pytest.mark.asyncio
+async def test_rtu_framing(handler):
+    """测试 RTU over UDP。"""
+    server = ModbusUDPServer(handler, framing="rtu")
+    transport, protocol = await open_client(server)
+    try:
+        transport.sendto(add_crc16(b"\x01\x06\x00\x02\xAB\xCD"))
+        assert await receive(protocol) == add_crc16(b"\x01\x06\x00\x02\xAB\xCD")
+
+        # CRC 错误
+        transport.sendto(b"\x01\x03\x00\x02\x00\x01\x00\x00")
+        transport.sendto(add_crc16(b"\x01\x03\x00\x02\x00\x01"))
+        assert await receive(protocol) == add_crc16(b"\x01\x03\x02\xAB\xCD")
+        assert protocol.responses.empty()
+    finally:
+        transport.close()
+        await server.stop()
+
+    assert handler.comm_counters["udp"].bus_comm_error_count == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_processing(handler):
+    """测试同一轮事件循环中收到的数据报按批次处理，超出队列上限时丢弃。"""
+    server = ModbusUDPServer(handler, batch_size=4, max_queue=6)
+    await server.listen()
+    sent = []
+    server.transport.sendto = lambda data, addr: sent.append((data, addr))
+    for transaction_id in range(8):
+        server.protocol.datagram_received(
+            build_request(transaction_id, 1, b"\x03\x00\x00\x00\x01"), ("127.0.0.1", 1)
+        )
+    for _ in range(10):
+        await asyncio.sleep(0)
+    await server.stop()
+
+    assert [struct.unpack_from(">H", data)[0] for data, _ in sent] == list(range(6))
+    stats = server.get_stats()
+    assert stats["batches"] == 2
+    assert stats["max_batch"] == 4
+    assert stats["datagrams_dropped"] == 2
+    assert handler.comm_counters["udp"].bus_char_overrun_count == 2
+
+
+def test_unknown_framing(handler):
+    """测试未知帧格式。"""
+    with pytest.raises(ValueError):
+        ModbusUDPServer(handler, framing="ascii")
+
+
+def test_udp_config_round_trip(tmp_path):
+    """测试 UDP 配置的保存和加载。"""
+    config = Config.get_default()
+    config.server.udp.enabled = True
+    config.server.udp.framing = "rtu"
+    config.server.udp.batch_size = 16
+    path = tmp_path / "config.yaml"
+    config.to_yaml(path)
+
+    loaded = Config.from_yaml(path)
+    assert loaded.server.udp.enabled is True
+    assert loaded.server.udp.framing == "rtu"
+    assert loaded.server.udp.batch_size == 16
+    assert loaded.server.udp.port == 5020
@@ -71,6 +71,20 @@ class TestModbusAPI(AioHTTPTestCase):
         values = await self.datastore.read_holding_registers(1, 0, 1)
         assert values == [1234]
 
+    async def test_get_stats(self):
+        """测试获取统计信息。"""
+        await self.handler.handle_request(1, 0x03, b"\x00\x00\x00\x02", "test")
+        resp = await self.client.get("/api/stats?percentiles=50,99.9")
+        assert resp.status == 200
+        data = await resp.json()
+        assert data["total_requests"] == 1
+        assert "p99.9_us" in data["latency_by_function"]["FC03"]
+        assert data["bytes_out"] == 6
+        assert data["event_loop"]["backend"] in ("asyncio", "uvloop")
+
+        resp = await self.client.get("/api/stats?percentiles=abc")
+        assert resp.status == 400
+
     async def test_health_check(self):
         """测试健康检查。"""
         resp = await self.client.get("/health")
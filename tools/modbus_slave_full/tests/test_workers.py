@@ -0,0 +1,264 @@
+"""多进程工作模式测试。"""
+
+import asyncio
+import json
+import os
+import socket
+import struct
+import subprocess
+
+import pytest
+
+from modbus_slave_full.config import Config, SlaveConfig, TCPListenerConfig
+from modbus_slave_full.datastore import ModbusDataStore
+from modbus_slave_full.protocol import ModbusHandler
+from modbus_slave_full.shared_datastore import SharedDataStore
+from modbus_slave_full.workers import (
+    WorkerPool,
+    create_tcp_servers,
+    merge_snapshots,
+    snapshot_handler,
+)
+
+
+@pytest.fixture
+def shared_store():
+    """创建共享数据存储。"""
+    store = SharedDataStore({1: (16, 8, 10, 4)})
+    yield store
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_datastore_attach(shared_store):
+    """测试附加到同一共享内存的数据存储看到相同数据。"""
+    other = SharedDataStore(
+        shared_store.layout, name=shared_store.name, lock=shared_store.process_lock
+    )
+    try:
+        assert await other.write_registers(1, 2, [0x1234, 0x10000 + 5], "tcp")
+        assert await other.write_coils(1, 3, [True, True], "tcp")
+        assert await shared_store.read_holding_registers(1, 1, 3) == [0, 0x1234, 5]
+        assert await shared_store.read_coils(1, 2, 3) == [False, True, True]
+        assert await shared_store.read_holding_registers(1, 8, 3) is None
+        # 修改标志在共享内存中，只有创建者可以清除
+        assert shared_store._modified
+        other._modified = False
+        assert shared_store._modified
+        assert not shared_store.resize_slave(1, coils=32)
+    finally:
+        other.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_lock_timeout_and_dead_holder(shared_store):
+    """测试跨进程锁：持有者仍在运行时超时报错，持有者已退出时释放锁。"""
+    shared_store._lock.timeout = 0.05
+    shared_store.process_lock.acquire()
+    holder = shared_store.shm.buf[4:8].cast("I")
+    try:
+        holder[0] = os.getpid()
+        with pytest.raises(TimeoutError):
+            await shared_store.read_coils(1, 0, 1)
+
+        # 模拟持有锁时被强制结束的工作进程
+        process = subprocess.Popen(["true"])
+        process.wait()
+        holder[0] = process.pid
+        assert await shared_store.write_registers(1, 0, [9], "tcp")
+        assert holder[0] == 0
+        assert shared_store.process_lock.acquire(block=False)
+        shared_store.process_lock.release()
+    finally:
+        holder.release()
+
+
+@pytest.mark.asyncio
+async def test_shared_datastore_save(shared_store, tmp_path):
+    """测试保存数据文件：锁内取快照，写文件后清除修改标志。"""
+    shared_store.data_file = tmp_path / "data.json"
+    assert await shared_store.write_registers(1, 0, [3, 4], "tcp")
+    await shared_store.save_to_file()
+    assert not shared_store._modified
+    data = json.loads(shared_store.data_file.read_text())
+    assert data["slaves"]["1"]["holding_registers"][:2] == [3, 4]
+
+    # 写文件失败时保留修改标志
+    shared_store.data_file = tmp_path / "missing" / "data.json"
+    assert await shared_store.write_registers(1, 0, [5], "tcp")
+    await shared_store.save_to_file()
+    assert shared_store._modified
+
+
+@pytest.mark.asyncio
+async def test_merge_snapshots():
+    """测试合并多个处理器的统计快照。"""
+    handlers = []
+    for _ in range(2):
+        datastore = ModbusDataStore()
+        datastore.initialize_slave(1, 8, 8, 8, 8)
+        handler = ModbusHandler(datastore)
+        handler.get_comm_counters("tcp")
+        await handler.handle_request(1, 0x03, b"\x00\x00\x00\x01", "tcp")
+        await handler.handle_request(1, 0x03, b"\x00\x10\x00\x01", "tcp")
+        handlers.append(handler)
+
+    stats = merge_snapshots([snapshot_handler(handler) for handler in handlers])
+    assert stats["total_requests"] == 4
+    assert stats["exception_responses"] == 2
+    assert stats["function_codes"] == {"FC03": 4}
+    assert stats["latency"]["count"] == 4
+    assert stats["exception_codes"] == {"0x02": 2}
+    assert stats["comm_counters"]["tcp"]["slave_message_count"] == 4
+
+
+def free_port() -> int:
+    """获取一个空闲端口。"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def request(port: int, pdu: bytes) -> bytes:
+    """发送一个请求并返回响应 PDU。"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(struct.pack(">HHHB", 1, 0, len(pdu) + 1, 1) + pdu)
+        header = await reader.readexactly(7)
+        return await reader.readexactly(struct.unpack_from(">H", header, 4)[0] - 1)
+    finally:
+        writer.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="需要 SO_REUSEPORT")
+async def test_worker_pool():
+    """测试工作进程共享寄存器映像、合并统计并在崩溃后重启。"""
+    config = Config(slaves=[SlaveConfig(id=1, name="测试")])
+    config.server.tcp.host = "127.0.0.1"
+    config.server.tcp.port = free_port()
+    config.server.tcp.workers = 2
+    config.plugins.entry_points = False
+    datastore = SharedDataStore({1: (100, 100, 100, 100)})
+    pool = WorkerPool(config, datastore)
+    task = asyncio.create_task(pool.start())
+    port = config.server.tcp.port
+    try:
+        for _ in range(100):
+            try:
+                await request(port, b"\x03\x00\x00\x00\x01")
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+
+        assert await request(port, b"\x06\x00\x05\x00\x2A") == b"\x06\x00\x05\x00\x2A"
+        assert datastore.slaves[1].holding_registers[5] == 0x2A
+        for _ in range(8):
+            assert await request(port, b"\x03\x00\x05\x00\x01") == b"\x03\x02\x00\x2A"
+
+        await asyncio.sleep(1.5)
+        stats = pool.get_stats()
+        assert stats["total_requests"] >= 10
+        assert len(stats["workers"]) == 2
+
+        # 工作进程崩溃后被重启，已上报的统计保留
+        pool.slots[0].process.kill()
+        for _ in range(60):
+            await asyncio.sleep(0.1)
+            if pool.slots[0].restarts:
+                break
+        assert pool.slots[0].restarts == 1
+        assert pool.get_stats()["total_requests"] >= 10
+    finally:
+        await pool.stop()
+        task.cancel()
+        datastore.close()
+
+
+@pytest.mark.asyncio
+async def test_tcp_listeners_from_config(tmp_path):
+    """测试按配置创建多个 TCP 监听，每个监听使用自己的路由表，共享数据存储。"""
+    config = Config.get_default()
+    tcp = config.server.tcp
+    tcp.host = "127.0.0.1"
+    tcp.port = 0
+    tcp.listeners = [
+        TCPListenerConfig(port=0, slave=1),
+        TCPListenerConfig(port=0, slave=2, name="meter"),
+        TCPListenerConfig(port=0, unit_map={10: 1, 20: 2}, framing="rtu"),
+    ]
+    path = tmp_path / "config.yaml"
+    config.to_yaml(path)
+    loaded = Config.from_yaml(path)
+    assert loaded.server.tcp.listeners == tcp.listeners
+
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    datastore.initialize_slave(2)
+    await datastore.write_registers(2, 0, [42])
+    handler = ModbusHandler(datastore)
+    servers = create_tcp_servers(handler, loaded.server.tcp)
+    names = [server.name for server in servers]
+    assert names == ["tcp", "tcp:127.0.0.1:0", "meter", "tcp:127.0.0.1:0#2"]
+    assert servers[3].framing == "rtu"
+    assert set(handler.get_stats()["transports"]) >= set(names)
+    for server in servers:
+        await server.listen()
+    try:
+        # 两台独立设备都响应单元ID 1，分别对应从站 1 和 2
+        values = []
+        for server in servers[1:3]:
+            port = server.server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(struct.pack(">HHHB", 1, 0, 6, 1) + b"\x03\x00\x00\x00\x01")
+            response = await reader.readexactly(11)
+            values.append(struct.unpack(">H", response[9:])[0])
+            writer.close()
+        assert values == [0, 42]
+    finally:
+        for server in servers:
+            await server.stop()
+
+    # 显式设置的名称不能重复
+    loaded.server.tcp.listeners[0].name = "meter"
+    with pytest.raises(ValueError):
+        create_tcp_servers(ModbusHandler(datastore), loaded.server.tcp)
+
+
+@pytest.mark.asyncio
+async def test_tcp_listeners_separate_diagnostics():
+    """测试每个 TCP 监听有独立的 FC08 诊断状态：一个监听进入只听模式不影响其它监听。"""
+    config = Config.get_default()
+    tcp = config.server.tcp
+    tcp.host = "127.0.0.1"
+    tcp.port = 0
+    tcp.listeners = [TCPListenerConfig(port=0, slave=1, name="meter")]
+    datastore = ModbusDataStore()
+    datastore.initialize_slave(1)
+    handler = ModbusHandler(datastore)
+    servers = create_tcp_servers(handler, tcp)
+    connections = []
+    for server in servers:
+        await server.listen()
+        port = server.server.sockets[0].getsockname()[1]
+        connections.append(await asyncio.open_connection("127.0.0.1", port))
+    (reader, writer), (meter_reader, meter_writer) = connections
+    read = b"\x03\x00\x00\x00\x01"
+    try:
+        # 强制只听模式没有响应
+        meter_writer.write(struct.pack(">HHHB", 1, 0, 6, 1) + b"\x08\x00\x04\x00\x00")
+        meter_writer.write(struct.pack(">HHHB", 2, 0, 6, 1) + read)
+        writer.write(struct.pack(">HHHB", 3, 0, 6, 1) + read)
+        response = await asyncio.wait_for(reader.readexactly(11), 1.0)
+        assert response[:2] == b"\x00\x03"
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(meter_reader.read(1), 0.1)
+    finally:
+        for _, connection in connections:
+            connection.close()
+        for server in servers:
+            await server.stop()
+
+    assert handler.comm_counters["meter"].listen_only
+    assert not handler.comm_counters["tcp"].listen_only
+    assert handler.comm_counters["tcp"].slave_message_count == 1